@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import Awaitable, Callable, Optional
+from .deadlines import REQUEST_TIMEOUT, deadline
+from .rate_limiter import get_limiter
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "3"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+QUOTA_UPSTREAMS = ("gemini", "serpapi")
+
+# One set of slots per event loop (in practice the server's only loop), shared by every batch.
+_slots = weakref.WeakKeyDictionary()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _batch_slots() -> asyncio.Semaphore:
+    """Return the `BATCH_CONCURRENCY` crew slots all batches on the running loop draw from."""
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = _slots[loop] = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+    return slots
+
+
+def _quota_usage(before: dict, after: dict) -> dict:
+    return {
+        name: {field: round(after[name][field] - before[name][field], 3) for field in after[name]}
+        for name in after
+    }
+
+
+class BatchRunner:
+    """
+    Runs a list of blog requests as one batch.
+
+    Items are grouped by topic. The first item of each group (the leader)
+    runs on its own until its research stage is done, which memoizes the
+    research in the stage cache; the rest of the group then start at the
+    writing stage. If a leader fails or is served whole from the blog cache
+    before any research is produced, the next item in the group takes over.
+    Identical (topic, tone, audience) items run once and share the result.
+
+    Crews run on a pool of `concurrency` slots, which are also taken from the
+    `BATCH_CONCURRENCY` slots every batch in the process shares, so
+    concurrent batches never run more crews together than one batch could.
+    Every LLM and search call they make still draws from the process-wide
+    rate limiters, so a batch never spends more quota than single requests
+    would. Each item gets its
+    own `REQUEST_TIMEOUT` budget from when it takes a slot, rather than
+    sharing the deadline of the HTTP request that submitted the batch.
+
+    `runner(request, event_callback)` produces one item's response; the
+    callback receives the crew's `task_started`/`task_finished`/`task_cached`
+    events, possibly from a worker thread.
+    """
+
+    def __init__(self, runner: Callable[[dict, Callable], Awaitable[dict]], concurrency: int = BATCH_CONCURRENCY):
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self._pool = None
+
+    async def _run_item(self, request: dict, research_ready: Optional[asyncio.Event] = None) -> dict:
+        loop = asyncio.get_running_loop()
+        record = {"status": "failed", "stages_run": [], "stages_cached": []}
+
+        def on_event(event, **data):
+            if event == "task_finished":
+                record["stages_run"].append(data["task"])
+            elif event == "task_cached":
+                record["stages_cached"].append(data["task"])
+            else:
+                return
+            if data["task"] == "research" and research_ready is not None:
+                loop.call_soon_threadsafe(research_ready.set)
+
+        async with self._pool, _batch_slots():
+            start = time.perf_counter()
+            try:
+                with deadline(REQUEST_TIMEOUT, inherit=False):
+                    record["result"] = await self.runner(request, on_event)
+                record["status"] = "succeeded"
+            except Exception as e:
+                logger.warning("Batch item for topic '%s' failed: %s", request["topic"], e)
+                record["error"] = getattr(e, "detail", None) or str(e) or type(e).__name__
+            record["seconds"] = round(time.perf_counter() - start, 3)
+        return record
+
+    async def _run_group(self, items: list) -> list:
+        """Run one topic's unique items, starting the followers once a leader has produced the research."""
+        tasks = []
+        pending = list(items)
+        while pending:
+            leader = pending.pop(0)
+            research_ready = asyncio.Event()
+            task = asyncio.create_task(self._run_item(leader, research_ready))
+            tasks.append(task)
+            ready = asyncio.create_task(research_ready.wait())
+            await asyncio.wait({task, ready}, return_when=asyncio.FIRST_COMPLETED)
+            ready.cancel()
+            if research_ready.is_set():
+                tasks.extend(asyncio.create_task(self._run_item(item)) for item in pending)
+                break
+        return await asyncio.gather(*tasks)
+
+    async def run(self, items: list) -> dict:
+        """
+        Run `items` (dicts with topic, tone, target_audience and use_cache)
+        and return per-item results in input order plus batch stats.
+        """
+        self._pool = asyncio.Semaphore(self.concurrency)
+        groups, unique = {}, {}
+        for item in items:
+            key = (_normalize(item["topic"]), _normalize(item["tone"]), _normalize(item["target_audience"]))
+            if key not in unique:
+                unique[key] = item
+                groups.setdefault(key[0], []).append(key)
+
+        quota_before = {name: get_limiter(name).stats() for name in QUOTA_UPSTREAMS}
+        start = time.perf_counter()
+        group_records = await asyncio.gather(*(self._run_group([unique[key] for key in keys]) for keys in groups.values()))
+        elapsed = time.perf_counter() - start
+        quota_after = {name: get_limiter(name).stats() for name in QUOTA_UPSTREAMS}
+
+        records = {key: record for keys, recorded in zip(groups.values(), group_records) for key, record in zip(keys, recorded)}
+        results, seen = [], set()
+        for index, item in enumerate(items):
+            key = (_normalize(item["topic"]), _normalize(item["tone"]), _normalize(item["target_audience"]))
+            results.append({"index": index, "request": item, **records[key], "deduplicated": key in seen})
+            seen.add(key)
+
+        stages_run = [stage for record in records.values() for stage in record["stages_run"]]
+        succeeded = sum(result["status"] == "succeeded" for result in results)
+        stats = {
+            "items": len(items),
+            "unique_items": len(unique),
+            "topics": len(groups),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "research_runs": stages_run.count("research"),
+            "stages_run": len(stages_run),
+            "stages_reused": sum(len(record["stages_cached"]) for record in records.values()),
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_minute": round(len(items) / elapsed * 60, 2) if elapsed else 0.0,
+            "quota": _quota_usage(quota_before, quota_after),
+        }
+        logger.info(
+            "Batch of %d items (%d topics) finished in %.2fs: %d succeeded, %d research runs",
+            stats["items"], stats["topics"], elapsed, succeeded, stats["research_runs"],
+        )
+        return {"results": results, "stats": stats}
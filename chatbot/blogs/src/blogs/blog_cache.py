@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BLOG_CACHE_TTL = int(os.getenv("BLOG_CACHE_TTL", "21600"))
+BLOG_CACHE_SIMILARITY = float(os.getenv("BLOG_CACHE_SIMILARITY", "0.92"))
+BLOG_CACHE_SIZE = int(os.getenv("BLOG_CACHE_SIZE", "256"))
+
+
+def normalize_blog_request(topic: str, tone: str, target_audience: str) -> tuple:
+    """Normalize a generation request so trivially different spellings share a cache entry."""
+    return tuple(" ".join(value.lower().split()).strip(" .!?\"'") for value in (topic, tone, target_audience))
+
+
+class BlogCache:
+    """
+    Cache of generated blogs keyed by (topic, tone, target_audience).
+
+    Exact lookups use the normalized triple. When `embeddings` is set, a miss
+    falls back to a FAISS inner-product search over normalized topic
+    embeddings and accepts the closest fresh entry with the same tone and
+    audience whose cosine similarity is at least `threshold`. Entries expire
+    after `ttl` seconds, since the crew's research reflects current trends.
+    """
+
+    def __init__(self, embeddings=None, ttl: int = BLOG_CACHE_TTL, threshold: float = BLOG_CACHE_SIMILARITY, max_size: int = BLOG_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_id = {}
+        self._index = None
+        self._next_id = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    async def _embed(self, topic: str) -> Optional[np.ndarray]:
+        if self.embeddings is None:
+            return None
+        try:
+            vector = np.asarray([await self.embeddings.aembed_query(topic)], dtype=np.float32)
+        except Exception as e:
+            logger.warning("Blog cache could not embed topic '%s': %s", topic, e)
+            return None
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _is_fresh(self, entry: dict, now: float) -> bool:
+        return now - entry["created_at"] < self.ttl
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key)
+        if entry["id"] is not None:
+            self._index.remove_ids(np.asarray([entry["id"]], dtype=np.int64))
+            del self._keys_by_id[entry["id"]]
+
+    def _hit(self, key: tuple, entry: dict, match: str, similarity: float, now: float) -> tuple:
+        self._entries.move_to_end(key)
+        return entry["result"], {
+            "hit": True,
+            "match": match,
+            "similarity": round(similarity, 4),
+            "matched_topic": entry["topic"],
+            "age_seconds": round(now - entry["created_at"], 1),
+        }
+
+    async def get(self, topic: str, tone: str, target_audience: str) -> Optional[tuple]:
+        """
+        Look up a cached blog for a request.
+
+        Returns:
+            `(result, cache_info)` on a hit, where `cache_info` records whether
+            it was an exact or similar match, or None on a miss
+        """
+        key = normalize_blog_request(topic, tone, target_audience)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self._is_fresh(entry, now):
+                self.exact_hits += 1
+                return self._hit(key, entry, "exact", 1.0, now)
+            if entry:
+                self._remove(key)
+            if self._index is None or self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+        vector = await self._embed(key[0])
+        with self._lock:
+            if vector is not None and self._index is not None and self._index.ntotal:
+                similarities, ids = self._index.search(vector, min(10, self._index.ntotal))
+                for similarity, entry_id in zip(similarities[0], ids[0]):
+                    if similarity < self.threshold:
+                        break
+                    candidate = self._keys_by_id.get(int(entry_id))
+                    if candidate is None or candidate[1:] != key[1:]:
+                        continue
+                    entry = self._entries[candidate]
+                    if self._is_fresh(entry, now):
+                        self.similar_hits += 1
+                        return self._hit(candidate, entry, "similar", float(similarity), now)
+            self.misses += 1
+            return None
+
+    async def put(self, topic: str, tone: str, target_audience: str, result: dict):
+        key = normalize_blog_request(topic, tone, target_audience)
+        vector = await self._embed(key[0])
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry_id = None
+            if vector is not None:
+                if self._index is None:
+                    self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+                entry_id = self._next_id
+                self._next_id += 1
+                self._index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+                self._keys_by_id[entry_id] = key
+            self._entries[key] = {"id": entry_id, "topic": topic, "result": result, "created_at": time.time()}
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._index = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+blog_cache = BlogCache()
@@ -0,0 +1,39 @@
+import functools
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Settings:
+    google_api_key: str
+    serpapi_api_key: Optional[str]
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Load `.env` into the environment and read the API keys, once per process.
+
+    Called from the app's lifespan so a missing key fails startup rather than
+    import, and lazily by anything that needs a key outside the app.
+
+    Raises:
+        ValueError: if GOOGLE_API_KEY is not set
+    """
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv())
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    serpapi_api_key = os.getenv("SERPAPI_API_KEY")
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY not found in environment variables")
+    logger.info("Google API key loaded.")
+    if serpapi_api_key:
+        logger.info("SerpAPI key loaded.")
+    else:
+        logger.warning("SERPAPI_API_KEY not found. Trend research will be limited.")
+    return Settings(google_api_key=google_api_key, serpapi_api_key=serpapi_api_key)
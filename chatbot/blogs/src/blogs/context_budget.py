@@ -0,0 +1,88 @@
+import os
+import re
+from .rate_limiter import estimate_tokens
+
+# Estimated tokens of upstream output each stage receives as context. The
+# editor has no budget: its output is the published post, so it must see the
+# whole draft.
+CONTEXT_BUDGETS = {
+    "writing": int(os.getenv("CONTEXT_BUDGET_WRITING", "1200")),
+    "summarizing": int(os.getenv("CONTEXT_BUDGET_SUMMARIZING", "800")),
+}
+TRIMMED_NOTE = "[... trimmed to fit the context budget]"
+
+_FILLER = re.compile(r"^(?:thought:.*|final answer:\s*|[-*_=~]{3,})$", re.IGNORECASE)
+_BULLET = re.compile(r"^(?:[-*•+]|\d+[.)])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _first_sentence(text: str) -> str:
+    return _SENTENCE_END.split(text, 1)[0]
+
+
+def truncate_to_budget(text: str, budget: int) -> str:
+    """Cut `text` to about `budget` tokens, at a paragraph or sentence break when one is close."""
+    if estimate_tokens(text) <= budget:
+        return text
+    cut = text[:budget * 4]
+    for separator in ("\n\n", "\n", ". "):
+        position = cut.rfind(separator)
+        if position > len(cut) // 2:
+            cut = cut[:position + (1 if separator == ". " else 0)]
+            break
+    return f"{cut.rstrip()}\n{TRIMMED_NOTE}"
+
+
+def compact_report(text: str, budget: int) -> str:
+    """
+    Compact a research report for the writer.
+
+    Drops blank, divider and agent-scaffolding lines and repeated lines, and
+    collapses whitespace. If that is still over budget, long lines are cut to
+    their first sentence before the report is truncated.
+    """
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        key = _BULLET.sub("", line.lstrip("#").strip()).lower()
+        if not line or _FILLER.match(line) or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    compact = "\n".join(lines)
+    if estimate_tokens(compact) > budget:
+        compact = "\n".join(_first_sentence(line) if len(line) > 200 else line for line in lines)
+    return truncate_to_budget(compact, budget)
+
+
+def outline(text: str, budget: int) -> str:
+    """
+    The post's headings and the lead sentence of each paragraph, which is
+    what the summarizer needs to write metadata. Posts within budget are
+    passed whole.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    parts = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        lines = [line.strip() for line in paragraph.strip().splitlines() if line.strip()]
+        while lines and lines[0].startswith("#"):
+            parts.append(lines.pop(0))
+        if lines:
+            parts.append(_first_sentence(" ".join(lines)))
+    return truncate_to_budget("\n".join(parts), budget)
+
+
+# How each stage's context is fitted to its budget.
+COMPACTORS = {
+    "writing": compact_report,
+    "summarizing": outline,
+}
+
+
+def budget_context(stage: str, text: str) -> str:
+    """Fit the upstream output handed to `stage` into that stage's budget."""
+    budget = CONTEXT_BUDGETS.get(stage)
+    if budget is None or not text:
+        return text
+    return COMPACTORS[stage](text, budget)
@@ -1,105 +1,429 @@
-import os
+import litellm
+import logging
+import threading
 import time
-from dotenv import load_dotenv, find_dotenv
+import uuid
+from datetime import date
+from typing import Any
 from crewai import Agent, Task, Crew, Process
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.agents.cache import CacheHandler
+from crewai.agents.tools_handler import ToolsHandler
 from crewai.llm import LLM
+from crewai.utilities.events.llm_events import LLMCallType
+from crewai.utilities.exceptions.context_window_exceeding_exception import LLMContextLengthExceededException
+from litellm.exceptions import ContextWindowExceededError
+from pydantic import PrivateAttr
+from .config import get_settings
+from .context_budget import budget_context
+from .deadlines import LLM_TIMEOUT, call_with_deadline, time_left
 from .tools.custom_tool import MyCustomTool
 from .tools.serpapi_tool import SerpAPITool
+from .observability import CONTEXT_TOKENS, LLM_LATENCY, LLM_TOKENS, STAGE_LATENCY, observe
+from .rate_limiter import estimate_tokens, get_limiter
+from .stage_cache import STAGES, stage_cache, stage_key
 
-dotenv_path = find_dotenv()
-if dotenv_path:
-    load_dotenv(dotenv_path)
-else:
-    load_dotenv()
-
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
-
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_API_KEY not found in environment variables")
-else:
-    print(f"Google API key loaded.")
-
-if not SERPAPI_API_KEY:
-    print("SERPAPI_API_KEY not found. Trend research will be limited.")
-    serpapi_available = False
-else:
-    print(f"SerpAPI key loaded.")
-    serpapi_available = True
-
-llm = LLM(
-    model="gemini/gemini-1.5-flash",
-    api_key=GOOGLE_API_KEY,
-    temperature=0.7,
-    max_retries=3,
-    timeout=120, 
-    request_delay=2, 
-)
+logger = logging.getLogger(__name__)
+
+class RateLimitedLLM(LLM):
+    """
+    CrewAI LLM that draws every call from the process-wide Gemini rate limiter
+    and records its latency under the calling task's stage.
+
+    Only the completion request itself runs under
+    `deadlines.call_with_deadline`, which gives every attempt the stage's
+    adaptive timeout and does the retrying (and optional hedging) that
+    litellm's fixed `max_retries` used to. Attempts skip litellm's logging
+    callbacks; token usage, call events and tool calls are handled once, on
+    the caller's thread, for the response that won, so an abandoned or
+    hedged attempt is never counted.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        stage = getattr(from_task, "name", None) or "other"
+        with observe(LLM_LATENCY, stage=stage):
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+    def _handle_non_streaming_response(self, params, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        stage = getattr(from_task, "name", None) or "other"
+
+        def attempt():
+            request = {**params, "no-log": True}
+            left = time_left()
+            if left is not None:
+                request["timeout"] = min(params.get("timeout") or left, left)
+            try:
+                return litellm.completion(**request)
+            except ContextWindowExceededError as e:
+                raise LLMContextLengthExceededException(str(e))
+
+        response = call_with_deadline(stage, attempt, limiter=get_limiter("gemini"), tokens=estimate_tokens(params["messages"]))
+
+        # From here on as in `LLM._handle_non_streaming_response`.
+        message = response.choices[0].message
+        text = message.content or ""
+        usage = getattr(response, "usage", None)
+        for callback in callbacks or []:
+            if usage and hasattr(callback, "log_success_event"):
+                callback.log_success_event(kwargs=params, response_obj={"usage": usage}, start_time=0, end_time=0)
+        tool_calls = getattr(message, "tool_calls", [])
+        if (not tool_calls or not available_functions) and text:
+            self._handle_emit_call_events(response=text, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent, messages=params["messages"])
+            return text
+        if tool_calls and not available_functions and not text:
+            return tool_calls
+        tool_result = self._handle_tool_call(tool_calls, available_functions)
+        if tool_result is not None:
+            return tool_result
+        self._handle_emit_call_events(response=text, call_type=LLMCallType.LLM_CALL, from_task=from_task, from_agent=from_agent, messages=params["messages"])
+        return text
+
+class BudgetedCrew(Crew):
+    """Crew that hands each task its context through `context_filter(stage, context)`."""
+
+    _context_filter: Any = PrivateAttr(default=None)
+
+    def _get_context(self, task, task_outputs) -> str:
+        context = super()._get_context(task, task_outputs)
+        if context and self._context_filter:
+            return self._context_filter(task.name, context)
+        return context
+
+llm = None
+_shared_tools = None
+_templates = None
+_factory_lock = threading.RLock()
+
+def get_llm() -> LLM:
+    """Return the process-wide Gemini LLM, building it on first use."""
+    global llm
+    with _factory_lock:
+        if llm is None:
+            llm = RateLimitedLLM(
+                model="gemini/gemini-1.5-flash",
+                api_key=get_settings().google_api_key,
+                temperature=0.7,
+                max_retries=0,
+                timeout=LLM_TIMEOUT,
+            )
+        return llm
+
+def get_shared_tools() -> tuple:
+    """
+    Return the process-wide `(rag_tool, serpapi_tool)` pair, building it on first use.
+
+    Neither tool keeps per-request state, so every crew can share one
+    instance and its embedding and HTTP clients. A tool that fails to
+    initialize is None.
+    """
+    global _shared_tools
+    with _factory_lock:
+        if _shared_tools is None:
+            settings = get_settings()
+            try:
+                rag_tool = MyCustomTool(api_key=settings.google_api_key)
+            except Exception as e:
+                logger.warning("RAG tool initialization failed: %s", e)
+                rag_tool = None
+
+            try:
+                serpapi_tool = SerpAPITool(api_key=settings.serpapi_api_key) if settings.serpapi_api_key else None
+            except Exception as e:
+                logger.warning("SerpAPI tool initialization failed: %s", e)
+                serpapi_tool = None
+            _shared_tools = (rag_tool, serpapi_tool)
+        return _shared_tools
+
+def _get_templates() -> dict:
+    """Validated Agent, Task and Crew instances that per-request copies are made from."""
+    global _templates
+    with _factory_lock:
+        if _templates is None:
+            agent = Agent(role="template", goal="template", backstory="template", llm=get_llm(), tools=[], verbose=True, allow_delegation=False)
+            task = Task(description="template", expected_output="template")
+            crew = BudgetedCrew(
+                agents=[agent],
+                tasks=[Task(description="template", expected_output="template", agent=agent)],
+                process=Process.sequential,
+                verbose=True,
+                memory=False
+            )
+            _templates = {"agent": agent, "task": task, "crew": crew}
+        return _templates
+
+def _instantiate(template, **fields):
+    """
+    Copy a template with `fields` filled in, skipping pydantic validation.
+
+    The copy gets its own id, its own copies of mutable containers and its
+    own token counter and tool-result cache, so concurrent crews never share
+    run state. Agents also get their own `tools_handler`, which
+    `Crew.set_cache_handler` would normally install during validation.
+    """
+    instance = template.model_copy(update={"id": uuid.uuid4(), **fields})
+    for name, value in instance.__dict__.items():
+        if name not in fields and isinstance(value, (list, set, dict)):
+            instance.__dict__[name] = type(value)(value)
+    private = instance.__pydantic_private__ or {}
+    if "_token_process" in private:
+        instance._token_process = TokenProcess()
+    if "_cache_handler" in private:
+        instance._cache_handler = CacheHandler()
+    if "tools_handler" in instance.__dict__:
+        cache_handler = CacheHandler() if instance.cache else None
+        instance.__dict__["cache_handler"] = cache_handler
+        instance.__dict__["tools_handler"] = ToolsHandler(cache=cache_handler)
+    return instance
 
 class BlogsCrew:
-    def __init__(self, topic: str, tone: str, target_audience: str):
+    def __init__(self, topic: str, tone: str, target_audience: str, use_cache: bool = True):
         self.topic = topic
         self.tone = tone
         self.target_audience = target_audience
+        self.use_cache = use_cache
         self.current_year = "2025"
-        self.request_count = 0
-        self.last_request_time = 0
-        
-        try:
-            self.rag_tool = MyCustomTool(api_key=GOOGLE_API_KEY)
-        except Exception as e:
-            print(f"Warning: RAG tool initialization failed: {e}")
-            self.rag_tool = None
-        
-        try:
-            if serpapi_available:
-                self.serpapi_tool = SerpAPITool(api_key=SERPAPI_API_KEY)
-            else:
-                self.serpapi_tool = None
-        except Exception as e:
-            print(f"Warning: SerpAPI tool initialization failed: {e}")
-            self.serpapi_tool = None
-
-    def _apply_rate_limiting(self):
-        """Apply rate limiting between API calls"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        min_delay = 2.0
-        if time_since_last_request < min_delay:
-            sleep_time = min_delay - time_since_last_request
-            print(f"Rate limiting: sleeping {sleep_time:.1f} seconds...")
-            time.sleep(sleep_time)
-        
-        if self.request_count > 0 and self.request_count % 5 == 0:
-            backoff_time = min(10, self.request_count * 0.5)  # Max 10 seconds
-            print(f"Progressive backoff: sleeping {backoff_time:.1f} seconds...")
-            time.sleep(backoff_time)
-        
-        self.request_count += 1
-        self.last_request_time = time.time()
+        self._on_kickoff = None
+        self._stage_plan = None
+        self._remembered = {}
+        self._stages = []
+        self.context_tokens = {}
+        self.rag_tool, self.serpapi_tool = get_shared_tools()
 
-    def _create_rate_limited_agent(self, role, goal, backstory, tools=None, verbose=True):
-        """Create an agent with rate limiting applied"""
-        return Agent(
+    def _create_rate_limited_agent(self, role, goal, backstory, tools=None):
+        """Create an agent whose LLM calls go through the shared Gemini rate limiter"""
+        return _instantiate(
+            _get_templates()["agent"],
             role=role,
             goal=goal,
             backstory=backstory,
-            llm=llm,
-            tools=tools or [],
-            verbose=verbose,
-            allow_delegation=False,
-            execution_callback=lambda: self._apply_rate_limiting()
+            agent_ops_agent_name=role,
+            tools=list(tools or [])
         )
 
-    def setup_crew(self):
-        self._apply_rate_limiting()
-        
+    def _create_task(self, description, expected_output, agent, context=None):
+        fields = {"description": description, "expected_output": expected_output, "agent": agent, "tools": list(agent.tools)}
+        if context is not None:
+            fields["context"] = context
+        return _instantiate(_get_templates()["task"], **fields)
+
+    def _attach_progress_callbacks(self, stages, event_callback):
+        """
+        Report crew progress through `event_callback(event, **data)`.
+
+        Emits `task_started` and `task_finished` (with timing and the agent's
+        token usage) for every stage, `tool_call` for each tool an agent
+        invokes, and `draft` with the full text as soon as the writer or
+        editor finishes. Callbacks fire on the thread running the crew.
+        """
+        started = {}
+
+        def start(index):
+            name, task = stages[index]
+            started[name] = time.perf_counter()
+            event_callback("task_started", task=name, agent=task.agent.role)
+
+        def task_finished(index):
+            def callback(output):
+                name, task = stages[index]
+                duration = time.perf_counter() - started.get(name, time.perf_counter())
+                token_process = getattr(task.agent, "_token_process", None)
+                usage = token_process.get_summary() if token_process else None
+                event_callback(
+                    "task_finished",
+                    task=name,
+                    agent=task.agent.role,
+                    duration=round(duration, 3),
+                    prompt_tokens=usage.prompt_tokens if usage else 0,
+                    completion_tokens=usage.completion_tokens if usage else 0,
+                )
+                if name in ("writing", "editing"):
+                    event_callback("draft", task=name, content=output.raw)
+                if index + 1 < len(stages):
+                    start(index + 1)
+            return callback
+
+        def step_callback(role):
+            def callback(step):
+                tool = getattr(step, "tool", None)
+                if tool:
+                    event_callback("tool_call", agent=role, tool=tool, input=str(getattr(step, "tool_input", ""))[:500])
+            return callback
+
+        for index, (_, task) in enumerate(stages):
+            task.callback = task_finished(index)
+            task.agent.step_callback = step_callback(task.agent.role)
+        self._on_kickoff = lambda: start(0)
+
+    def _stage_inputs(self, stage: str, upstream: str = None) -> tuple:
+        """Everything a stage's output depends on besides the agents' fixed prompts."""
+        topic = " ".join(self.topic.lower().split())
+        tone = " ".join(self.tone.lower().split())
+        audience = " ".join(self.target_audience.lower().split())
+        if stage == "research":
+            return (topic, self.current_year, date.today().isoformat())
+        if stage == "writing":
+            return (topic, tone, audience, upstream)
+        if stage == "editing":
+            return (tone, audience, upstream)
+        return (upstream,)
+
+    def plan_stages(self) -> int:
+        """
+        Find the first stage that has to run for this request.
+
+        Research is memoized per (topic, day) and every later stage on its own
+        parameters plus the previous stage's output, so stages are reused in
+        order until the first miss. Returns the index of that stage in
+        `STAGES`, or `len(STAGES)` when the whole pipeline is cached. With
+        `use_cache` off nothing is looked up and every stage runs, though
+        the fresh outputs still refresh the cache.
+        """
+        if self._stage_plan is None:
+            upstream = None
+            start = 0
+            for stage in STAGES if self.use_cache else ():
+                cached = stage_cache.get(stage_key(stage, *self._stage_inputs(stage, upstream)))
+                if cached is None:
+                    break
+                self._remembered[stage] = upstream = cached
+                start += 1
+            self._stage_plan = (start, upstream)
+        return self._stage_plan[0]
+
+    def _remember_stage(self, stage: str, output: str):
+        """
+        Memoize one stage's output. Called as soon as each task finishes, so
+        other requests (e.g. the rest of a batch on the same topic) can reuse
+        the research while this crew is still writing.
+        """
+        if stage in self._remembered:
+            return
+        index = STAGES.index(stage)
+        upstream = self._remembered.get(STAGES[index - 1]) if index else None
+        if index and upstream is None:
+            return
+        stage_cache.put(stage_key(stage, *self._stage_inputs(stage, upstream)), output)
+        self._remembered[stage] = output
+
+    def _memoizing(self, stage: str, callback):
+        """Wrap a task callback so the stage's output is memoized before anyone hears it finished."""
+        def wrapper(output):
+            self._remember_stage(stage, output.raw)
+            return callback(output)
+        return wrapper
+
+    def _remember_stage_outputs(self, result):
+        start = self._stage_plan[0]
+        for stage, output in zip(STAGES[start:], getattr(result, "tasks_output", [])):
+            self._remember_stage(stage, output.raw)
+
+    def _budget_context(self, stage: str, context: str) -> str:
+        """Fit a stage's upstream context to its token budget and record both sizes."""
+        passed = budget_context(stage, context)
+        raw_tokens, passed_tokens = estimate_tokens(context), estimate_tokens(passed)
+        self.context_tokens[stage] = {"raw": raw_tokens, "passed": passed_tokens}
+        CONTEXT_TOKENS.labels(stage=stage, kind="raw").inc(raw_tokens)
+        CONTEXT_TOKENS.labels(stage=stage, kind="passed").inc(passed_tokens)
+        if passed_tokens < raw_tokens:
+            logger.info("Compacted %s context from ~%d to ~%d tokens", stage, raw_tokens, passed_tokens)
+        return passed
+
+    def edited_post(self):
+        """The editor's final post, run or cached, which the API returns as `full_content`."""
+        return self._remembered.get("editing")
+
+    def token_report(self) -> dict:
+        """
+        Per-stage token counts for this request: the provider-reported prompt
+        and completion tokens of every stage that ran, and the estimated
+        upstream context each stage was given before and after budgeting.
+        Stages served from the stage cache are marked `cached`.
+        """
+        ran = dict(self._stages)
+        report = {}
+        for stage in STAGES:
+            task = ran.get(stage)
+            if task is None:
+                report[stage] = {"cached": stage in self._remembered}
+                continue
+            token_process = getattr(task.agent, "_token_process", None)
+            usage = token_process.get_summary() if token_process else None
+            context = self.context_tokens.get(stage, {"raw": 0, "passed": 0})
+            report[stage] = {
+                "cached": False,
+                "prompt_tokens": usage.prompt_tokens if usage else 0,
+                "completion_tokens": usage.completion_tokens if usage else 0,
+                "context_tokens_raw": context["raw"],
+                "context_tokens": context["passed"],
+            }
+        return report
+
+    def _instrumented(self, event_callback=None):
+        """Wrap `event_callback` so every finished stage is also logged and recorded in metrics."""
+        def callback(event, **data):
+            if event == "task_finished":
+                STAGE_LATENCY.labels(stage=data["task"]).observe(data["duration"])
+                LLM_TOKENS.labels(stage=data["task"], kind="prompt").inc(data["prompt_tokens"])
+                LLM_TOKENS.labels(stage=data["task"], kind="completion").inc(data["completion_tokens"])
+                logger.info(
+                    "Stage %s finished in %.2fs (%d prompt / %d completion tokens)",
+                    data["task"], data["duration"], data["prompt_tokens"], data["completion_tokens"],
+                )
+            elif event == "tool_call":
+                logger.info("%s called %s", data["agent"], data["tool"])
+            if event_callback:
+                event_callback(event, **data)
+        return callback
+
+    def kickoff(self, crew: Crew):
+        """
+        Run a crew built by `setup_crew`, announcing its first stage to the event
+        callback and memoizing each stage's output. `crew` is None when every
+        stage was cached, in which case the cached summary is returned as is.
+        """
+        if crew is None:
+            return self._stage_plan[1]
+        if self._on_kickoff:
+            self._on_kickoff()
+        result = crew.kickoff()
+        self._remember_stage_outputs(result)
+        return result
+
+    def setup_crew(self, research_context: str = None, event_callback=None):
+        """
+        Build the crew for this request.
+
+        Args:
+            research_context: Search results gathered up front by
+                `research.prefetch_research`. When given, the researcher analyzes
+                them directly instead of issuing its own searches one by one.
+            event_callback: Optional `callback(event, **data)` receiving
+                task, tool-call and draft events while the crew runs.
+
+        Stages whose output is already memoized (see `plan_stages`) are left
+        out and the first remaining task gets the cached output inline, so the
+        crew starts at the first stage whose inputs changed. Returns None when
+        every stage is cached.
+
+        Whatever a task receives from the previous stage, inline or as crew
+        context, is first fitted to that stage's token budget (see
+        `context_budget`): research is compacted for the writer and the
+        summarizer gets an outline of long posts. The editor always gets the
+        whole draft, since its output is returned as the post. The summarizer only writes
+        metadata; the edited post is attached by the caller via `edited_post`.
+        """
+        start = self.plan_stages()
+        if start == len(STAGES):
+            logger.info("Every stage is cached; skipping the crew.")
+            if event_callback:
+                for stage in STAGES:
+                    event_callback("task_cached", task=stage)
+            return None
+
         researcher_tools = []
         if self.serpapi_tool:
             researcher_tools.append(self.serpapi_tool)
         
-        print("Creating researcher agent...")
         researcher = self._create_rate_limited_agent(
             role=f'{self.topic} Trend Researcher',
             goal=f'Identify trending and highly engaging developments in {self.topic} that would make for compelling blog content in {self.current_year}.',
@@ -109,14 +433,12 @@ class BlogsCrew:
             real-time trending information, recent news, and popular discussions around your topic.""",
             tools=researcher_tools
         )
-        time.sleep(1)
         
         writer_tools = [self.rag_tool] if self.rag_tool else []
         writer_backstory = """You are a seasoned blog writer who creates compelling content that educates and engages readers. 
         You know how to structure articles for maximum readability and impact. When using the RAG Search Tool, 
         pass simple, clear search queries as strings to find relevant examples and style guides."""
         
-        print("Creating writer agent...")
         writer = self._create_rate_limited_agent(
             role=f'{self.topic} Expert Content Creator',
             goal=f'Write an insightful, well-structured, and engaging blog post about {self.topic} using a {self.tone} tone for {self.target_audience}.',
@@ -124,26 +446,35 @@ class BlogsCrew:
             tools=writer_tools
         )
         
-        time.sleep(1)
-        
-        print("Creating editor agent...")
         editor = self._create_rate_limited_agent(
             role=f'{self.topic} Content Editor',
             goal='Review and refine the blog post for clarity, flow, grammar, and engagement while maintaining the intended tone.',
             backstory="You are a grammar purist and content strategist who ensures every piece of content meets the highest editorial standards. You improve readability and ensure the message resonates with the target audience."
         )
         
-        time.sleep(1)
-        
-        print("Creating summarizer agent...")
         summarizer = self._create_rate_limited_agent(
             role=f'{self.topic} SEO and Marketing Specialist',
             goal='Create concise, compelling metadata and summaries that will help the blog post perform well on social media and search engines.',
             backstory="You are an expert in digital marketing and SEO who knows how to craft titles, descriptions, and hashtags that drive engagement and discoverability."
         )
 
-        research_task = Task(
-            description=f"""Research current trends and developments related to: {self.topic}
+        if research_context:
+            research_description = f"""Research current trends and developments related to: {self.topic}
+            
+            The searches below have already been run for you. Analyze them first and only use the
+            Search Trends Tool if they leave an important gap.
+            
+            {research_context}
+            
+            Analyze the results to identify:
+            - What's currently trending and why
+            - What angles would be most engaging for readers
+            - Recent developments that would make compelling blog content
+            - Questions and pain points your audience has
+            
+            Focus on finding a specific, compelling angle that would make readers want to click and read."""
+        else:
+            research_description = f"""Research current trends and developments related to: {self.topic}
             
             Use the Search Trends Tool to find:
             1. Recent news and developments about {self.topic}
@@ -159,13 +490,16 @@ class BlogsCrew:
             
             Analyze the results to identify:
             - What's currently trending and why
-            - What angles would be most engaging for {self.target_audience}
+            - What angles would be most engaging for readers
             - Recent developments that would make compelling blog content
             - Questions and pain points your audience has
             
             Focus on finding a specific, compelling angle that would make readers want to click and read.
             
-            IMPORTANT: Take breaks between API calls to avoid rate limits.""",
+            IMPORTANT: Take breaks between API calls to avoid rate limits."""
+
+        research_task = self._create_task(
+            description=research_description,
             expected_output="""A comprehensive research report including:
             - 3-5 trending angles or developments related to the topic
             - Key questions people are asking
@@ -175,7 +509,7 @@ class BlogsCrew:
             agent=researcher
         )
         
-        writing_task = Task(
+        writing_task = self._create_task(
             description=f"""Using the research findings, write a full blog post about {self.topic}.
             The tone should be {self.tone} and aimed at {self.target_audience}.
             
@@ -200,7 +534,7 @@ class BlogsCrew:
             context=[research_task]
         )
         
-        editing_task = Task(
+        editing_task = self._create_task(
             description=f"""Review the provided blog post and improve it for:
             - Grammar and spelling accuracy
             - Clarity and readability
@@ -218,27 +552,50 @@ class BlogsCrew:
             context=[writing_task]
         )
         
-        summarizing_task = Task(
-            description="""From the final edited blog post, generate SEO-friendly metadata including:
+        summarizing_task = self._create_task(
+            description="""From the final edited blog post (given as an outline of its headings and key
+            sentences when it is long), generate SEO-friendly metadata including:
             - A compelling, SEO-optimized title (under 60 characters)
             - A meta description (under 160 characters) that highlights trending aspects
             - 5-8 relevant hashtags including trending ones
             - A brief summary (2-3 sentences)
             
-            Format the output as a JSON object with keys: title, meta_description, hashtags, summary, and full_content.
+            Format the output as a JSON object with keys: title, meta_description, hashtags and summary.
+            Do not repeat the post itself; it is attached to your metadata automatically.
             
             IMPORTANT: Generate this efficiently in a single response.""",
-            expected_output='A JSON object with keys: title, meta_description, hashtags, summary, and full_content containing all the blog metadata and content.',
+            expected_output='A JSON object with keys: title, meta_description, hashtags and summary.',
             agent=summarizer,
             context=[editing_task]
         )
 
-        print("Creating crew with rate-limited agents...")
-        return Crew(
-            agents=[researcher, writer, editor, summarizer],
-            tasks=[research_task, writing_task, editing_task, summarizing_task],
-            process=Process.sequential,
-            verbose=True,
-            max_execution_time=300, 
-            memory=False
-        )
\ No newline at end of file
+        stages = list(zip(STAGES, [research_task, writing_task, editing_task, summarizing_task]))
+        for stage, task in stages:
+            task.name = stage
+        stages = stages[start:]
+        if start:
+            cached_output = self._budget_context(STAGES[start], self._stage_plan[1])
+            first_task = stages[0][1]
+            first_task.description += f"""
+            
+            Output of the previous ({STAGES[start - 1]}) stage:
+            
+            {cached_output}"""
+            first_task.context = None
+            logger.info("Reusing cached output for stages: %s", ", ".join(STAGES[:start]))
+
+        if event_callback:
+            for stage in STAGES[:start]:
+                event_callback("task_cached", task=stage)
+        self._attach_progress_callbacks(stages, self._instrumented(event_callback))
+        for stage, task in stages:
+            task.callback = self._memoizing(stage, task.callback)
+        self._stages = stages
+
+        crew = _instantiate(
+            _get_templates()["crew"],
+            agents=[task.agent for _, task in stages],
+            tasks=[task for _, task in stages]
+        )
+        crew._context_filter = self._budget_context
+        return crew
\ No newline at end of file
@@ -0,0 +1,244 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from .observability import LLM_HEDGES, LLM_TIMEOUTS, RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Default end-to-end budget of one blog request, and the LLM timeout used
+# until a stage has enough samples to learn its own (also its ceiling).
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "300"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_MIN_TIMEOUT = float(os.getenv("LLM_MIN_TIMEOUT", "10"))
+LLM_TIMEOUT_MULTIPLIER = float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "1"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() not in ("0", "false", "no")
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "200"))
+LATENCY_MIN_SAMPLES = int(os.getenv("LATENCY_MIN_SAMPLES", "20"))
+LLM_ATTEMPT_WORKERS = int(os.getenv("LLM_ATTEMPT_WORKERS", "32"))
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline, or one attempt's timeout, passed before the work finished."""
+
+
+@contextmanager
+def deadline(seconds: float, inherit: bool = True):
+    """
+    Run the block under a deadline `seconds` from now, or under the enclosing
+    deadline if that one is sooner. With `inherit=False` the enclosing one is
+    ignored, for work shared by requests with different deadlines.
+
+    The deadline lives in a context variable, so it follows the request into
+    tasks and `asyncio.to_thread` calls, including the thread running the crew.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get() if inherit else None
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline, or None outside of one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def check_deadline(what: str = "call"):
+    """Raise `DeadlineExceeded` if the current deadline has passed."""
+    left = time_left()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline passed before the {what} could run")
+
+
+class LatencyTracker:
+    """
+    Recent LLM call latencies per stage, and the timeouts derived from them.
+
+    Keeps the last `window` samples of each stage. Once a stage has
+    `LATENCY_MIN_SAMPLES`, its attempt timeout is `LLM_TIMEOUT_MULTIPLIER`
+    times its p99, clamped to [`LLM_MIN_TIMEOUT`, `LLM_TIMEOUT`], and a hedge
+    fires after its p95. Attempts that time out are recorded at their timeout,
+    so a stage whose upstream really slows down raises its own timeout
+    instead of timing out over and over.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+            self._samples[stage].append(seconds)
+
+    def percentile(self, stage: str, q: float) -> Optional[float]:
+        """Nearest-rank percentile of the stage's recent latencies; None until there are enough."""
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < max(1, LATENCY_MIN_SAMPLES):
+            return None
+        return samples[min(len(samples) - 1, max(0, round(q / 100 * len(samples)) - 1))]
+
+    def timeout(self, stage: str) -> float:
+        p99 = self.percentile(stage, 99)
+        if p99 is None:
+            return LLM_TIMEOUT
+        return min(LLM_TIMEOUT, max(LLM_MIN_TIMEOUT, p99 * LLM_TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, stage: str) -> Optional[float]:
+        return self.percentile(stage, 95)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stages = list(self._samples)
+        return {
+            stage: {
+                "samples": len(self._samples[stage]),
+                "p50": self.percentile(stage, 50),
+                "p95": self.percentile(stage, 95),
+                "p99": self.percentile(stage, 99),
+                "timeout": self.timeout(stage),
+            }
+            for stage in stages
+        }
+
+
+latency_tracker = LatencyTracker()
+
+
+# Shared by every LLM call. An abandoned attempt keeps its worker until its
+# own timeout ends it; queued ones are cancelled or skip the request.
+_attempt_pool = ThreadPoolExecutor(max_workers=LLM_ATTEMPT_WORKERS, thread_name_prefix="llm-attempt")
+
+
+def _start(attempt: Callable, timeout: float) -> Future:
+    """
+    Run `attempt()` on the shared attempt pool under a deadline `timeout`
+    from now. Time spent queued for a worker counts against it, and an
+    attempt that only gets a worker after its deadline never runs.
+    """
+    at = time.monotonic() + timeout
+    context = contextvars.copy_context()
+
+    def run():
+        with deadline(at - time.monotonic()):
+            check_deadline("LLM attempt")
+            return attempt()
+
+    return _attempt_pool.submit(context.run, run)
+
+
+def _race(stage: str, attempt: Callable, timeout: float, hedge_after: Optional[float], admit_hedge: Callable[[], bool]):
+    """
+    One attempt, plus a hedge if it is still running after `hedge_after` and
+    `admit_hedge()` allows it.
+
+    Returns the first successful result. The slower request is abandoned:
+    it cannot be interrupted mid-request, but its own timeout ends it and its
+    result is dropped, so `attempt` should leave any bookkeeping for the
+    caller to do on the result it gets back.
+    """
+    start = time.monotonic()
+    primary = _start(attempt, timeout)
+    started = {primary: start}
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait([primary], timeout=hedge_after)
+        if not done and admit_hedge():
+            started[_start(attempt, timeout - hedge_after)] = time.monotonic()
+
+    pending, error = set(started), None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, start + timeout - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            for loser in pending:
+                loser.cancel()
+            latency_tracker.observe(stage, time.monotonic() - started[future])
+            if len(started) > 1:
+                LLM_HEDGES.labels(stage=stage, winner="primary" if future is primary else "hedge").inc()
+            return future.result()
+
+    if not pending:
+        raise error
+    latency_tracker.observe(stage, timeout)
+    LLM_TIMEOUTS.labels(stage=stage).inc()
+    raise DeadlineExceeded(f"{stage} LLM call timed out after {timeout:.1f}s")
+
+
+def _retryable(error: BaseException) -> bool:
+    import litellm
+
+    return isinstance(error, (
+        TimeoutError,
+        litellm.Timeout,
+        litellm.RateLimitError,
+        litellm.APIConnectionError,
+        litellm.InternalServerError,
+        litellm.ServiceUnavailableError,
+    ))
+
+
+def call_with_deadline(stage: str, attempt: Callable, hedge: Optional[bool] = None, limiter=None, tokens: int = 0):
+    """
+    Run `attempt()`, one LLM request, within the current deadline.
+
+    When `limiter` is given, each try first waits for its capacity (`tokens`
+    tokens) outside the timed attempt, so queueing for quota is neither
+    recorded as upstream latency nor cut short by the attempt timeout. A
+    hedge is only sent if the limiter has capacity free at that moment.
+
+    Each try gets the stage's adaptive timeout (see `LatencyTracker`), cut to
+    the time left, and runs with that as its own deadline, which the
+    attempt should hand to the HTTP client. Timeouts, 429s and connection
+    errors are retried while time is left, up to `LLM_MAX_ATTEMPTS` tries;
+    other errors propagate at once. With `hedge` (default `LLM_HEDGE`) a
+    second, identical request fires once the first has run past the stage's
+    p95, and whichever answers first wins.
+
+    Raises:
+        DeadlineExceeded: When the request's deadline passes, or the last
+            try times out
+    """
+    hedge = LLM_HEDGE if hedge is None else hedge
+    admit_hedge = (lambda: limiter.try_acquire(tokens)) if limiter else (lambda: True)
+    for number in range(1, LLM_MAX_ATTEMPTS + 1):
+        check_deadline(f"{stage} LLM call")
+        if limiter:
+            limiter.acquire(tokens)
+            check_deadline(f"{stage} LLM call")
+        timeout = latency_tracker.timeout(stage)
+        left = time_left()
+        if left is not None:
+            timeout = min(timeout, left)
+        try:
+            return _race(stage, attempt, timeout, latency_tracker.hedge_delay(stage) if hedge else None, admit_hedge)
+        except Exception as e:
+            if not _retryable(e) or number == LLM_MAX_ATTEMPTS:
+                raise
+            delay = 0.0 if isinstance(e, TimeoutError) else LLM_RETRY_BACKOFF * 2 ** (number - 1)
+            left = time_left()
+            if left is not None and left <= delay:
+                raise DeadlineExceeded(f"Deadline passed while retrying the {stage} LLM call: {e}") from e
+            logger.warning("%s LLM call failed (%s); retrying in %.1fs (attempt %d/%d)", stage, e, delay, number + 1, LLM_MAX_ATTEMPTS)
+            RETRIES.labels(upstream="gemini").inc()
+            time.sleep(delay)
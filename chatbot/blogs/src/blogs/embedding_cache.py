@@ -0,0 +1,276 @@
+import asyncio
+import fcntl
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from .rate_limiter import RateLimiter, get_limiter
+from .singleflight import get_flight
+
+EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+
+
+def embedding_key(model: str, kind: str, text: str) -> str:
+    """Cache key for a text embedded by `model` as a query or a document."""
+    return hashlib.sha256(f"{model}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Append-only on-disk embedding store for a single model.
+
+    Vectors live in `vectors.f32` as a raw float32 matrix that is read through a
+    memory map, and `keys.txt` maps each key to its row. Appends take an
+    exclusive file lock so several worker processes can share one store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.keys_path = os.path.join(path, "keys.txt")
+        self.lock_path = os.path.join(path, ".lock")
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._dim = None
+        self._keys_offset = 0
+        self._matrix = None
+        self._refresh()
+
+    def _refresh(self):
+        """Pick up rows appended since the last read, possibly by another process."""
+        if not os.path.exists(self.keys_path) or os.path.getsize(self.keys_path) == self._keys_offset:
+            return
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                key, row, dim = line.split()
+                self._rows[key] = int(row)
+                self._dim = int(dim)
+                self._keys_offset += len(line.encode("utf-8"))
+
+    def _vectors(self, row: int):
+        """The memory-mapped vectors, re-mapped only once `row` lies past the rows mapped so far."""
+        if self._dim and (self._matrix is None or row >= self._matrix.shape[0]) and os.path.getsize(self.vectors_path):
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, self._dim)
+        return self._matrix
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            if key not in self._rows:
+                self._refresh()
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            matrix = self._vectors(row)
+            if matrix is None or row >= matrix.shape[0]:
+                return None
+            return matrix[row].tolist()
+
+    def put_many(self, items):
+        """Append `(key, vector)` pairs that are not stored yet."""
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                pending = [(key, vector) for key, vector in items if key not in self._rows]
+                if not pending:
+                    return
+                dim = self._dim or len(pending[0][1])
+                matrix = np.asarray([vector for _, vector in pending], dtype=np.float32)
+                if matrix.shape[1] != dim:
+                    raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {dim}")
+                with open(self.vectors_path, "ab") as f:
+                    first_row = f.tell() // (dim * 4)
+                    f.write(matrix.tobytes())
+                with open(self.keys_path, "a", encoding="utf-8") as f:
+                    for offset, (key, _) in enumerate(pending):
+                        f.write(f"{key} {first_row + offset} {dim}\n")
+                self._refresh()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class EmbeddingCache:
+    """Bounded in-memory LRU in front of per-model on-disk embedding stores."""
+
+    def __init__(self, path: Optional[str] = EMBEDDING_CACHE_DIR, max_size: int = EMBEDDING_CACHE_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._stores = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _store(self, model: str) -> Optional[EmbeddingStore]:
+        if not self.path:
+            return None
+        with self._lock:
+            if model not in self._stores:
+                slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+                self._stores[model] = EmbeddingStore(os.path.join(self.path, slug))
+            return self._stores[model]
+
+    def _remember(self, key: str, vector: List[float]):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    def get(self, model: str, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        store = self._store(model)
+        vector = store.get(key) if store is not None else None
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, vector)
+        return vector
+
+    def put_many(self, model: str, items):
+        items = list(items)
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+        store = self._store(model)
+        if store is not None:
+            store.put_many(items)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._lru),
+                "disk_entries": sum(len(store) for store in self._stores.values()),
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper that serves repeated texts from an `EmbeddingCache`.
+
+    Query and document embeddings are cached separately because embedding
+    models may encode the two differently. Only cache misses reach the
+    wrapped model, and each of those requests first takes a slot from
+    `limiter` when one is given. Concurrent requests for the same misses
+    (the same query, or the same batch of documents) share one upstream call.
+    The async methods read and write the on-disk store in a worker thread, so
+    disk I/O and the store's file lock never block the event loop.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: Optional[EmbeddingCache] = None, limiter: Optional[RateLimiter] = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache or embedding_cache
+        self.limiter = limiter
+
+    def _lookup(self, texts: List[str], kind: str):
+        """Return cached vectors (None for misses) and the misses grouped by key."""
+        keys = [embedding_key(self.model, kind, text) for text in texts]
+        vectors = [self.cache.get(self.model, key) for key in keys]
+        missing = {}
+        for index, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[index], []).append(index)
+        return vectors, missing
+
+    def _flight_key(self, missing: dict) -> tuple:
+        return (self.model, *missing)
+
+    def _fill(self, vectors, missing: dict, fresh) -> List[List[float]]:
+        for indexes, vector in zip(missing.values(), fresh):
+            for index in indexes:
+                vectors[index] = vector
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._lookup(texts, "document")
+        if not missing:
+            return vectors
+
+        def fetch():
+            if self.limiter:
+                self.limiter.acquire()
+            fresh = self.embeddings.embed_documents([texts[indexes[0]] for indexes in missing.values()])
+            self.cache.put_many(self.model, zip(missing.keys(), fresh))
+            return fresh
+
+        return self._fill(vectors, missing, get_flight("embeddings").do(self._flight_key(missing), fetch))
+
+    def embed_query(self, text: str) -> List[float]:
+        vectors, missing = self._lookup([text], "query")
+        if not missing:
+            return vectors[0]
+
+        def fetch():
+            if self.limiter:
+                self.limiter.acquire()
+            fresh = [self.embeddings.embed_query(text)]
+            self.cache.put_many(self.model, zip(missing.keys(), fresh))
+            return fresh
+
+        return self._fill(vectors, missing, get_flight("embeddings").do(self._flight_key(missing), fetch))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = await asyncio.to_thread(self._lookup, texts, "document")
+        if not missing:
+            return vectors
+
+        async def fetch():
+            if self.limiter:
+                await self.limiter.acquire_async()
+            fresh = await self.embeddings.aembed_documents([texts[indexes[0]] for indexes in missing.values()])
+            await asyncio.to_thread(self.cache.put_many, self.model, zip(missing.keys(), fresh))
+            return fresh
+
+        return self._fill(vectors, missing, await get_flight("embeddings").ado(self._flight_key(missing), fetch))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vectors, missing = await asyncio.to_thread(self._lookup, [text], "query")
+        if not missing:
+            return vectors[0]
+
+        async def fetch():
+            if self.limiter:
+                await self.limiter.acquire_async()
+            fresh = [await self.embeddings.aembed_query(text)]
+            await asyncio.to_thread(self.cache.put_many, self.model, zip(missing.keys(), fresh))
+            return fresh
+
+        return self._fill(vectors, missing, await get_flight("embeddings").ado(self._flight_key(missing), fetch))[0]
+
+
+embedding_cache = EmbeddingCache()
+
+
+def get_embedding_model(api_key: str, model: str = EMBEDDING_MODEL) -> CachedEmbeddings:
+    """Google embedding client wrapped in the process-wide embedding cache."""
+    return CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model=model, google_api_key=api_key),
+        model=model,
+        limiter=get_limiter("embeddings")
+    )
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+from .observability import trace_id_var
+
+logger = logging.getLogger(__name__)
+
+# Kept next to the package rather than in the working directory, so every
+# start of the server finds the same queue.
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "20"))
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobStore:
+    """SQLite-backed record of every job, so statuses and results survive a restart."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or JOBS_DB_PATH, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            self._db.commit()
+            return cursor
+
+    def create(self, request: dict) -> str:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, status, request, created_at) VALUES (?, 'queued', ?, ?)",
+            (job_id, json.dumps(request), time.time()),
+        )
+        return job_id
+
+    def mark_running(self, job_id: str):
+        self._execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def mark_succeeded(self, job_id: str, result):
+        self._execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE id = ?",
+            (json.dumps(result, default=str), time.time(), job_id),
+        )
+
+    def mark_failed(self, job_id: str, error: str):
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+            (error, time.time(), job_id),
+        )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> list:
+        """Jobs that were queued or running when the process last stopped, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, request FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [(row["id"], json.loads(row["request"])) for row in rows]
+
+
+class JobManager:
+    """
+    Bounded worker pool that runs blog generations in the background.
+
+    `submit` enqueues a request and returns immediately with a job id; it
+    raises `JobQueueFull` instead of queueing more than `queue_depth` jobs so
+    the API can push back with a 429. `concurrency` workers pull jobs off the
+    queue and run them with `runner`, recording progress in the `JobStore`.
+    Without a `store`, each `start` opens one at `JOBS_DB_PATH` and `stop`
+    closes it.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[dict], Awaitable],
+        store: Optional[JobStore] = None,
+        concurrency: int = JOB_CONCURRENCY,
+        queue_depth: int = JOB_QUEUE_DEPTH,
+    ):
+        self.runner = runner
+        self.store = store
+        self._owns_store = store is None
+        self.concurrency = concurrency
+        self.queue_depth = queue_depth
+        self._queue = None
+        self._workers = []
+
+    async def start(self):
+        """Start the workers and requeue jobs left unfinished by a previous run."""
+        if self._owns_store:
+            self.store = JobStore()
+        self._queue = asyncio.Queue()
+        for job_id, request in self.store.unfinished():
+            self._queue.put_nowait((job_id, request))
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._owns_store and self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def submit(self, request: dict) -> str:
+        if self._queue.qsize() >= self.queue_depth:
+            raise JobQueueFull(f"Job queue is full ({self.queue_depth} jobs waiting). Try again later.")
+        job_id = self.store.create(request)
+        self._queue.put_nowait((job_id, request))
+        return job_id
+
+    async def _worker(self):
+        while True:
+            job_id, request = await self._queue.get()
+            trace_id_var.set(job_id[:16])
+            try:
+                self.store.mark_running(job_id)
+                result = await self.runner(request)
+                self.store.mark_succeeded(job_id, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed: %s", job_id, e)
+                self.store.mark_failed(job_id, getattr(e, "detail", None) or str(e))
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_depth": self.queue_depth,
+            "concurrency": self.concurrency,
+        }
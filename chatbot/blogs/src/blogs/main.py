@@ -1,18 +1,103 @@
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from .crew import BlogsCrew
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from .batch import BATCH_CONCURRENCY, BATCH_MAX_ITEMS, BatchRunner
+from .config import get_settings
+from .deadlines import REQUEST_TIMEOUT, DeadlineExceeded, deadline, time_left
+from .jobs import JobManager, JobQueueFull
+from .observability import REQUEST_LATENCY, configure_logging, new_trace_id, render_metrics, trace_id_var
+from .output_parser import parse_crew_result
 from .prompt_parser import PromptFormatter
-from langchain_google_genai import ChatGoogleGenerativeAI 
-import traceback
+from .research import prefetch_research
+from .singleflight import get_flight
+from .streaming import CrewEventStream, format_sse
 import asyncio
-import json
+import logging
 import os
+import time
 
+# CrewAI, LangChain and FAISS take seconds to import, so they are imported
+# where they are used and preloaded by `warm_up` during startup instead of
+# on import, which keeps `import blogs.main` and worker spawn fast.
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+WARM_UP = os.getenv("WARM_UP", "true").lower() not in ("0", "false", "no")
+
+
+async def run_blog_job(request: dict):
+    return await generate_blog(BlogGenerationRequest(**request))
+
+job_manager = JobManager(runner=run_blog_job)
+
+def warm_up() -> dict:
+    """
+    Import the heavy dependencies and build the process-wide clients: the
+    crew's LLM, tools and templates, the SerpAPI HTTP pool and the RAG FAISS
+    index. Returns the seconds each step took.
+    """
+    from .crew import _get_templates, get_llm, get_shared_tools
+    from .tools.custom_tool import DB_SAVE_PATH
+    from .tools.index_cache import index_cache
+    from .tools.serpapi_tool import get_async_client
+
+    timings = {}
+
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    step("llm", get_llm)
+    step("tools", get_shared_tools)
+    step("crew_templates", _get_templates)
+    step("serpapi_client", get_async_client)
+    rag_tool = get_shared_tools()[0]
+    if rag_tool is not None and os.path.exists(DB_SAVE_PATH):
+        step("faiss_index", lambda: index_cache.get(DB_SAVE_PATH, rag_tool.embedding_model))
+    return timings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    settings = get_settings()
+    app.state.settings = settings
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    # One formatter client for the app's lifetime, so requests share its connection pool.
+    app.state.formatter_llm = ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        google_api_key=settings.google_api_key
+    )
+    app.state.prompt_formatter = PromptFormatter(llm=app.state.formatter_llm)
+
+    from .blog_cache import blog_cache
+    from .embedding_cache import get_embedding_model
+    blog_cache.embeddings = get_embedding_model(settings.google_api_key)
+    if WARM_UP:
+        # Runs on the loop thread: the Google clients need a current event loop
+        # when they are built, and nothing is being served yet anyway.
+        timings = warm_up()
+        logger.info("Warm-up finished: %s", ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    await job_manager.start()
+    logger.info("Worker ready in %.2fs", time.perf_counter() - start)
+    yield
+    await job_manager.stop()
+    from .tools.serpapi_tool import close_async_client
+    await close_async_client()
 
 app = FastAPI(
     title="AI Social Blogging App Backend",
-    description="An API for generating blog posts using a CrewAI multi-agent system."
+    description="An API for generating blog posts using a CrewAI multi-agent system.",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -27,26 +112,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Give each request a trace id (reusing an incoming X-Request-ID) that is
+    stamped on its log lines and returned as X-Trace-Id, and record its
+    latency. Streaming responses are timed to their first byte.
+
+    The request's deadline starts here: `REQUEST_TIMEOUT` from arrival, or
+    sooner if the client sends X-Request-Timeout (seconds). Everything the
+    request runs sees it, down to each LLM call.
+    """
+    trace_id = request.headers.get("X-Request-ID") or new_trace_id()
+    token = trace_id_var.set(trace_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        timeout = float(request.headers.get("X-Request-Timeout") or REQUEST_TIMEOUT)
+    except ValueError:
+        timeout = REQUEST_TIMEOUT
+    try:
+        with deadline(timeout):
+            response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Trace-Id"] = trace_id
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_LATENCY.labels(method=request.method, route=route, status=str(status)).observe(time.perf_counter() - start)
+        trace_id_var.reset(token)
+
 class BlogGenerationRequest(BaseModel):
     topic: str
     tone: str = "professional"
     target_audience: str = "a general audience"
+    use_cache: bool = True
+
+class BatchGenerationRequest(BaseModel):
+    items: List[BlogGenerationRequest] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = Field(default=None, ge=1)
 
 class FreestylePromptRequest(BaseModel):
     prompt: str
 
-app = FastAPI(
-    title="AI Social Blogging App Backend",
-    description="An API for generating blog posts using a CrewAI multi-agent system."
-)
-
-def get_prompt_formatter():
-    return PromptFormatter(
-        llm=ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
-    )
+def get_prompt_formatter(request: Request):
+    return request.app.state.prompt_formatter
 
 @app.get("/")
 def read_root():
@@ -58,8 +168,8 @@ async def generate_blog_from_prompt(
     formatter: PromptFormatter = Depends(get_prompt_formatter)
 ):
     try:
-        print(f"Received freestyle prompt: '{request.prompt}'")
-        structured_input = formatter.format_prompt(request.prompt)
+        logger.info("Received freestyle prompt: '%s'", request.prompt)
+        structured_input = await formatter.aformat_prompt(request.prompt)
 
         crew_request = BlogGenerationRequest(
             topic=structured_input.topic,
@@ -72,47 +182,192 @@ async def generate_blog_from_prompt(
     except ValueError as ve:
          raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
-        print(f"An error occurred during prompt formatting or crew execution: {e}")
-        traceback.print_exc()
+        logger.exception("An error occurred during prompt formatting or crew execution: %s", e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
 
+async def produce_blog(request: BlogGenerationRequest, event_callback=None) -> dict:
+    """
+    Serve a blog request from the blog cache or run the crew for it.
+
+    Identical requests (same normalized topic, tone and audience) arriving
+    while one is being generated wait for that run instead of starting their
+    own crew; their `cache` field reports `"coalesced": True`.
+
+    Runs under the current deadline, or `REQUEST_TIMEOUT` from now outside of
+    one, and raises `DeadlineExceeded` once it passes. The crew's LLM calls see
+    the same deadline and stop retrying when it is gone.
+
+    `event_callback` is handed to `BlogsCrew.setup_crew`, so only the request
+    that runs the crew gets its events. Errors propagate; the endpoints decide
+    how to report them.
+    """
+    from .blog_cache import blog_cache, normalize_blog_request
+
+    if request.use_cache:
+        cached = await blog_cache.get(request.topic, request.tone, request.target_audience)
+        if cached:
+            result, cache_info = cached
+            logger.info("Serving cached blog (%s match on '%s').", cache_info["match"], cache_info["matched_topic"])
+            return {**result, "cache": cache_info}
+
+    leader = []
+
+    async def run():
+        # The run is shared by every identical request, so it gets its own
+        # budget; each caller stops waiting at its own deadline below.
+        leader.append(True)
+        with deadline(REQUEST_TIMEOUT, inherit=False):
+            return await run_crew(request, event_callback)
+
+    key = normalize_blog_request(request.topic, request.tone, request.target_audience)
+    with deadline(REQUEST_TIMEOUT):
+        try:
+            response = await asyncio.wait_for(get_flight("generate_blog").ado(key, run), timeout=max(0.0, time_left()))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Blog generation did not finish within the request deadline.") from None
+    if leader:
+        return response
+    logger.info("Joined an in-flight generation for '%s'.", request.topic)
+    return {**response, "cache": {"hit": False, "coalesced": True}}
+
+async def run_crew(request: BlogGenerationRequest, event_callback=None) -> dict:
+    """Run the crew for a request that missed the blog cache and cache its result."""
+    from .blog_cache import blog_cache
+    from .crew import BlogsCrew
+
+    crew_setup = BlogsCrew(
+        topic=request.topic,
+        tone=request.tone,
+        target_audience=request.target_audience,
+        use_cache=request.use_cache
+    )
+
+    if not crew_setup.rag_tool and not crew_setup.serpapi_tool:
+        raise HTTPException(status_code=500, detail="No knowledge tools available (RAG and SerpAPI failed).")
+
+    research_context = None
+    if crew_setup.serpapi_tool and crew_setup.plan_stages() == 0:
+        research_context = await prefetch_research(crew_setup.serpapi_tool, request.topic, crew_setup.current_year)
+        if event_callback:
+            event_callback("research_prefetched", available=bool(research_context))
+
+    blog_crew = crew_setup.setup_crew(research_context=research_context, event_callback=event_callback)
+    result = await asyncio.to_thread(crew_setup.kickoff, blog_crew)
+
+    logger.info("Crew execution finished successfully.")
+    response = jsonable_encoder(parse_crew_result(result, full_content=crew_setup.edited_post()))
+    await blog_cache.put(request.topic, request.tone, request.target_audience, response)
+    return {**response, "usage": crew_setup.token_report(), "cache": {"hit": False}}
+
 @app.post("/api/generate-blog", tags=["Blog Generation"])
 async def generate_blog(request: BlogGenerationRequest):
     try:
-        print(f"Received structured request to generate blog for topic: {request.topic}")
-        crew_setup = BlogsCrew(
-            topic=request.topic,
-            tone=request.tone,
-            target_audience=request.target_audience
-        )
+        logger.info("Received structured request to generate blog for topic: %s", request.topic)
+        return await produce_blog(request)
+    except TimeoutError as e:
+        logger.warning("Blog generation for '%s' ran out of time: %s", request.topic, e)
+        raise HTTPException(status_code=504, detail="Blog generation did not finish within the request deadline.")
+    except Exception as e:
+        logger.exception("An error occurred: %s", e)
+        raise HTTPException(status_code=500, detail=f"An error occurred while running the crew: {e}")
 
-        if not crew_setup.rag_tool and not crew_setup.serpapi_tool:
-            raise HTTPException(status_code=500, detail="No knowledge tools available (RAG and SerpAPI failed).")
+@app.post("/api/generate-blog/batch", tags=["Blog Generation"])
+async def generate_blog_batch(request: BatchGenerationRequest):
+    """
+    Generate several blog posts at once.
 
-        blog_crew = crew_setup.setup_crew()
-        result = await asyncio.to_thread(blog_crew.kickoff)
+    Research runs once per topic and the remaining stages are spread over a
+    bounded pool (see `BatchRunner`). Failed items are reported in their
+    result instead of failing the batch. Returns per-item results in request
+    order plus batch-level throughput and quota stats.
+    """
+    logger.info("Received batch of %d blog requests", len(request.items))
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+    runner = BatchRunner(
+        runner=lambda item, event_callback: produce_blog(BlogGenerationRequest(**item), event_callback),
+        concurrency=concurrency,
+    )
+    return await runner.run([item.model_dump() for item in request.items])
 
-        print("Crew execution finished successfully.")
+@app.post("/api/generate-blog/stream", tags=["Blog Generation"])
+async def generate_blog_stream(request: BlogGenerationRequest):
+    """
+    Generate a blog post while streaming progress as Server-Sent Events.
 
-        if isinstance(result, str):
-            try:
-                import re
-                json_match = re.search(r'{.*}', result.strip(), re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-                return {"blog_post": result}
-            except json.JSONDecodeError:
-                print("Warning: Failed to parse final output as JSON. Returning as string.")
-                return {"blog_post": result}
+    Emits `task_started`/`task_finished` per stage, `tool_call` events, the
+    writer's and editor's drafts as `draft` events, then a final `result`
+    (or `error`) event carrying the same payload as /api/generate-blog.
 
-        return result
+    The request goes through `produce_blog`, so it shares the blog cache and
+    in-flight generations with /api/generate-blog: a cached post, or one
+    generated for an identical request already running, arrives as a single
+    `result` event after `started`.
+    """
+    stream = CrewEventStream()
 
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"An error occurred while running the crew: {e}")
+    async def run():
+        try:
+            stream.emit("started", topic=request.topic, tone=request.tone, target_audience=request.target_audience)
+            with deadline(REQUEST_TIMEOUT):
+                result = await asyncio.wait_for(produce_blog(request, stream.emit), timeout=max(0.0, time_left()))
+            stream.emit("result", result=result)
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            logger.warning("Streaming blog generation for '%s' ran out of time: %s", request.topic, e)
+            stream.emit("error", detail="Blog generation did not finish within the request deadline.")
+        except HTTPException as e:
+            stream.emit("error", detail=e.detail)
+        except Exception as e:
+            logger.exception("An error occurred while streaming the crew: %s", e)
+            stream.emit("error", detail=str(e))
+        finally:
+            stream.close()
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            async for event in stream:
+                yield format_sse(event)
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/")
 def read_root():
     return {"message": "AI Social Blogging App Backend is running!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.post("/api/jobs", status_code=202, tags=["Jobs"])
+async def submit_blog_job(request: BlogGenerationRequest):
+    """Queue a blog generation and return its job id without waiting for the crew."""
+    try:
+        job_id = job_manager.submit(request.model_dump())
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/api/jobs/{job_id}", tags=["Jobs"])
+async def get_blog_job(job_id: str):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "request": job["request"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
@@ -0,0 +1,194 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s"
+
+# Buckets span a cached lookup (milliseconds) to a full crew run (minutes).
+LATENCY_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+trace_id_var = contextvars.ContextVar("trace_id", default="-")
+
+REQUEST_LATENCY = Histogram(
+    "blog_http_request_duration_seconds", "HTTP request latency.", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "blog_stage_duration_seconds", "Wall time of each crew task.", ["stage"], buckets=LATENCY_BUCKETS
+)
+LLM_LATENCY = Histogram(
+    "blog_llm_call_duration_seconds", "Wall time of each LLM call, including rate-limiter waits.", ["stage", "outcome"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("blog_llm_tokens_total", "Tokens reported by the LLM provider.", ["stage", "kind"])
+CONTEXT_TOKENS = Counter(
+    "blog_context_tokens_total", "Estimated tokens of upstream output handed to each stage, before (raw) and after (passed) budgeting.", ["stage", "kind"]
+)
+TOOL_LATENCY = Histogram(
+    "blog_tool_call_duration_seconds", "Wall time of each tool invocation.", ["tool", "outcome"], buckets=LATENCY_BUCKETS
+)
+RETRIES = Counter("blog_upstream_retries_total", "Retried upstream calls.", ["upstream"])
+LLM_TIMEOUTS = Counter("blog_llm_timeouts_total", "LLM attempts abandoned at their adaptive timeout or the request deadline.", ["stage"])
+LLM_HEDGES = Counter("blog_llm_hedges_total", "Hedged LLM calls, by which of the two requests answered first.", ["stage", "winner"])
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class TraceIdFilter(logging.Filter):
+    """Stamp every log record with the trace id of the request that produced it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        return True
+
+
+def configure_logging(level: str = LOG_LEVEL):
+    """Send `blogs.*` logs to stderr with the current trace id in every line."""
+    logger = logging.getLogger("blogs")
+    if any(isinstance(f, TraceIdFilter) for handler in logger.handlers for f in handler.filters):
+        return
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceIdFilter())
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels):
+    """
+    Time a block into `histogram`, which must be declared with an `outcome`
+    label. It is filled in with "ok" or "error" depending on how the block
+    exits; the other labels are passed in.
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.labels(outcome=outcome, **labels).observe(time.perf_counter() - start)
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator version of `observe` for sync and async functions."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with observe(histogram, **labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe(histogram, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StatsCollector:
+    """
+    Exposes the counters the caches, rate limiters and single-flight tables
+    already keep, and the LLM timeouts each stage has learned.
+
+    Read at scrape time, so the hot paths don't pay for a second set of
+    counters.
+    """
+
+    def _families(self) -> tuple:
+        return (
+            CounterMetricFamily("blog_cache_hits", "Cache hits.", labels=["cache"]),
+            CounterMetricFamily("blog_cache_misses", "Cache misses.", labels=["cache"]),
+            GaugeMetricFamily("blog_cache_entries", "Entries held in memory.", labels=["cache"]),
+            CounterMetricFamily("blog_rate_limiter_acquired", "Calls admitted by the rate limiter.", labels=["upstream"]),
+            CounterMetricFamily("blog_rate_limiter_throttled", "Calls that had to wait.", labels=["upstream"]),
+            CounterMetricFamily("blog_rate_limiter_wait_seconds", "Time spent waiting for rate-limit capacity.", labels=["upstream"]),
+            CounterMetricFamily("blog_singleflight_calls", "Calls that ran because no identical call was in flight.", labels=["kind"]),
+            CounterMetricFamily("blog_singleflight_coalesced", "Calls that joined an identical in-flight call instead of running.", labels=["kind"]),
+            GaugeMetricFamily("blog_llm_timeout_seconds", "Current adaptive LLM attempt timeout.", labels=["stage"]),
+        )
+
+    def describe(self):
+        # Without this the registry calls `collect` on registration, which
+        # would import every cache module (and FAISS and LangChain) on import.
+        return self._families()
+
+    def collect(self):
+        from .deadlines import latency_tracker
+        from .blog_cache import blog_cache
+        from .embedding_cache import embedding_cache
+        from .prompt_parser import prompt_cache
+        from .rate_limiter import _limiters
+        from .singleflight import _flights
+        from .stage_cache import stage_cache
+        from .tools.index_cache import index_cache
+        from .tools.search_cache import search_cache
+
+        hits, misses, entries, acquired, throttled, waited, flight_calls, coalesced, llm_timeouts = self._families()
+
+        search = search_cache.stats()
+        hits.add_metric(["search"], search["hits"])
+        misses.add_metric(["search"], search["misses"])
+        entries.add_metric(["search"], search["entries"])
+
+        embedding = embedding_cache.stats()
+        hits.add_metric(["embedding"], embedding["hits"] + embedding["disk_hits"])
+        misses.add_metric(["embedding"], embedding["misses"])
+
+        index = index_cache.stats()
+        hits.add_metric(["faiss_index"], index["hits"])
+        misses.add_metric(["faiss_index"], index["misses"])
+
+        prompts = prompt_cache.stats()
+        hits.add_metric(["prompt"], prompts["hits"])
+        misses.add_metric(["prompt"], prompts["misses"])
+        entries.add_metric(["prompt"], prompts["entries"])
+
+        blogs = blog_cache.stats()
+        hits.add_metric(["blog"], blogs["exact_hits"] + blogs["similar_hits"])
+        misses.add_metric(["blog"], blogs["misses"])
+        entries.add_metric(["blog"], blogs["entries"])
+
+        stages = stage_cache.stats()
+        for stage in stages["hits"]:
+            hits.add_metric([f"stage_{stage}"], stages["hits"][stage])
+            misses.add_metric([f"stage_{stage}"], stages["misses"][stage])
+        entries.add_metric(["stage"], stages["entries"])
+
+        for name, limiter in list(_limiters.items()):
+            stats = limiter.stats()
+            acquired.add_metric([name], stats["acquired"])
+            throttled.add_metric([name], stats["throttled"])
+            waited.add_metric([name], stats["wait_seconds"])
+
+        for name, flight in list(_flights.items()):
+            stats = flight.stats()
+            flight_calls.add_metric([name], stats["calls"])
+            coalesced.add_metric([name], stats["coalesced"])
+
+        for stage, stats in latency_tracker.stats().items():
+            llm_timeouts.add_metric([stage], stats["timeout"])
+
+        yield from (hits, misses, entries, acquired, throttled, waited, flight_calls, coalesced, llm_timeouts)
+
+
+REGISTRY.register(StatsCollector())
+
+
+def render_metrics() -> tuple:
+    """Return the Prometheus exposition body and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,198 @@
+import json
+import logging
+import re
+from itertools import chain
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
+
+# Outside a string, the next character that matters: a quote or a brace, or a
+# character no JSON value can contain there (so the candidate is prose).
+_STRUCTURE = re.compile(r'["{}]|[^\s\[\]:,\-+.0-9eE"{}truefalsn]')
+# Inside a string, the next quote or escape, or a raw newline, which JSON
+# strings can't contain (so an unmatched quote in prose ends at the line).
+_STRING = re.compile(r'["\\\n]')
+_ESCAPABLE = frozenset('"\\/bfnrtu')
+_NON_SPACE = re.compile(r"\S")
+
+
+class BlogMetadata(BaseModel):
+    """The JSON object the SEO specialist is asked to produce."""
+
+    model_config = ConfigDict(extra="allow")
+
+    title: str
+    meta_description: str = ""
+    hashtags: List[str] = []
+    summary: str = ""
+    full_content: str
+
+    @field_validator("hashtags", mode="before")
+    @classmethod
+    def split_hashtags(cls, value):
+        if isinstance(value, str):
+            return [tag if tag.startswith("#") else f"#{tag}" for tag in re.split(r"[\s,]+", value) if tag]
+        return value
+
+
+class JSONObjectScanner:
+    """
+    Incremental scanner for top-level JSON objects embedded in free text.
+
+    `feed` takes the text in any number of chunks and returns the objects
+    completed so far. Braces are balanced outside of strings, escapes
+    included. A candidate is dropped as soon as it holds a character JSON
+    can't have there (a "{" not followed by a key or "}", a raw newline or an
+    invalid escape inside a string), so a stray brace or quote in prose never
+    swallows the rest of the text. When a candidate is not valid JSON, the objects directly inside
+    it are tried instead, which recovers an object that follows a stray "{".
+
+    Each character is examined once and only candidate text is handed to
+    `json.loads`, so a whole output is parsed in a single linear pass. (Driving
+    `raw_decode` from every "{" is not linear: each failure builds an error
+    whose line number is counted from the start of the text.)
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._parts = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False
+        self._children = []
+        self._child_start = None
+
+    def _finish(self, candidate: str, complete: bool) -> List[dict]:
+        children = self._children
+        self._reset()
+        value = _load_object(candidate) if complete else None
+        if value is not None:
+            return [value]
+        return [value for value in (_load_object(candidate[a:b]) for a, b in children) if value is not None]
+
+    def feed(self, chunk: str) -> List[dict]:
+        found = []
+        pos, end = 0, len(chunk)
+        start = 0 if self._depth else None
+        while pos < end:
+            if not self._depth:
+                pos = chunk.find("{", pos)
+                if pos < 0:
+                    break
+                start, self._depth = pos, 1
+                self._expect_key = True
+                pos += 1
+            elif self._expect_key:
+                # An object opens with a key or closes at once; "{ {" or "{x" is prose.
+                match = _NON_SPACE.search(chunk, pos)
+                if match is None:
+                    pos = end
+                    break
+                self._expect_key = False
+                pos = match.start()
+                if match.group() not in '"}':
+                    found.extend(self._finish("".join(self._parts) + chunk[start:pos], complete=False))
+                    start = None
+            elif self._escaped:
+                self._escaped = False
+                if chunk[pos] not in _ESCAPABLE:
+                    found.extend(self._finish("".join(self._parts) + chunk[start:pos], complete=False))
+                    start = None
+                    continue
+                pos += 1
+            else:
+                match = (_STRING if self._in_string else _STRUCTURE).search(chunk, pos)
+                if match is None:
+                    pos = end
+                    break
+                char, pos = match.group(), match.end()
+                if char == '"':
+                    self._in_string = not self._in_string
+                elif char == "\\" and self._in_string:
+                    self._escaped = True
+                elif char == "{":
+                    self._depth += 1
+                    self._expect_key = True
+                    if self._depth == 2:
+                        self._child_start = self._length + pos - 1 - start
+                elif char == "}":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._children.append((self._child_start, self._length + pos - start))
+                    elif not self._depth:
+                        found.extend(self._finish("".join(self._parts) + chunk[start:pos], complete=True))
+                        start = None
+                else:
+                    found.extend(self._finish("".join(self._parts) + chunk[start:pos], complete=False))
+                    start = None
+        if self._depth:
+            self._parts.append(chunk[start:])
+            self._length += end - start
+        return found
+
+    def close(self) -> List[dict]:
+        """End of text: try the objects inside a candidate that never closed."""
+        if not self._depth:
+            return []
+        return self._finish("".join(self._parts), complete=False)
+
+
+def _load_object(candidate: str) -> Optional[dict]:
+    try:
+        value = json.loads(candidate)
+    except (ValueError, RecursionError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def iter_json_objects(text: str) -> Iterator[dict]:
+    """Yield each valid top-level JSON object in `text`, in order."""
+    scanner = JSONObjectScanner()
+    yield from scanner.feed(text)
+    yield from scanner.close()
+
+
+def extract_json_object(text: str) -> Optional[dict]:
+    """Return the first valid top-level JSON object in `text`, or None."""
+    return next(iter_json_objects(text), None)
+
+
+def parse_crew_result(result, full_content: Optional[str] = None) -> dict:
+    """
+    Turn the crew's final output into the API response.
+
+    Accepts a `CrewOutput` (using its `json_dict` when the task produced one)
+    or the cached summary string. Returns the first JSON object that
+    validates as `BlogMetadata`; failing that, the first JSON object as is,
+    and failing that, the raw text under `blog_post`.
+
+    `full_content`, the edited post, is set on the metadata before it is
+    validated, so the summarizer doesn't have to repeat the post.
+    """
+    if isinstance(result, dict):
+        return result
+    text = result if isinstance(result, str) else getattr(result, "raw", None) or str(result)
+    json_dict = getattr(result, "json_dict", None)
+
+    first = None
+    for value in chain([json_dict] if json_dict else [], iter_json_objects(text)):
+        if full_content is not None:
+            value = {**value, "full_content": full_content}
+        if first is None:
+            first = value
+        try:
+            return BlogMetadata.model_validate(value).model_dump()
+        except ValidationError:
+            continue
+
+    if first is not None:
+        logger.warning("Final output does not match BlogMetadata; returning its first JSON object as is.")
+        return first
+    logger.warning("No JSON object found in final output. Returning as string.")
+    return {"blog_post": full_content if full_content is not None else text}
@@ -1,15 +1,102 @@
 import json
-from langchain_google_genai import ChatGoogleGenerativeAI
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
 from pydantic import BaseModel, Field
+from .prompt_rules import extract_prompt_fields
+from .rate_limiter import estimate_tokens, get_limiter
+
+if TYPE_CHECKING:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHE_SIZE = int(os.getenv("PROMPT_CACHE_SIZE", "1024"))
+RULE_CONFIDENCE_THRESHOLD = float(os.getenv("PROMPT_RULE_CONFIDENCE", "0.7"))
 
 class FormattedBlogInput(BaseModel):
     topic: str = Field(description="The core subject of the blog post. This should be specific and descriptive.")
     tone: str = Field(description="The desired tone or style of the blog post (e.g., professional, funny, casual, inspirational).")
     target_audience: str = Field(description="The specific group of people the blog post is intended for (e.g., a general audience, software developers, new parents).")
 
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so case, spacing and trailing punctuation don't defeat the cache."""
+    return " ".join(prompt.lower().split()).strip(" .!?\"'")
+
+class PromptCache:
+    """LRU cache of extracted fields keyed by normalized prompt."""
+
+    def __init__(self, max_size: int = PROMPT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional["FormattedBlogInput"]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: "FormattedBlogInput"):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+prompt_cache = PromptCache()
+
 class PromptFormatter:
-    def __init__(self, llm: ChatGoogleGenerativeAI):
+    """
+    Extracts topic, tone and audience from a freestyle prompt.
+
+    Results are looked up in the prompt cache first, then tried with the
+    local rules in `prompt_rules`; the LLM is only called when the rules'
+    confidence is below `confidence_threshold`.
+    """
+
+    def __init__(self, llm: "ChatGoogleGenerativeAI", cache: Optional[PromptCache] = None, confidence_threshold: float = RULE_CONFIDENCE_THRESHOLD):
         self.llm = llm
+        self.cache = prompt_cache if cache is None else cache
+        self.confidence_threshold = confidence_threshold
+        self.rule_extractions = 0
+        self.llm_extractions = 0
+
+    def _extract_locally(self, user_prompt: str) -> Optional[FormattedBlogInput]:
+        fields, confidence = extract_prompt_fields(user_prompt)
+        if fields is None or confidence < self.confidence_threshold:
+            logger.info("Rule-based extraction not confident (%s); using Formatter LLM", confidence)
+            return None
+        self.rule_extractions += 1
+        return FormattedBlogInput(**fields)
+
+    def stats(self) -> dict:
+        return {
+            "rule_extractions": self.rule_extractions,
+            "llm_extractions": self.llm_extractions,
+            "cache": self.cache.stats(),
+        }
 
     def _create_formatter_prompt(self, user_prompt: str) -> str:
         return f"""
@@ -27,11 +114,36 @@ class PromptFormatter:
         """
 
     def format_prompt(self, user_prompt: str) -> FormattedBlogInput:
-        formatter_prompt = self._create_formatter_prompt(user_prompt)
+        key = normalize_prompt(user_prompt)
+        result = self.cache.get(key) or self._extract_locally(user_prompt)
+        if result is None:
+            formatter_prompt = self._create_formatter_prompt(user_prompt)
+
+            logger.info("Sending prompt to Formatter LLM")
+            get_limiter("gemini").acquire(tokens=estimate_tokens(formatter_prompt))
+            response = self.llm.invoke(formatter_prompt)
+            result = self._parse_response(response)
+            self.llm_extractions += 1
+        self.cache.put(key, result)
+        return result
+
+    async def aformat_prompt(self, user_prompt: str) -> FormattedBlogInput:
+        """Async version of `format_prompt` that never blocks the event loop."""
+        key = normalize_prompt(user_prompt)
+        result = self.cache.get(key) or self._extract_locally(user_prompt)
+        if result is None:
+            formatter_prompt = self._create_formatter_prompt(user_prompt)
+
+            logger.info("Sending prompt to Formatter LLM")
+            await get_limiter("gemini").acquire_async(tokens=estimate_tokens(formatter_prompt))
+            response = await self.llm.ainvoke(formatter_prompt)
+            result = self._parse_response(response)
+            self.llm_extractions += 1
+        self.cache.put(key, result)
+        return result
 
-        print("--- Sending prompt to Formatter LLM ---")
-        response = self.llm.invoke(formatter_prompt)
-        print(f"--- Received raw response from Formatter LLM: ---\n{response.content}")
+    def _parse_response(self, response) -> FormattedBlogInput:
+        logger.debug("Received raw response from Formatter LLM:\n%s", response.content)
 
         try:
             cleaned = response.content.strip().strip('```json').strip('```')
@@ -39,5 +151,5 @@ class PromptFormatter:
             validated_data = FormattedBlogInput(**extracted_data)
             return validated_data
         except (json.JSONDecodeError, TypeError, KeyError) as e:
-            print(f"Error parsing LLM response for prompt formatting: {e}\nRaw: {response.content}")
+            logger.error("Error parsing LLM response for prompt formatting: %s\nRaw: %s", e, response.content)
             raise ValueError("Failed to get a valid structured response from the formatting LLM.")
\ No newline at end of file
@@ -0,0 +1,157 @@
+import re
+
+DEFAULT_TONE = "professional"
+DEFAULT_AUDIENCE = "a general audience"
+
+TONE_WORDS = {
+    "professional", "formal", "casual", "informal", "fun", "funny", "humorous", "witty", "playful",
+    "lighthearted", "light-hearted", "inspirational", "inspiring", "motivational", "informative",
+    "educational", "technical", "persuasive", "friendly", "conversational", "serious", "academic",
+    "enthusiastic", "sarcastic", "optimistic", "authoritative", "empathetic", "upbeat", "nostalgic",
+}
+
+AUDIENCE_TERMS = {
+    "kids", "children", "teens", "teenagers", "students", "beginners", "newbies", "novices",
+    "developers", "programmers", "engineers", "parents", "moms", "dads", "marketers", "executives",
+    "managers", "leaders", "entrepreneurs", "founders", "business owners", "startups", "teachers",
+    "educators", "investors", "gamers", "designers", "data scientists", "researchers", "nurses",
+    "doctors", "seniors", "retirees", "professionals", "travelers", "foodies", "athletes", "runners",
+    "homeowners", "freelancers", "writers", "artists", "musicians", "photographers", "scientists",
+    "experts", "readers", "everyone", "hobbyists", "millennials", "gen z", "recruiters", "job seekers",
+    "general audience", "audience", "people", "women", "men", "families", "pet owners", "gardeners",
+}
+
+# "in a funny tone", "with a casual and friendly voice"
+TONE_PATTERN = re.compile(r"\b(?:in|with|using)\s+an?\s+((?:[\w-]+\s+){0,2}?[\w-]+)\s+(?:tone|style|voice)\b", re.IGNORECASE)
+# "for kids", "aimed at new parents" -- stops before the next clause or another "for"
+AUDIENCE_PATTERN = re.compile(
+    r"\b(?:for|aimed at|targeted at|targeting|geared towards?|written for|intended for)\s+"
+    r"((?:the\s+|an?\s+)?[\w'-]+(?:\s+[\w'-]+){0,4}?)"
+    r"(?=\s+(?:in|with|about|on|that|who|covering|using|for)\b|\s*[,.;:!?]|\s*$)",
+    re.IGNORECASE,
+)
+TOPIC_MARKER = re.compile(r"\b(?:about|on|covering|regarding|discussing)\s+(.+)$", re.IGNORECASE)
+FILLER = re.compile(
+    r"\b(?:please|can you|could you|write|create|generate|draft|compose|make|give me|i want|i need|i'd like|"
+    r"me|an?|the|some|short|long|quick|detailed|blog\s+posts?|blogs?|posts?|articles?|pieces?|write-?ups?|essay)\b",
+    re.IGNORECASE,
+)
+LEADING_FILLER = re.compile(
+    r"^(?:(?:please|can you|could you|write|create|generate|draft|compose|make|give me|i want|i need|i'd like|"
+    r"me|an?|the|some|short|long|quick|detailed|blog\s+posts?|blogs?|posts?|articles?)\s+)+",
+    re.IGNORECASE,
+)
+TRAILING_FILLER = re.compile(r"\s+(?:blog\s+posts?|blogs?|posts?|articles?|pieces?)$", re.IGNORECASE)
+# Clauses that usually carry instructions the rules cannot capture.
+CLAUSE_WORDS = re.compile(r"\b(?:that|which|but|without|while|because|so|avoid|don't|not)\b", re.IGNORECASE)
+# Signs the topic ran on past the subject: a relative clause orphaned when the
+# audience was cut out ("tips who hate gardening"), a second sentence, or a
+# comma followed by another instruction ("dogs, make it long").
+RUN_ON = re.compile(
+    r"\b(?:who|whom|whose|where)\b|[.!?;:]\s+\S|,\s*(?:make|keep|include|add|use|mention|focus|end|start)\b",
+    re.IGNORECASE,
+)
+# Head nouns that say nothing about the subject on their own: "tips" left over
+# from "tips for new managers" once the audience is cut out.
+GENERIC_TOPIC_WORDS = {
+    "tips", "tricks", "ideas", "advice", "guide", "guides", "ways", "things", "steps", "reasons",
+    "lessons", "hacks", "strategies", "basics", "facts", "mistakes", "questions", "thoughts",
+    "insights", "resources", "tools", "secrets", "rules", "overview", "introduction", "intro",
+    "information", "info", "stuff", "everything", "something", "top", "best", "essential", "essentials",
+    "some", "few", "quick", "simple", "easy", "practical", "useful", "helpful", "and",
+}
+
+MAX_RULE_WORDS = 30
+
+
+def _audience_score(candidate: str) -> float:
+    text = candidate.lower()
+    if any(re.search(rf"\b{re.escape(term)}\b", text) for term in AUDIENCE_TERMS):
+        return 0.25
+    last = text.split()[-1]
+    if len(text.split()) <= 4 and last.endswith("s") and not last.endswith("ss"):
+        return 0.2
+    return 0.0
+
+
+def _strip(text: str) -> str:
+    return " ".join(text.split()).strip(" \t,.;:!?\"'")
+
+
+def extract_prompt_fields(prompt: str) -> tuple:
+    """
+    Pull topic, tone and audience out of a freestyle prompt without an LLM.
+
+    Looks for "in a <tone> tone", "for <audience>" and "about <topic>"
+    phrases, falling back to the tone and audience lexicons. Each field adds
+    to a confidence score; an explicit "about" topic, a lexicon tone and a
+    known audience give 1.0, defaults score lower, and leftover wording or
+    instruction-like clauses, a topic running on into
+    another sentence, or one made only of generic words ("tips", "a guide")
+    count against it.
+
+    Returns:
+        `(fields, confidence)` where `fields` is a dict of the three values,
+        or `(None, 0.0)` when no topic could be found
+    """
+    text = _strip(prompt)
+    if not text or len(text.split()) > MAX_RULE_WORDS:
+        return None, 0.0
+
+    tone, tone_score = None, 0.15
+    match = TONE_PATTERN.search(text)
+    if match:
+        tone, tone_score = match.group(1).lower(), 0.25
+        text = _strip(text[:match.start()] + " " + text[match.end():])
+
+    audience, audience_score = None, 0.15
+    for match in reversed(list(AUDIENCE_PATTERN.finditer(text))):
+        score = _audience_score(match.group(1))
+        if score:
+            audience = re.sub(r"^(?:the|an?)\s+", "", match.group(1), flags=re.IGNORECASE)
+            audience_score = score
+            text = _strip(text[:match.start()] + " " + text[match.end():])
+            break
+
+    marker = TOPIC_MARKER.search(text)
+    if marker:
+        prefix, topic = text[:marker.start()], marker.group(1)
+    else:
+        prefix, topic = "", LEADING_FILLER.sub("", text)
+
+    if tone is None:
+        words = prefix if marker else topic
+        for word in re.findall(r"[\w-]+", words):
+            if word.lower() in TONE_WORDS:
+                tone, tone_score = word.lower(), 0.25
+                if marker:
+                    prefix = re.sub(rf"\b{re.escape(word)}\b", " ", prefix, count=1)
+                else:
+                    topic = re.sub(rf"\b{re.escape(word)}\b", " ", topic, count=1)
+                break
+            if not marker:
+                break
+
+    topic = _strip(TRAILING_FILLER.sub("", _strip(LEADING_FILLER.sub("", _strip(topic)))))
+    topic_words = len(topic.split())
+    if not topic_words:
+        return None, 0.0
+
+    generic = all(word.isdigit() or word in GENERIC_TOPIC_WORDS for word in re.findall(r"[\w'-]+", topic.lower()))
+    if CLAUSE_WORDS.search(topic) or RUN_ON.search(topic) or generic:
+        topic_score = 0.2
+    elif marker and topic_words <= 12:
+        topic_score = 0.5
+    elif topic_words <= 5:
+        topic_score = 0.4
+    else:
+        topic_score = 0.2
+
+    leftover = re.findall(r"[\w'-]+", FILLER.sub(" ", prefix))
+    confidence = topic_score + tone_score + audience_score - (0.2 if leftover else 0.0)
+    fields = {
+        "topic": topic,
+        "tone": tone or DEFAULT_TONE,
+        "target_audience": audience or DEFAULT_AUDIENCE,
+    }
+    return fields, round(max(0.0, confidence), 2)
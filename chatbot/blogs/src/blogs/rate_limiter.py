@@ -0,0 +1,155 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+RATE_LIMIT_STATE_DIR = os.getenv("RATE_LIMIT_STATE_DIR")
+
+# Documented free-tier quotas; override per deployment.
+UPSTREAM_LIMITS = {
+    "gemini": {
+        "rpm": float(os.getenv("GEMINI_RPM", "15")),
+        "tpm": float(os.getenv("GEMINI_TPM", "1000000")),
+        "burst": float(os.getenv("GEMINI_BURST", "3")),
+    },
+    "embeddings": {
+        "rpm": float(os.getenv("EMBEDDING_RPM", "1500")),
+        "tpm": None,
+        "burst": float(os.getenv("EMBEDDING_BURST", "50")),
+    },
+    "serpapi": {
+        "rpm": float(os.getenv("SERPAPI_RPM", "60")),
+        "tpm": None,
+        "burst": float(os.getenv("SERPAPI_BURST", "10")),
+    },
+}
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for one upstream API, shared by every caller in the process.
+
+    The request bucket refills at `rpm / 60` per second up to `burst`, and an
+    optional second bucket tracks tokens per minute. Callers reserve capacity
+    up front and sleep only for their own deficit, so idle capacity is used
+    immediately and concurrent callers are spaced out evenly instead of all
+    waking at once.
+
+    When `state_path` is set, the bucket levels live in that file under an
+    exclusive lock so several worker processes draw from one budget.
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None, burst: float = 1, state_path: Optional[str] = None):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst = max(1.0, burst)
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._state = {"requests": self.burst, "tokens": tpm or 0.0, "updated": time.time()}
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, state: dict, now: float) -> dict:
+        elapsed = max(0.0, now - state["updated"])
+        state["requests"] = min(self.burst, state["requests"] + elapsed * self.rpm / 60)
+        if self.tpm:
+            state["tokens"] = min(self.tpm, state["tokens"] + elapsed * self.tpm / 60)
+        state["updated"] = now
+        return state
+
+    def _reserve_in(self, state: dict, tokens: int, block: bool = True) -> Optional[float]:
+        now = time.time()
+        self._refill(state, now)
+        if not block and (state["requests"] < 1 or (self.tpm and tokens and state["tokens"] < tokens)):
+            return None
+        state["requests"] -= 1
+        wait = max(0.0, -state["requests"] * 60 / self.rpm)
+        if self.tpm and tokens:
+            state["tokens"] -= tokens
+            wait = max(wait, -state["tokens"] * 60 / self.tpm)
+        return wait
+
+    def reserve(self, tokens: int = 0, block: bool = True) -> Optional[float]:
+        """
+        Take one request (and `tokens` tokens) from the buckets and return how
+        long to wait. With `block=False` capacity is only taken if it is free
+        right now, and None is returned otherwise.
+        """
+        with self._lock:
+            if not self.state_path:
+                wait = self._reserve_in(self._state, tokens, block)
+            else:
+                with open(self.state_path, "a+") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        f.seek(0)
+                        content = f.read()
+                        state = json.loads(content) if content else dict(self._state)
+                        wait = self._reserve_in(state, tokens, block)
+                        f.seek(0)
+                        f.truncate()
+                        f.write(json.dumps(state))
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            if wait is None:
+                return None
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.wait_seconds += wait
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until the call may proceed. Returns the time spent waiting."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Take capacity only if it is free right now. Returns whether it was taken."""
+        return self.reserve(tokens, block=False) is not None
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """Async version of `acquire` that yields to the event loop while waiting."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Return the process-wide limiter for an upstream listed in `UPSTREAM_LIMITS`."""
+    with _limiters_lock:
+        if name not in _limiters:
+            limits = UPSTREAM_LIMITS[name]
+            state_path = None
+            if RATE_LIMIT_STATE_DIR:
+                os.makedirs(RATE_LIMIT_STATE_DIR, exist_ok=True)
+                state_path = os.path.join(RATE_LIMIT_STATE_DIR, f"{name}.json")
+            _limiters[name] = RateLimiter(name, limits["rpm"], limits["tpm"], limits["burst"], state_path)
+        return _limiters[name]
+
+
+def estimate_tokens(text) -> int:
+    """Rough token count (about four characters per token) for quota accounting."""
+    if isinstance(text, list):
+        text = " ".join(str(message.get("content", "")) if isinstance(message, dict) else str(message) for message in text)
+    return max(1, len(str(text)) // 4)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlsplit
+from .observability import STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# The queries the research task asks the researcher to run, with the SerpAPI search type for each.
+RESEARCH_QUERIES = (
+    ("{topic} trends {year}", "search"),
+    ("{topic} news latest", "news"),
+    ("what's new in {topic}", "search"),
+    ("{topic} viral", "search"),
+)
+MAX_RESULTS = 10
+
+
+def _normalize_link(link: str) -> str:
+    parts = urlsplit(link)
+    return f"{parts.netloc.lower().removeprefix('www.')}{parts.path.rstrip('/')}"
+
+
+def merge_results(responses) -> dict:
+    """
+    Dedupe and rank results from several SerpAPI responses.
+
+    A result scores `1 / (position + 1)` for every query that returned it, so
+    links surfacing for several queries rank above one-off hits.
+
+    Args:
+        responses: `(query, search_type, raw_response)` tuples
+
+    Returns:
+        Ranked results plus deduped related searches and questions
+    """
+    ranked = {}
+    related, questions = {}, {}
+    for query, search_type, results in responses:
+        items = results.get("news_results") or results.get("organic_results") or []
+        for position, item in enumerate(items):
+            link = item.get("link")
+            if not link:
+                continue
+            entry = ranked.setdefault(_normalize_link(link), {
+                "title": item.get("title", "No title"),
+                "snippet": item.get("snippet", item.get("summary", "")),
+                "link": link,
+                "date": item.get("date", ""),
+                "source_type": search_type,
+                "queries": [],
+                "score": 0.0,
+            })
+            entry["score"] += 1.0 / (position + 1)
+            entry["queries"].append(query)
+
+        for search in results.get("related_searches", []):
+            text = search.get("query", "") if isinstance(search, dict) else str(search)
+            related.setdefault(text.lower(), text)
+        for question in results.get("people_also_ask", []):
+            text = question.get("question", "") if isinstance(question, dict) else str(question)
+            questions.setdefault(text.lower(), text)
+
+    results = sorted(ranked.values(), key=lambda entry: entry["score"], reverse=True)
+    return {
+        "results": results[:MAX_RESULTS],
+        "related_searches": [text for text in related.values() if text][:8],
+        "questions": [text for text in questions.values() if text][:5],
+    }
+
+
+def format_research_context(topic: str, merged: dict) -> str:
+    """Render merged search results as a block the research task can analyze directly."""
+    lines = [f"Pre-fetched search results for '{topic}' (deduplicated and ranked by relevance):", ""]
+    for i, entry in enumerate(merged["results"], 1):
+        lines.append(f"{i}. {entry['title']}" + (f" ({entry['date']})" if entry["date"] else ""))
+        if entry["snippet"]:
+            lines.append(f"   {entry['snippet']}")
+        lines.append(f"   {entry['link']}")
+    if merged["related_searches"]:
+        lines.append("")
+        lines.append("Related trending searches: " + "; ".join(merged["related_searches"]))
+    if merged["questions"]:
+        lines.append("")
+        lines.append("People also ask:")
+        lines.extend(f"- {question}" for question in merged["questions"])
+    return "\n".join(lines)
+
+
+async def prefetch_research(serpapi_tool, topic: str, year: str) -> str:
+    """
+    Run the research task's templated searches concurrently before the crew starts.
+
+    Failed queries are skipped. Returns an empty string when nothing useful
+    came back, in which case the researcher falls back to its search tool.
+    """
+    queries = [(template.format(topic=topic, year=year), search_type) for template, search_type in RESEARCH_QUERIES]
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(serpapi_tool.asearch(query, search_type) for query, search_type in queries),
+        return_exceptions=True,
+    )
+
+    successful = []
+    for (query, search_type), response in zip(queries, responses):
+        if isinstance(response, Exception) or "error" in response:
+            logger.warning("Research prefetch query '%s' failed: %s", query, response if isinstance(response, Exception) else response["error"])
+            continue
+        successful.append((query, search_type, response))
+
+    merged = merge_results(successful)
+    elapsed = time.perf_counter() - start
+    STAGE_LATENCY.labels(stage="research_prefetch").observe(elapsed)
+    logger.info("Research prefetch: %d/%d queries, %d results in %.2fs", len(successful), len(queries), len(merged["results"]), elapsed)
+    if not merged["results"]:
+        return ""
+    return format_research_context(topic, merged)
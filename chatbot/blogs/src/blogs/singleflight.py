@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    with the same key while it is in flight wait for the leader's result, or
+    its exception, instead of making their own call. Once it finishes the key
+    is forgotten, so later callers start a fresh call; caching results is left
+    to the caches in front of each upstream.
+
+    Sync callers (`do`, from worker threads) and async callers (`ado`, on
+    the event loop) share one table, so a search started by a crew thread
+    also serves a prefetch for the same query on the loop. An async call
+    runs as its own task and every caller, the leader included, only waits
+    on it, so cancelling or timing out one caller never cancels the shared
+    call or the other callers.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = set()
+        self.calls = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> tuple:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.calls += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, func: Callable):
+        """Return `func()`, sharing one call among concurrent callers with the same key."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: Hashable, func: Callable[[], Awaitable]):
+        """
+        Async version of `do`: `func` returns the awaitable to share. The
+        task running it is created by the leader, so it runs in the leader's
+        context.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(func())
+            self._tasks.add(task)
+
+            def finished(task):
+                self._tasks.discard(task)
+                if task.cancelled():
+                    self._finish(key, future, error=RuntimeError(f"Shared {self.name} call was cancelled"))
+                elif task.exception() is not None:
+                    self._finish(key, future, error=task.exception())
+                else:
+                    self._finish(key, future, task.result())
+
+            task.add_done_callback(finished)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Return the process-wide `SingleFlight` for one kind of call."""
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+STAGES = ("research", "writing", "editing", "summarizing")
+STAGE_CACHE_TTL = int(os.getenv("STAGE_CACHE_TTL", "86400"))
+STAGE_CACHE_SIZE = int(os.getenv("STAGE_CACHE_SIZE", "256"))
+STAGE_CACHE_PATH = os.getenv("STAGE_CACHE_PATH")
+
+
+def stage_key(stage: str, *inputs) -> str:
+    """Hash a stage name and everything its output depends on into a cache key."""
+    payload = json.dumps([stage, *inputs], ensure_ascii=False)
+    return f"{stage}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class StageCache:
+    """
+    TTL + LRU cache of individual crew stage outputs.
+
+    Lets a request skip every leading stage whose inputs match an earlier
+    run, e.g. reuse a topic's research when only the tone or audience
+    changed. An optional SQLite file keeps outputs across restarts and
+    worker processes.
+    """
+
+    def __init__(self, max_size: int = STAGE_CACHE_SIZE, path: Optional[str] = STAGE_CACHE_PATH, ttl: int = STAGE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._db = None
+        self.hits = {stage: 0 for stage in STAGES}
+        self.misses = {stage: 0 for stage in STAGES}
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS stage_cache (key TEXT PRIMARY KEY, expires_at REAL, output TEXT)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        stage = key.split(":", 1)[0]
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits[stage] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+            if self._db:
+                row = self._db.execute(
+                    "SELECT expires_at, output FROM stage_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[0] > now:
+                    self._remember(key, row[0], row[1])
+                    self.hits[stage] += 1
+                    return row[1]
+
+            self.misses[stage] += 1
+            return None
+
+    def put(self, key: str, output: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, output)
+            if self._db:
+                self._db.execute("DELETE FROM stage_cache WHERE expires_at <= ?", (time.time(),))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO stage_cache (key, expires_at, output) VALUES (?, ?, ?)",
+                    (key, expires_at, output),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, output: str):
+        self._entries[key] = (expires_at, output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM stage_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "entries": len(self._entries),
+            }
+
+
+stage_cache = StageCache()
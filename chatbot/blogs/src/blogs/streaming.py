@@ -0,0 +1,37 @@
+import asyncio
+import json
+import time
+
+
+class CrewEventStream:
+    """
+    Bridge from crew callbacks to an async Server-Sent Events response.
+
+    Crew callbacks fire on the worker thread running `kickoff`, so `emit`
+    hands each event to the event loop with `call_soon_threadsafe`. Iterating
+    the stream yields events until `close` is called.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.started = time.perf_counter()
+
+    def emit(self, event: str, **data):
+        data = {"event": event, "elapsed": round(time.perf_counter() - self.started, 3), **data}
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, data)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+    async def __aiter__(self):
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+            yield event
+
+
+def format_sse(data: dict) -> str:
+    """Encode one event in the `text/event-stream` wire format."""
+    return f"event: {data['event']}\ndata: {json.dumps(data, default=str)}\n\n"
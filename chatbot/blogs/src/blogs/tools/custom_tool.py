@@ -1,10 +1,20 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Any, Type
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from ..embedding_cache import get_embedding_model
+from ..observability import TOOL_LATENCY, timed
+from .index_cache import index_cache
+import asyncio
 import os
 
+# The index `python -m blogs.vector` builds, independent of the working directory.
+DB_SAVE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "faiss_index")
+RAG_SEARCH_WORKERS = int(os.getenv("RAG_SEARCH_WORKERS", "4"))
+
+# Bounded pool for FAISS loads and searches so async callers never block the event loop.
+search_executor = ThreadPoolExecutor(max_workers=RAG_SEARCH_WORKERS, thread_name_prefix="rag-search")
+
 class MyCustomToolInput(BaseModel):
     query: str = Field(..., description="The search query for the knowledge base.")
 
@@ -13,15 +23,13 @@ class MyCustomTool(BaseTool):
     description: str = "Retrieves context from blog post examples and style guides to help with content creation."
     args_schema: Type[BaseModel] = MyCustomToolInput
     api_key: str 
-    embedding_model: GoogleGenerativeAIEmbeddings = None
+    embedding_model: Any = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.embedding_model = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
-            google_api_key=self.api_key
-        )
+        self.embedding_model = get_embedding_model(self.api_key)
 
+    @timed(TOOL_LATENCY, tool="rag")
     def _run(self, query: str) -> str:
         """
         Execute the RAG search with the provided query.
@@ -33,29 +41,41 @@ class MyCustomTool(BaseTool):
             str: Retrieved context or error message
         """
         try:
-            DB_SAVE_PATH = "faiss_index"
             if not os.path.exists(DB_SAVE_PATH):
                 return f"Knowledge base not found at {DB_SAVE_PATH}. Please create the FAISS index first."
             
-            vector_db = FAISS.load_local(
-                DB_SAVE_PATH,
-                embeddings=self.embedding_model,
-                allow_dangerous_deserialization=True
-            )
-            
-            retriever = vector_db.as_retriever(search_kwargs={"k": 3})
-            docs = retriever.invoke(query)
-            
-            if not docs:
-                return "No relevant information found in the knowledge base."
-            
-            context = "\n---\n".join([doc.page_content for doc in docs])
-            return f"Retrieved context for '{query}':\n{context}"
+            vector_db = index_cache.get(DB_SAVE_PATH, self.embedding_model)
+            query_embedding = self.embedding_model.embed_query(query)
+            docs = vector_db.similarity_search_by_vector(query_embedding, k=3)
+            return self._format_docs(query, docs)
             
         except Exception as e:
             return f"Error retrieving from knowledge base: {str(e)}"
 
+    def _format_docs(self, query: str, docs) -> str:
+        if not docs:
+            return "No relevant information found in the knowledge base."
+        
+        context = "\n---\n".join([doc.page_content for doc in docs])
+        return f"Retrieved context for '{query}':\n{context}"
+
+    @timed(TOOL_LATENCY, tool="rag")
     async def _arun(self, query: str) -> str:
         """Async version of the run method."""
-        return self._run(query)
+        try:
+            if not os.path.exists(DB_SAVE_PATH):
+                return f"Knowledge base not found at {DB_SAVE_PATH}. Please create the FAISS index first."
+            
+            loop = asyncio.get_running_loop()
+            vector_db, query_embedding = await asyncio.gather(
+                loop.run_in_executor(search_executor, index_cache.get, DB_SAVE_PATH, self.embedding_model),
+                self.embedding_model.aembed_query(query),
+            )
+            docs = await loop.run_in_executor(
+                search_executor, vector_db.similarity_search_by_vector, query_embedding, 3
+            )
+            return self._format_docs(query, docs)
+            
+        except Exception as e:
+            return f"Error retrieving from knowledge base: {str(e)}"
         
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+from langchain_community.vectorstores import FAISS
+from .knowledge_store import DOCS_FILE, INDEX_FILE, LEGACY_DOCSTORE_FILE, MappedVectorStore, resolve_index_dir
+
+logger = logging.getLogger(__name__)
+
+
+class FAISSIndexCache:
+    """
+    Process-wide cache of loaded FAISS vector stores.
+
+    Entries are keyed by the absolute index path and validated against the
+    live version directory and the modification time and size of its files,
+    so an index rewritten by `vector.py` is picked up on the next lookup
+    without restarting the process.
+
+    A replaced store may still be serving searches that started before the
+    swap, so it is closed only when the next version replaces its successor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._entries = {}
+        self._retired = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _signature(self, directory: str):
+        signature = [directory]
+        docstore = DOCS_FILE if os.path.exists(os.path.join(directory, DOCS_FILE)) else LEGACY_DOCSTORE_FILE
+        for name in (INDEX_FILE, docstore):
+            stat = os.stat(os.path.join(directory, name))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _retire(self, key: str, vector_db):
+        """Hold on to a replaced store, closing the one retired before it (call with the lock held)."""
+        previous = self._retired.pop(key, None)
+        if previous is not None and hasattr(previous, "close"):
+            previous.close()
+        self._retired[key] = vector_db
+
+    def get(self, path: str, embeddings):
+        """
+        Return the vector store saved at `path`, loading it only when it is not
+        cached yet or the files on disk changed since it was loaded.
+
+        An index in the pickle-free format (`docs.sqlite` next to
+        `index.faiss`) is opened memory-mapped as a `MappedVectorStore`; one
+        saved with LangChain's `save_local` is unpickled into a `FAISS` store.
+
+        Args:
+            path: Directory the index was saved to
+            embeddings: Embedding model bound to the store on first load
+
+        Returns:
+            The loaded vector store
+        """
+        key = os.path.abspath(path)
+        directory = resolve_index_dir(key)
+        signature = self._signature(directory)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded the same version while we waited.
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] == signature:
+                    self.hits += 1
+                    return entry[1]
+
+            try:
+                if os.path.exists(os.path.join(directory, DOCS_FILE)):
+                    vector_db = MappedVectorStore(directory, embeddings)
+                else:
+                    logger.warning("Loading pickled FAISS docstore at %s; convert it with `python -m blogs.tools.knowledge_store`.", key)
+                    vector_db = FAISS.load_local(
+                        key,
+                        embeddings=embeddings,
+                        allow_dangerous_deserialization=True
+                    )
+            except Exception:
+                # The index may be mid-rewrite; keep serving the previous version.
+                if entry:
+                    logger.warning("Failed to reload FAISS index at %s, serving cached version.", key)
+                    return entry[1]
+                raise
+
+            with self._lock:
+                if entry:
+                    self.reloads += 1
+                    self._retire(key, entry[1])
+                else:
+                    self.misses += 1
+                self._entries[key] = (signature, vector_db)
+            return vector_db
+
+    def invalidate(self, path: str = None):
+        """Drop one cached index, or all of them when no path is given."""
+        with self._lock:
+            keys = list(self._entries) if path is None else [os.path.abspath(path)]
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry:
+                    self._retire(key, entry[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "cached_indexes": len(self._entries),
+            }
+
+
+index_cache = FAISSIndexCache()
@@ -0,0 +1,200 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.faiss"
+DOCS_FILE = "docs.sqlite"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+# Names the version directory holding the live index files.
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+# Maps flat vector storage (flat, HNSW) as well as IVF lists; older FAISS builds only map IVF lists.
+MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+
+def write_docstore(vector_db: FAISS, path: str):
+    """
+    Write the chunks of `vector_db` to `path`/docs.sqlite, keyed by their
+    position in the index. The file is built aside and swapped in, so readers
+    never see a partial docstore.
+    """
+    docs_path = os.path.join(path, DOCS_FILE)
+    staging_path = f"{docs_path}.tmp"
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+    db = sqlite3.connect(staging_path)
+    try:
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("CREATE TABLE docs (position INTEGER PRIMARY KEY, id TEXT NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL)")
+        rows = (
+            (position, doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False))
+            for position, doc_id in sorted(vector_db.index_to_docstore_id.items())
+            for doc in (vector_db.docstore.search(doc_id),)
+        )
+        db.executemany("INSERT INTO docs (position, id, text, metadata) VALUES (?, ?, ?, ?)", rows)
+        db.commit()
+    finally:
+        db.close()
+    os.replace(staging_path, docs_path)
+
+
+def save_index(vector_db: FAISS, path: str):
+    """Save `vector_db` to the directory `path` as `index.faiss` plus `docs.sqlite`."""
+    os.makedirs(path, exist_ok=True)
+    faiss.write_index(vector_db.index, os.path.join(path, INDEX_FILE))
+    write_docstore(vector_db, path)
+
+
+def resolve_index_dir(path: str) -> str:
+    """
+    The directory holding the live files of the index saved at `path`: the
+    version named by its `CURRENT` file, or `path` itself for an index saved
+    before versions (or already a version directory).
+    """
+    try:
+        with open(os.path.join(path, CURRENT_FILE), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return path
+    return os.path.join(path, version)
+
+
+def _versions(path: str) -> list:
+    names = [name for name in os.listdir(path) if name.startswith("v") and name[1:].isdigit()]
+    return sorted(names, key=lambda name: int(name[1:]))
+
+
+def publish_index(path: str, staging_dir: str) -> str:
+    """
+    Make the index files written to `staging_dir`, a directory inside `path`,
+    the live index of `path`.
+
+    The directory is renamed to a new version and `CURRENT` is swapped to name
+    it in a single rename, so a reader never pairs the index of one save with
+    the docstore of another. The previous version is kept for readers that
+    resolved it just before the swap; older ones and the files of the
+    unversioned layout are removed.
+
+    Returns:
+        The new version directory
+    """
+    version = f"v{time.time_ns()}"
+    version_dir = os.path.join(path, version)
+    os.chmod(staging_dir, 0o755)
+    os.replace(staging_dir, version_dir)
+    pointer = os.path.join(path, f".{CURRENT_FILE}.tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(path, CURRENT_FILE))
+
+    for old in _versions(path)[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+    for name in (INDEX_FILE, DOCS_FILE, LEGACY_DOCSTORE_FILE):
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+    return version_dir
+
+
+def _connect_read_only(docs_path: str) -> sqlite3.Connection:
+    # immutable=1 skips file locking; saves replace the file rather than edit it in place.
+    uri = f"file:{quote(os.path.abspath(docs_path))}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def load_faiss_store(path: str, embeddings) -> FAISS:
+    """
+    Load a saved index as an ordinary, writable LangChain `FAISS` store.
+
+    For ingestion, which edits the index; serving uses `MappedVectorStore`.
+    """
+    path = resolve_index_dir(path)
+    index = faiss.read_index(os.path.join(path, INDEX_FILE))
+    db = _connect_read_only(os.path.join(path, DOCS_FILE))
+    try:
+        rows = db.execute("SELECT position, id, text, metadata FROM docs ORDER BY position").fetchall()
+    finally:
+        db.close()
+    docstore = InMemoryDocstore({doc_id: Document(page_content=text, metadata=json.loads(metadata), id=doc_id) for _, doc_id, text, metadata in rows})
+    return FAISS(embeddings, index, docstore, {position: doc_id for position, doc_id, _, _ in rows})
+
+
+class MappedVectorStore:
+    """
+    Read-only vector store over a saved index directory: `index.faiss`
+    (written with `faiss.write_index`) and `docs.sqlite`, one row per vector
+    position with the chunk's docstore id, text and JSON metadata.
+
+    The FAISS file is opened memory-mapped and chunks are read from SQLite
+    only for the hits of each search, so loading is near-instant and worker
+    processes share the same page-cache pages instead of each unpickling a
+    private copy of the docstore. Offers the subset of the LangChain `FAISS`
+    search API the RAG tool uses; searches are safe from several threads.
+    """
+
+    def __init__(self, path: str, embeddings=None):
+        path = resolve_index_dir(path)
+        self.embeddings = embeddings
+        self.index = faiss.read_index(os.path.join(path, INDEX_FILE), MMAP_FLAG)
+        self._lock = threading.Lock()
+        self._db = _connect_read_only(os.path.join(path, DOCS_FILE))
+
+    def get_documents(self, positions) -> dict:
+        """Fetch the chunks stored at the given index positions, keyed by position."""
+        positions = [int(position) for position in positions]
+        if not positions:
+            return {}
+        placeholders = ", ".join("?" * len(positions))
+        with self._lock:
+            rows = self._db.execute(f"SELECT position, id, text, metadata FROM docs WHERE position IN ({placeholders})", positions).fetchall()
+        return {position: Document(page_content=text, metadata=json.loads(metadata), id=doc_id) for position, doc_id, text, metadata in rows}
+
+    def similarity_search_with_score_by_vector(self, embedding, k: int = 4) -> list:
+        """Return the `k` nearest chunks with their raw FAISS distances, nearest first."""
+        query = np.asarray([embedding], dtype=np.float32)
+        distances, positions = self.index.search(query, k)
+        hits = [(int(position), float(distance)) for position, distance in zip(positions[0], distances[0]) if position >= 0]
+        documents = self.get_documents(position for position, _ in hits)
+        return [(documents[position], distance) for position, distance in hits if position in documents]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4) -> list:
+        return [document for document, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def close(self):
+        """Release the SQLite connection and the mapped index; the store is unusable afterwards."""
+        with self._lock:
+            self._db.close()
+            self.index = None
+
+
+def migrate(path: str):
+    """Write `docs.sqlite` for an index saved by LangChain's `save_local` (trusted files only: it unpickles)."""
+    vector_db = FAISS.load_local(path, embeddings=None, allow_dangerous_deserialization=True)
+    write_docstore(vector_db, path)
+    logger.info("Wrote %s for %d chunks in %s", DOCS_FILE, vector_db.index.ntotal, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a pickled LangChain FAISS index to the pickle-free format.")
+    parser.add_argument("path", help="Index directory holding index.faiss and index.pkl")
+    parser.add_argument("--drop-pickle", action="store_true", help="Delete index.pkl after converting")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    migrate(args.path)
+    if args.drop_pickle:
+        os.remove(os.path.join(args.path, LEGACY_DOCSTORE_FILE))
@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+SEARCH_CACHE_TTLS = {
+    "news": int(os.getenv("SERPAPI_NEWS_TTL", "900")),
+    "trends": int(os.getenv("SERPAPI_TRENDS_TTL", "900")),
+    "search": int(os.getenv("SERPAPI_SEARCH_TTL", "21600")),
+}
+DEFAULT_TTL = int(os.getenv("SERPAPI_DEFAULT_TTL", "3600"))
+SEARCH_CACHE_SIZE = int(os.getenv("SERPAPI_CACHE_SIZE", "512"))
+SEARCH_CACHE_PATH = os.getenv("SERPAPI_CACHE_PATH")
+COST_PER_SEARCH = float(os.getenv("SERPAPI_COST_PER_SEARCH", "0.015"))
+
+
+def normalize_search(query: str, search_type: str, location: str, num_results: int) -> tuple:
+    """Normalize search arguments so trivially different calls share a cache entry."""
+    return (
+        " ".join(query.lower().split()),
+        search_type.strip().lower(),
+        " ".join(location.lower().split()),
+        min(num_results, 20),
+    )
+
+
+class SearchCache:
+    """
+    TTL + LRU cache for raw SerpAPI responses.
+
+    Entries expire after a TTL that depends on the search type, so news and
+    trend lookups stay fresh while plain searches are reused for hours. An
+    optional SQLite file keeps entries across restarts and worker processes.
+    """
+
+    def __init__(self, max_size: int = SEARCH_CACHE_SIZE, path: Optional[str] = SEARCH_CACHE_PATH, ttls: dict = None):
+        self.max_size = max_size
+        self.ttls = ttls or SEARCH_CACHE_TTLS
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, expires_at REAL, results TEXT)"
+            )
+            self._db.commit()
+
+    def ttl(self, search_type: str) -> int:
+        return self.ttls.get(search_type, DEFAULT_TTL)
+
+    def get(self, key: tuple) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+                self.expired += 1
+
+            if self._db:
+                row = self._db.execute(
+                    "SELECT expires_at, results FROM search_cache WHERE key = ?", (json.dumps(key),)
+                ).fetchone()
+                if row and row[0] > now:
+                    results = json.loads(row[1])
+                    self._remember(key, row[0], results)
+                    self.hits += 1
+                    return results
+
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, results: dict):
+        expires_at = time.time() + self.ttl(key[1])
+        with self._lock:
+            self._remember(key, expires_at, results)
+            if self._db:
+                self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, expires_at, results) VALUES (?, ?, ?)",
+                    (json.dumps(key), expires_at, json.dumps(results)),
+                )
+                self._db.commit()
+
+    def _remember(self, key: tuple, expires_at: float, results: dict):
+        self._entries[key] = (expires_at, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "api_calls_saved": self.hits,
+                "estimated_savings_usd": round(self.hits * COST_PER_SEARCH, 4),
+            }
+
+
+search_cache = SearchCache()
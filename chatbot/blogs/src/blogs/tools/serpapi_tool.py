@@ -2,7 +2,50 @@ from crewai.tools import BaseTool
 from typing import Type, Optional
 from pydantic import BaseModel, Field
 from serpapi import GoogleSearch
+from .search_cache import normalize_search, search_cache
+from ..observability import TOOL_LATENCY, timed
+from ..rate_limiter import get_limiter
+from ..singleflight import get_flight
+import httpx
 import json
+import os
+
+SERPAPI_SEARCH_URL = "https://serpapi.com/search"
+SERPAPI_TIMEOUT = float(os.getenv("SERPAPI_TIMEOUT", "20"))
+SERPAPI_MAX_CONNECTIONS = int(os.getenv("SERPAPI_MAX_CONNECTIONS", "20"))
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared keep-alive HTTP client for async SerpAPI calls."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(SERPAPI_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=SERPAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=SERPAPI_MAX_CONNECTIONS // 2,
+            ),
+        )
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+def _response_payload(response: httpx.Response) -> dict:
+    """The JSON body of a SerpAPI response, or an `{"error": ...}` payload like the sync client returns."""
+    try:
+        results = response.json()
+    except ValueError:
+        results = None
+    if not isinstance(results, dict):
+        return {"error": f"SerpAPI returned a non-JSON response (HTTP {response.status_code})"}
+    if response.is_error and "error" not in results:
+        return {"error": f"SerpAPI returned HTTP {response.status_code}"}
+    return results
 
 class SerpAPIToolInput(BaseModel):
     query: str = Field(..., description="The search query to find trending information")
@@ -19,6 +62,63 @@ class SerpAPITool(BaseTool):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
     
+    def _search_params(self, query: str, search_type: str, location: str, num_results: int) -> dict:
+        search_params = {
+            "q": query,
+            "api_key": self.api_key,
+            "engine": "google",
+            "location": location,
+            "num": min(num_results, 20), 
+            "safe": "active"
+        }
+        
+        if search_type == "news":
+            search_params["tbm"] = "nws"
+            search_params["tbs"] = "qdr:w"
+        elif search_type == "trends":
+            search_params["tbs"] = "qdr:d"
+        return search_params
+
+    def search(self, query: str, search_type: str = "search", location: str = "United States", num_results: int = 10) -> dict:
+        """
+        Return the raw SerpAPI response for a query, served from the search cache
+        when possible. Identical queries already in flight, sync or async, are
+        joined instead of sent again.
+        """
+        cache_key = normalize_search(query, search_type, location, num_results)
+        results = search_cache.get(cache_key)
+        if results is not None:
+            return results
+
+        def fetch():
+            get_limiter("serpapi").acquire()
+            results = GoogleSearch(self._search_params(query, search_type, location, num_results)).get_dict()
+            if "error" not in results:
+                search_cache.put(cache_key, results)
+            return results
+
+        return get_flight("serpapi").do(cache_key, fetch)
+
+    async def asearch(self, query: str, search_type: str = "search", location: str = "United States", num_results: int = 10) -> dict:
+        """Async version of `search`, using the pooled HTTP client instead of a blocking request."""
+        cache_key = normalize_search(query, search_type, location, num_results)
+        results = search_cache.get(cache_key)
+        if results is not None:
+            return results
+
+        async def fetch():
+            params = self._search_params(query, search_type, location, num_results)
+            params.update({"output": "json", "source": "python"})
+            await get_limiter("serpapi").acquire_async()
+            response = await get_async_client().get(SERPAPI_SEARCH_URL, params=params)
+            results = _response_payload(response)
+            if "error" not in results:
+                search_cache.put(cache_key, results)
+            return results
+
+        return await get_flight("serpapi").ado(cache_key, fetch)
+
+    @timed(TOOL_LATENCY, tool="serpapi")
     def _run(self, query: str, search_type: str = "search", location: str = "United States", num_results: int = 10) -> str:
         """
         Execute a search using SerpAPI to find trending information.
@@ -33,22 +133,7 @@ class SerpAPITool(BaseTool):
             Formatted search results as a string
         """
         try:
-            search_params = {
-                "q": query,
-                "api_key": self.api_key,
-                "engine": "google",
-                "location": location,
-                "num": min(num_results, 20), 
-                "safe": "active"
-            }
-            
-            if search_type == "news":
-                search_params["tbm"] = "nws"
-                search_params["tbs"] = "qdr:w"
-            elif search_type == "trends":
-                search_params["tbs"] = "qdr:d"
-            search = GoogleSearch(search_params)
-            results = search.get_dict()
+            results = self.search(query, search_type, location, num_results)
             return self._format_results(results, search_type, query)
             
         except Exception as e:
@@ -91,6 +176,11 @@ class SerpAPITool(BaseTool):
         
         return formatted_output
     
+    @timed(TOOL_LATENCY, tool="serpapi")
     async def _arun(self, query: str, search_type: str = "search", location: str = "United States", num_results: int = 10) -> str:
         """Async version of the run method."""
-        return self._run(query, search_type, location, num_results)
\ No newline at end of file
+        try:
+            results = await self.asearch(query, search_type, location, num_results)
+            return self._format_results(results, search_type, query)
+        except Exception as e:
+            return f"Error performing search: {str(e)}"
\ No newline at end of file
@@ -1,13 +1,401 @@
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import logging
 import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+import faiss
+import numpy as np
 from dotenv import load_dotenv
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from .embedding_cache import EMBEDDING_MODEL, get_embedding_model
+from .observability import RETRIES, configure_logging
+from .tools.knowledge_store import DOCS_FILE, INDEX_FILE, LEGACY_DOCSTORE_FILE, load_faiss_store, publish_index, resolve_index_dir, save_index
 load_dotenv()
 
-SOURCE_DOCUMENT = os.path.join("knowledge", "context.txt")
-DB_SAVE_PATH = "faiss_index"
+logger = logging.getLogger(__name__)
+
+# Resolved against the package, not the working directory, so the CLI and the
+# server (`tools.custom_tool.DB_SAVE_PATH`) always use the same index.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWLEDGE_DIR = os.path.join(PACKAGE_DIR, "knowledge")
+SOURCE_DOCUMENT = os.path.join(KNOWLEDGE_DIR, "context.txt")
+DB_SAVE_PATH = os.path.join(PACKAGE_DIR, "faiss_index")
+MANIFEST_FILE = "manifest.json"
+INDEX_FILES = (INDEX_FILE, DOCS_FILE)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+CHECKPOINT_EVERY = int(os.getenv("INGEST_CHECKPOINT_EVERY", "20"))
+INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+DEFAULT_INDEX_PARAMS = {
+    "nlist": 100,
+    "nprobe": 10,
+    "hnsw_m": 32,
+    "ef_construction": 200,
+    "ef_search": 64,
+    "pq_m": 16,
+    "pq_nbits": 8,
+}
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def _text_splitter():
+    return RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+
+def load_manifest(db_path: str = DB_SAVE_PATH) -> dict:
+    """Return the ingestion manifest saved with the index, or an empty one."""
+    manifest_path = os.path.join(resolve_index_dir(db_path), MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {"embedding_model": EMBEDDING_MODEL, "files": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_vector_store(vector_db: FAISS, manifest: Optional[dict], db_path: str = DB_SAVE_PATH):
+    """
+    Save the vector store in the pickle-free format (see
+    `tools.knowledge_store`) with its manifest, as a new version directory
+    published with one rename (`publish_index`), so the RAG tool never reads
+    a half-written index or the docstore of another save. `manifest=None`
+    carries the current manifest over unchanged.
+    """
+    os.makedirs(db_path, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=db_path)
+    try:
+        save_index(vector_db, staging_dir)
+        current_manifest = os.path.join(resolve_index_dir(db_path), MANIFEST_FILE)
+        if manifest is not None:
+            with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        elif os.path.exists(current_manifest):
+            shutil.copyfile(current_manifest, os.path.join(staging_dir, MANIFEST_FILE))
+        publish_index(db_path, staging_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    legacy_manifest = os.path.join(db_path, MANIFEST_FILE)
+    if os.path.exists(legacy_manifest):
+        os.remove(legacy_manifest)
+
+def load_vector_store(db_path: str, embedding_model) -> Optional[FAISS]:
+    """
+    Load the saved index for editing, or None when there is none.
+
+    An index still in LangChain's pickled layout is unpickled once; the next
+    save writes it back in the pickle-free format.
+    """
+    index_dir = resolve_index_dir(db_path)
+    if all(os.path.exists(os.path.join(index_dir, name)) for name in INDEX_FILES):
+        return load_faiss_store(index_dir, embedding_model)
+    if all(os.path.exists(os.path.join(db_path, name)) for name in (INDEX_FILE, LEGACY_DOCSTORE_FILE)):
+        return FAISS.load_local(db_path, embeddings=embedding_model, allow_dangerous_deserialization=True)
+    return None
+
+def build_faiss_index(vectors: np.ndarray, index_type: str = "flat", **params) -> faiss.Index:
+    """
+    Build a FAISS index of the given type over `vectors` (an `n x d` float32 matrix).
+
+    Args:
+        vectors: Embeddings to index, in docstore order
+        index_type: One of "flat", "ivf_flat", "hnsw" or "ivf_pq"
+        **params: Overrides for `DEFAULT_INDEX_PARAMS`
+
+    Returns:
+        A trained index holding every vector
+
+    Raises:
+        ValueError: If the type is unknown or the corpus is too small to train it
+    """
+    params = {**DEFAULT_INDEX_PARAMS, **params}
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, d = vectors.shape
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(d)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(d, params["hnsw_m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.hnsw.efSearch = params["ef_search"]
+    elif index_type in ("ivf_flat", "ivf_pq"):
+        # k-means wants roughly 39 training points per centroid.
+        nlist = max(1, min(params["nlist"], n // 39))
+        quantizer = faiss.IndexFlatL2(d)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, d, nlist)
+        else:
+            if d % params["pq_m"]:
+                raise ValueError(f"pq_m={params['pq_m']} must divide the embedding dimension {d}")
+            if n < 2 ** params["pq_nbits"]:
+                raise ValueError(f"IVF-PQ with {params['pq_nbits']} bits needs at least {2 ** params['pq_nbits']} vectors, got {n}")
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, params["pq_m"], params["pq_nbits"])
+        index.train(vectors)
+        index.nprobe = min(params["nprobe"], nlist)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}'. Choose from: {', '.join(INDEX_TYPES)}")
+
+    index.add(vectors)
+    return index
+
+def stored_vectors(index: faiss.Index) -> Optional[np.ndarray]:
+    """
+    The exact vectors held by `index`, in docstore order, or None when it only
+    keeps lossy codes (IVF-PQ). IVF lists get a direct map first so their
+    vectors can be looked up by position.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        if not isinstance(faiss.downcast_index(ivf), faiss.IndexIVFFlat):
+            return None
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+def _docstore_texts(vector_db: FAISS):
+    return [vector_db.docstore.search(vector_db.index_to_docstore_id[i]).page_content for i in range(vector_db.index.ntotal)]
+
+def iter_knowledge_files(knowledge_dir: str = KNOWLEDGE_DIR):
+    """Yield `(name, path, sha256)` for every `.txt` file in the knowledge directory."""
+    for name in sorted(os.listdir(knowledge_dir)):
+        path = os.path.join(knowledge_dir, name)
+        if not name.endswith(".txt") or not os.path.isfile(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield name, path, _sha256(f.read())
+
+def iter_chunks(files):
+    """Split files one at a time, yielding `(chunk_id, text, metadata)` for each chunk."""
+    splitter = _text_splitter()
+    for name, path in files:
+        for chunk in splitter.split_documents(TextLoader(path, encoding="utf-8").load()):
+            chunk_id = _sha256(chunk.page_content)
+            yield chunk_id, chunk.page_content, {"source": name, "chunk_id": chunk_id}
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+def embed_batches(batches, embed, concurrency: int = EMBED_CONCURRENCY, max_retries: int = EMBED_MAX_RETRIES, base_delay: float = 1.0):
+    """
+    Embed batches of chunks with at most `concurrency` requests in flight.
+
+    Batches are pulled from the input lazily, so memory stays bounded no matter
+    how large the corpus is. A failed request (e.g. a 429) goes to a retry queue
+    with exponential backoff instead of failing the whole build; the error is
+    only raised once a batch has exhausted `max_retries`.
+
+    Args:
+        batches: Iterable of lists of `(chunk_id, text, metadata)`
+        embed: Callable embedding a list of texts, e.g. `embed_documents`
+        concurrency: Maximum number of embedding requests in flight
+        max_retries: Retries per batch before giving up
+        base_delay: Backoff delay in seconds before the first retry
+
+    Yields:
+        `(batch, vectors)` in completion order
+    """
+    batches = iter(batches)
+    retry_queue = []
+    sequence = itertools.count()
+    in_flight = {}
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            while len(in_flight) < concurrency:
+                if retry_queue and retry_queue[0][0] <= time.monotonic():
+                    _, _, attempt, batch = heapq.heappop(retry_queue)
+                elif not exhausted:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        continue
+                    attempt = 0
+                else:
+                    break
+                future = pool.submit(embed, [text for _, text, _ in batch])
+                in_flight[future] = (attempt, batch)
+
+            if not in_flight:
+                if not retry_queue:
+                    return
+                time.sleep(max(0.0, retry_queue[0][0] - time.monotonic()))
+                continue
+
+            timeout = max(0.0, retry_queue[0][0] - time.monotonic()) if retry_queue else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                attempt, batch = in_flight.pop(future)
+                try:
+                    vectors = future.result()
+                except Exception as e:
+                    if attempt >= max_retries:
+                        raise
+                    delay = base_delay * (2 ** attempt)
+                    logger.warning("Embedding batch failed (%s); retrying in %.1fs", e, delay)
+                    RETRIES.labels(upstream="embeddings").inc()
+                    heapq.heappush(retry_queue, (time.monotonic() + delay, next(sequence), attempt + 1, batch))
+                    continue
+                yield batch, vectors
+
+def ingest_directory(
+    knowledge_dir: str = KNOWLEDGE_DIR,
+    db_path: str = DB_SAVE_PATH,
+    full: bool = False,
+    batch_size: int = EMBED_BATCH_SIZE,
+    concurrency: int = EMBED_CONCURRENCY,
+    checkpoint_every: int = CHECKPOINT_EVERY,
+    index_type: str = INDEX_TYPE,
+    index_params: dict = None,
+) -> dict:
+    """
+    Incrementally sync the vector store with every `.txt` file in `knowledge_dir`.
+
+    Chunks are content-addressed by their SHA-256, which doubles as the docstore
+    id. Only chunks that are new since the last run are embedded, chunks that
+    disappeared are deleted from the index, and unchanged files are not even
+    re-split thanks to the per-file hashes recorded in the manifest.
+
+    New chunks are streamed from the splitter through `embed_batches` and added
+    to the index batch by batch. The index is checkpointed every
+    `checkpoint_every` batches, so an interrupted build resumes where it
+    stopped: chunks already in the index are skipped on the next run.
+
+    Updates are always applied to an exact flat index. When `index_type` asks
+    for an approximate index (IVF-Flat, HNSW, IVF-PQ), it is rebuilt from the
+    flat vectors just before saving. An IVF-Flat or HNSW index found on disk
+    is turned back into a flat one from the vectors it stores. IVF-PQ only
+    keeps compressed codes, so its chunks are embedded again, which is only
+    free while the embedding cache still holds them.
+
+    Args:
+        knowledge_dir: Directory holding the knowledge files
+        db_path: Directory the FAISS index and manifest are saved to
+        full: Ignore the existing index and rebuild from scratch
+        batch_size: Chunks per embedding request
+        concurrency: Maximum embedding requests in flight
+        checkpoint_every: Batches between index checkpoints
+        index_type: One of `INDEX_TYPES`, the kind of index saved to disk
+        index_params: Overrides for `DEFAULT_INDEX_PARAMS`
+
+    Returns:
+        Counts of added, removed and unchanged chunks, plus throughput
+    """
+    logger.info("Starting incremental ingestion of %r", knowledge_dir)
+    start = time.perf_counter()
+    embedding_model = get_embedding_model(os.getenv("GOOGLE_API_KEY"))
+
+    previous = {"embedding_model": EMBEDDING_MODEL, "files": {}} if full else load_manifest(db_path)
+    vector_db = None if full else load_vector_store(db_path, embedding_model)
+    if previous.get("embedding_model") != EMBEDDING_MODEL or (vector_db and not previous["files"] and not os.path.exists(os.path.join(resolve_index_dir(db_path), MANIFEST_FILE))):
+        # Index built by another model or by the legacy single-file build.
+        previous = {"embedding_model": EMBEDDING_MODEL, "files": {}}
+        vector_db = None
+
+    # First pass: hash files and collect chunk ids only, so memory does not grow with the corpus text.
+    index_config = {"type": index_type, "params": {**DEFAULT_INDEX_PARAMS, **(index_params or {})}}
+    if index_type == "flat":
+        index_config["params"] = {}
+    manifest = {"embedding_model": EMBEDDING_MODEL, "index": index_config, "files": {}}
+    changed_files = []
+    for name, path, file_hash in iter_knowledge_files(knowledge_dir):
+        known = previous["files"].get(name)
+        if known and known["sha256"] == file_hash:
+            manifest["files"][name] = known
+            continue
+        logger.info("Splitting changed file: %s", name)
+        chunk_ids = list(dict.fromkeys(chunk_id for chunk_id, _, _ in iter_chunks([(name, path)])))
+        manifest["files"][name] = {"sha256": file_hash, "chunks": chunk_ids}
+        changed_files.append((name, path))
+
+    wanted_ids = {chunk_id for entry in manifest["files"].values() for chunk_id in entry["chunks"]}
+    existing_ids = set(vector_db.index_to_docstore_id.values()) if vector_db else set()
+    to_remove = sorted(existing_ids - wanted_ids)
+
+    if vector_db and not (to_remove or changed_files or manifest != previous):
+        logger.info("Knowledge index is already up to date")
+        return {"added": 0, "removed": 0, "unchanged": len(wanted_ids), "chunks_per_second": 0.0}
+
+    if vector_db and not isinstance(vector_db.index, faiss.IndexFlat):
+        vectors = stored_vectors(vector_db.index)
+        if vectors is None:
+            logger.info("Re-embedding the chunks of the IVF-PQ index to apply updates")
+            vectors = np.asarray(embedding_model.embed_documents(_docstore_texts(vector_db)))
+        else:
+            logger.info("Restoring a flat index from the saved vectors to apply updates")
+        vector_db.index = build_faiss_index(vectors)
+
+    if to_remove:
+        logger.info("Removing %d stale chunks", len(to_remove))
+        vector_db.delete(to_remove)
+
+    def checkpoint_manifest():
+        # Only record files whose chunks are all in the index, so a resumed run re-checks the rest.
+        present = set(vector_db.index_to_docstore_id.values()) if vector_db else set()
+        files = {
+            name: entry for name, entry in manifest["files"].items()
+            if all(chunk_id in present for chunk_id in entry["chunks"])
+        }
+        return {"embedding_model": EMBEDDING_MODEL, "index": {"type": "flat", "params": {}}, "files": files}
+
+    def new_chunks():
+        seen = set(existing_ids)
+        for chunk in iter_chunks(changed_files):
+            if chunk[0] not in seen:
+                seen.add(chunk[0])
+                yield chunk
+
+    added = 0
+    embed_start = time.perf_counter()
+    for batch_number, (batch, vectors) in enumerate(
+        embed_batches(batched(new_chunks(), batch_size), embedding_model.embed_documents, concurrency), 1
+    ):
+        ids = [chunk_id for chunk_id, _, _ in batch]
+        text_embeddings = [(text, vector) for (_, text, _), vector in zip(batch, vectors)]
+        metadatas = [metadata for _, _, metadata in batch]
+        if vector_db is None:
+            vector_db = FAISS.from_embeddings(text_embeddings, embedding_model, metadatas=metadatas, ids=ids)
+        else:
+            vector_db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        added += len(batch)
+
+        if batch_number % checkpoint_every == 0:
+            rate = added / max(time.perf_counter() - embed_start, 1e-9)
+            logger.info("Checkpoint: %d chunks embedded (%.1f chunks/s)", added, rate)
+            save_vector_store(vector_db, checkpoint_manifest(), db_path)
+
+    elapsed = time.perf_counter() - embed_start
+    summary = {
+        "added": added,
+        "removed": len(to_remove),
+        "unchanged": len(wanted_ids) - added,
+        "chunks_per_second": round(added / elapsed, 2) if added else 0.0,
+    }
+    if vector_db is None:
+        logger.error("No chunks were created from the knowledge directory. Please check the content.")
+        return summary
+
+    if index_type != "flat":
+        logger.info("Building %s index over %d vectors", index_type, vector_db.index.ntotal)
+        flat_vectors = vector_db.index.reconstruct_n(0, vector_db.index.ntotal)
+        try:
+            vector_db.index = build_faiss_index(flat_vectors, index_type, **index_config["params"])
+        except ValueError as e:
+            logger.warning("%s. Keeping the flat index.", e)
+            manifest["index"] = {"type": "flat", "params": {}}
+
+    save_vector_store(vector_db, manifest, db_path)
+    logger.info("Ingestion complete in %.2fs: %s", time.perf_counter() - start, summary)
+    return summary
 
 def build_and_save_vector_store():
     """
@@ -16,17 +404,14 @@ def build_and_save_vector_store():
     """
     print("--- Starting Vector Store Ingestion ---")
     print(f"1. Initializing embedding model...")
-    embedding_model = GoogleGenerativeAIEmbeddings(
-        model="models/embedding-001",
-        google_api_key=os.getenv("GOOGLE_API_KEY")
-    )
+    embedding_model = get_embedding_model(os.getenv("GOOGLE_API_KEY"))
 
     print(f"2. Loading document: {SOURCE_DOCUMENT}...")
     loader = TextLoader(SOURCE_DOCUMENT, encoding="utf-8")
     documents = loader.load()
 
     print(f"3. Splitting document into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+    text_splitter = _text_splitter()
     chunks = text_splitter.split_documents(documents)
     if not chunks:
         print("Error: No chunks were created from the document. Please check the content.")
@@ -36,11 +421,33 @@ def build_and_save_vector_store():
     vector_db = FAISS.from_documents(documents=chunks, embedding=embedding_model)
 
     print(f"5. Saving vector store to: {DB_SAVE_PATH}...")
-    vector_db.save_local(DB_SAVE_PATH)
+    save_vector_store(vector_db, None, DB_SAVE_PATH)
 
     print("--- Ingestion Complete! ---")
     print(f"Vector store has been successfully saved to '{DB_SAVE_PATH}'.")
 
 
 if __name__ == "__main__":
-    build_and_save_vector_store()
\ No newline at end of file
+    # Run as a module from `src/` (`python -m blogs.vector`): it uses the package's relative imports.
+    parser = argparse.ArgumentParser(prog="python -m blogs.vector", description="Build the FAISS knowledge index.")
+    parser.add_argument("--single", action="store_true", help=f"Rebuild only from {SOURCE_DOCUMENT} (legacy mode)")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-ingest every knowledge file")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=INDEX_TYPE, help="Kind of FAISS index to save")
+    parser.add_argument("--nlist", type=int, help="IVF: number of inverted lists")
+    parser.add_argument("--nprobe", type=int, help="IVF: lists probed per query")
+    parser.add_argument("--hnsw-m", type=int, help="HNSW: neighbours per node")
+    parser.add_argument("--ef-construction", type=int, help="HNSW: candidate list size while building")
+    parser.add_argument("--ef-search", type=int, help="HNSW: candidate list size per query")
+    parser.add_argument("--pq-m", type=int, help="IVF-PQ: sub-quantizers per vector")
+    parser.add_argument("--pq-nbits", type=int, help="IVF-PQ: bits per sub-quantizer code")
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.single:
+        build_and_save_vector_store()
+    else:
+        index_params = {
+            name: value for name, value in vars(args).items()
+            if name in DEFAULT_INDEX_PARAMS and value is not None
+        }
+        ingest_directory(full=args.full, index_type=args.index_type, index_params=index_params)
@@ -0,0 +1,66 @@
+"""
+Per-request crew setup overhead, before and after construction pooling.
+
+"before" rebuilds both tools and validates four Agents, four Tasks and the
+Crew from scratch, as every request used to; "after" is `BlogsCrew` plus
+`setup_crew` with process-wide tools and copied templates. Run with:
+
+    python tests/bench_crew_setup.py --requests 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("SERPAPI_API_KEY", "benchmark")
+
+from crewai import Agent, Crew, Process, Task
+from blogs.crew import BlogsCrew, get_llm
+from blogs.tools.custom_tool import MyCustomTool
+from blogs.tools.serpapi_tool import SerpAPITool
+
+STAGES = ("Trend Researcher", "Expert Content Creator", "Content Editor", "SEO and Marketing Specialist")
+
+
+def direct_setup(topic: str):
+    rag_tool = MyCustomTool(api_key=os.environ["GOOGLE_API_KEY"])
+    serpapi_tool = SerpAPITool(api_key=os.environ["SERPAPI_API_KEY"])
+    agents, tasks = [], []
+    for i, stage in enumerate(STAGES):
+        tools = [serpapi_tool] if i == 0 else [rag_tool] if i == 1 else []
+        agent = Agent(role=f"{topic} {stage}", goal=f"goal for {topic}", backstory="backstory", llm=get_llm(), tools=tools, verbose=True, allow_delegation=False)
+        context = {"context": [tasks[-1]]} if tasks else {}
+        tasks.append(Task(description=f"{stage} task for {topic}", expected_output="output", agent=agent, **context))
+        agents.append(agent)
+    return Crew(agents=agents, tasks=tasks, process=Process.sequential, verbose=True, max_execution_time=300, memory=False)
+
+
+def pooled_setup(topic: str):
+    return BlogsCrew(topic=topic, tone="casual", target_audience="developers").setup_crew()
+
+
+def measure(setup, requests: int):
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        setup("cold start")
+        cold = time.perf_counter() - start
+        for i in range(requests):
+            start = time.perf_counter()
+            setup(f"topic {i}")
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return cold * 1000, timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.99)] * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'setup':>8} {'cold ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, setup in (("before", direct_setup), ("after", pooled_setup)):
+        cold, p50, p99 = measure(setup, args.requests)
+        print(f"{name:>8} {cold:>9.2f} {p50:>8.3f} {p99:>8.3f}")
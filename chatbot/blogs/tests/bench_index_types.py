@@ -0,0 +1,81 @@
+"""
+Recall vs latency benchmark for the FAISS index types supported by `blogs.vector`.
+
+Builds every index type over synthetic clustered embeddings at several corpus
+sizes and reports recall@k against the exact flat index, p50/p99 single-query
+latency and serialized index size. Run with:
+
+    python tests/bench_index_types.py --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import faiss
+import numpy as np
+from blogs.vector import INDEX_TYPES, build_faiss_index
+
+
+def synthetic_embeddings(n, dim, clusters=64, seed=0):
+    """Clustered unit vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def query_latencies(index, queries, k):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def run(sizes, dim, k, num_queries, params):
+    print(f"{'size':>8} {'type':>9} {'build s':>8} {'recall@' + str(k):>9} {'p50 ms':>8} {'p99 ms':>8} {'MiB':>8}")
+    for size in sizes:
+        vectors = synthetic_embeddings(size, dim)
+        queries = synthetic_embeddings(num_queries, dim, seed=1)
+        exact = build_faiss_index(vectors, "flat")
+        _, truth = exact.search(queries, k)
+
+        for index_type in INDEX_TYPES:
+            start = time.perf_counter()
+            try:
+                index = build_faiss_index(vectors, index_type, **params)
+            except ValueError as e:
+                print(f"{size:>8} {index_type:>9}  skipped: {e}")
+                continue
+            build_seconds = time.perf_counter() - start
+
+            _, found = index.search(queries, k)
+            recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(num_queries)])
+            p50, p99 = query_latencies(index, queries, k)
+            size_mib = faiss.serialize_index(index).nbytes / 2 ** 20
+            print(f"{size:>8} {index_type:>9} {build_seconds:>8.2f} {recall:>9.3f} {p50:>8.3f} {p99:>8.3f} {size_mib:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension (768 for embedding-001)")
+    parser.add_argument("--k", type=int, default=3, help="Neighbours per query, as used by the RAG tool")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=100)
+    parser.add_argument("--nprobe", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--pq-m", type=int, default=16)
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)
+    run(
+        args.sizes,
+        args.dim,
+        args.k,
+        args.queries,
+        {"nlist": args.nlist, "nprobe": args.nprobe, "ef_search": args.ef_search, "pq_m": args.pq_m},
+    )
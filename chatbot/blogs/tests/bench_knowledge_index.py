@@ -0,0 +1,123 @@
+"""
+Load-time and memory benchmark: pickled LangChain index versus the mmap'd, pickle-free format.
+
+Builds a synthetic knowledge index of `--chunks` chunks (random 768-d vectors,
+~500-character texts) in both formats, then starts `--workers` processes per
+format that load it the way the RAG tool does, run one search and stay alive
+until all of them have loaded. Each worker reports its load time (after
+imports), private (anonymous) and file-backed resident memory, and PSS, which
+splits shared pages across the processes mapping them, so the total PSS shows
+what N workers really cost together. Run with:
+
+    python tests/bench_knowledge_index.py --chunks 50000 --workers 4
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TESTS_DIR), "src")
+
+WORKER = """
+import json, sys, time
+import numpy as np
+from blogs.tools.index_cache import index_cache
+start = time.perf_counter()
+vector_db = index_cache.get(sys.argv[1], None)
+docs = vector_db.similarity_search_by_vector(np.random.rand(int(sys.argv[2])).astype("float32").tolist(), k=3)
+loaded = time.perf_counter() - start
+print("ready", flush=True)
+sys.stdin.readline()
+
+def kib(path, fields):
+    values = {}
+    with open(path) as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in fields:
+                values[name] = int(rest.split()[0])
+    return values
+
+memory = kib("/proc/self/status", ("RssAnon", "RssFile")) | kib("/proc/self/smaps_rollup", ("Pss",))
+print(json.dumps({"load_seconds": loaded, "hits": len(docs), **memory}), flush=True)
+"""
+
+
+def build_corpus(chunks: int, dim: int, seed: int = 0) -> FAISS:
+    rng = np.random.default_rng(seed)
+    index = faiss.IndexFlatL2(dim)
+    index.add(rng.random((chunks, dim), dtype=np.float32))
+    words = ["agents", "trend", "style", "guide", "tone", "audience", "example", "blog", "draft", "search"]
+    ids = [f"chunk-{i}" for i in range(chunks)]
+    docstore = InMemoryDocstore({
+        doc_id: Document(page_content=" ".join(rng.choice(words, 70)), metadata={"source": f"file{i % 40}.txt"}, id=doc_id)
+        for i, doc_id in enumerate(ids)
+    })
+    return FAISS(None, index, docstore, dict(enumerate(ids)))
+
+
+def run_workers(path: str, workers: int, dim: int) -> list:
+    env = {**os.environ, "PYTHONPATH": SRC_DIR, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark")}
+    processes = [
+        subprocess.Popen([sys.executable, "-c", WORKER, path, str(dim)], env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        assert process.stdout.readline().strip() == "ready"
+    reports = []
+    for process in processes:
+        process.stdin.write("go\n")
+        process.stdin.flush()
+        reports.append(json.loads(process.stdout.readline()))
+        process.stdin.close()
+    for process in processes:
+        process.wait()
+    return reports
+
+
+def size_mib(path: str) -> float:
+    from blogs.tools.knowledge_store import resolve_index_dir
+
+    path = resolve_index_dir(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2 ** 20
+
+
+def run(chunks: int, workers: int, dim: int):
+    from blogs import vector
+
+    with tempfile.TemporaryDirectory() as root:
+        legacy, mapped = os.path.join(root, "pickled"), os.path.join(root, "mapped")
+        start = time.perf_counter()
+        vector_db = build_corpus(chunks, dim)
+        vector_db.save_local(legacy)
+        vector.save_vector_store(vector_db, None, mapped)
+        del vector_db
+        print(f"{chunks} chunks x {dim}d built in {time.perf_counter() - start:.1f}s; {workers} concurrent workers per format")
+
+        for label, path in (("pickled (index.pkl)", legacy), ("mmap + sqlite", mapped)):
+            reports = run_workers(path, workers, dim)
+            print(f"{label}: {size_mib(path):.1f} MiB on disk")
+            print(f"  load + first search  median {statistics.median(r['load_seconds'] for r in reports) * 1000:8.1f} ms")
+            print(f"  private RSS / worker median {statistics.median(r['RssAnon'] for r in reports) / 1024:8.1f} MiB")
+            print(f"  file RSS / worker    median {statistics.median(r['RssFile'] for r in reports) / 1024:8.1f} MiB")
+            print(f"  total PSS ({workers} workers)    {sum(r['Pss'] for r in reports) / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=768)
+    args = parser.parse_args()
+    run(args.chunks, args.workers, args.dim)
@@ -0,0 +1,202 @@
+"""
+Offline load test for `/api/generate-blog`.
+
+Drives the app in-process through `httpx.ASGITransport` with N concurrent
+clients while every upstream (Gemini, embeddings, SerpAPI) is served by the
+stand-ins in `replay.py`, with simulated latency and optional 429s. Caches
+start empty, and `--topics` controls how many distinct topics the requests
+cycle through. Reports throughput, p50/p95/p99 request latency, event-loop
+lag (how late a 10 ms timer fires while the load runs) and per-upstream call
+and 429 counts. `--quota-scale` multiplies the documented per-minute quotas
+so runs finish in seconds. Run with:
+
+    python tests/bench_load.py --clients 8 --requests 32 --llm-latency 0.2 --quota-scale 100
+
+`--max-p95` and `--max-loop-lag-ms` turn the run into a CI gate that exits
+non-zero when exceeded.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from unittest import mock
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")
+os.environ.setdefault("SERPAPI_API_KEY", "replay")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import httpx
+from blogs import crew as crew_module
+from blogs import blog_cache, deadlines, embedding_cache, main, rate_limiter
+from blogs.blog_cache import BlogCache
+from blogs.embedding_cache import EmbeddingCache
+from blogs.stage_cache import StageCache
+from blogs.tools import serpapi_tool
+from blogs.tools.search_cache import SearchCache
+from replay import ReplayEmbeddings, ReplayGoogleSearch, ReplayStore, Upstream, offline_upstreams
+
+LAG_PROBE_INTERVAL = 0.01
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+async def probe_loop_lag(lags: list, stop: asyncio.Event, interval: float = LAG_PROBE_INTERVAL):
+    """Record how late each `interval` sleep wakes up; blocking work on the loop shows up here."""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+@contextlib.contextmanager
+def isolated_state(quota_scale: float):
+    """
+    Empty in-memory caches, fresh rate limiters with every quota scaled by
+    `quota_scale`, and no learned LLM latencies.
+    """
+    scaled = {
+        name: {**limits, "rpm": limits["rpm"] * quota_scale, "tpm": limits["tpm"] and limits["tpm"] * quota_scale}
+        for name, limits in rate_limiter.UPSTREAM_LIMITS.items()
+    }
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(rate_limiter.UPSTREAM_LIMITS, scaled))
+        stack.enter_context(mock.patch.dict(rate_limiter._limiters, clear=True))
+        stack.enter_context(mock.patch.object(rate_limiter, "RATE_LIMIT_STATE_DIR", None))
+        stack.enter_context(mock.patch.object(blog_cache, "blog_cache", BlogCache()))
+        stack.enter_context(mock.patch.object(crew_module, "stage_cache", StageCache(path=None)))
+        stack.enter_context(mock.patch.object(serpapi_tool, "search_cache", SearchCache(path=None)))
+        stack.enter_context(mock.patch.object(embedding_cache, "embedding_cache", EmbeddingCache(path=None)))
+        stack.enter_context(mock.patch.object(deadlines, "latency_tracker", deadlines.LatencyTracker()))
+        yield
+
+
+async def drive(clients: int, requests: int, topics: int, use_cache: bool) -> dict:
+    """Send `requests` blog requests from `clients` concurrent clients and time each one."""
+    pending = asyncio.Queue()
+    for i in range(requests):
+        pending.put_nowait({
+            "topic": f"load test topic {i % topics}",
+            "tone": "casual",
+            "target_audience": "developers",
+            "use_cache": use_cache,
+        })
+    latencies, statuses = [], Counter()
+    lags, stop = [], asyncio.Event()
+
+    async def client_loop(client: httpx.AsyncClient):
+        while not pending.empty():
+            payload = pending.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/api/generate-blog", json=payload)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            probe = asyncio.create_task(probe_loop_lag(lags, stop))
+            start = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await probe
+
+    return {"elapsed": elapsed, "latencies": latencies, "statuses": statuses, "lags": lags}
+
+
+def run_load(clients: int = 4, requests: int = 16, topics: int = 4, use_cache: bool = True, quota_scale: float = 1.0,
+             llm: Upstream = None, embeddings: Upstream = None, search: Upstream = None, store: ReplayStore = None) -> dict:
+    """Run one load test against the replay stand-ins and return its report."""
+    with isolated_state(quota_scale), offline_upstreams(llm=llm, embeddings=embeddings, search=search, store=store) as replay_llm:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = asyncio.run(drive(clients, requests, topics, use_cache))
+        upstreams = {
+            "llm": replay_llm.upstream.stats(),
+            "embeddings": ReplayEmbeddings.upstream.stats(),
+            "search": ReplayGoogleSearch.upstream.stats(),
+        }
+
+    latencies, lags = run["latencies"], run["lags"]
+    return {
+        "clients": clients,
+        "requests": requests,
+        "ok": run["statuses"].get(200, 0),
+        "statuses": dict(run["statuses"]),
+        "elapsed_seconds": round(run["elapsed"], 3),
+        "throughput_rps": round(len(latencies) / run["elapsed"], 3) if run["elapsed"] else 0.0,
+        "latency_seconds": {f"p{q}": round(percentile(latencies, q), 3) for q in (50, 95, 99)} | {"max": round(max(latencies, default=0.0), 3)},
+        "loop_lag_ms": {f"p{q}": round(percentile(lags, q) * 1000, 2) for q in (50, 99)} | {"max": round(max(lags, default=0.0) * 1000, 2)},
+        "upstreams": upstreams,
+    }
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests from {report['clients']} clients in {report['elapsed_seconds']:.2f}s")
+    print(f"  ok:          {report['ok']} (statuses {report['statuses']})")
+    print(f"  throughput:  {report['throughput_rps']:.2f} req/s")
+    latency = report["latency_seconds"]
+    print(f"  latency:     p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s  max {latency['max']:.3f}s")
+    lag = report["loop_lag_ms"]
+    print(f"  loop lag:    p50 {lag['p50']:.2f}ms  p99 {lag['p99']:.2f}ms  max {lag['max']:.2f}ms")
+    for name, stats in report["upstreams"].items():
+        print(f"  {name + ':':<12} {stats['calls']} calls, {stats['rate_limited']} injected 429s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--topics", type=int, default=4, help="distinct topics the requests cycle through")
+    parser.add_argument("--no-cache", action="store_true", help="send use_cache=false")
+    parser.add_argument("--quota-scale", type=float, default=1.0, help="multiplier for the documented per-minute quotas")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.25, help="latency jitter as a fraction of each latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream calls answered with a 429")
+    parser.add_argument("--replay", help="JSON file of recorded responses to replay")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-p95", type=float, help="fail if p95 latency exceeds this many seconds")
+    parser.add_argument("--max-loop-lag-ms", type=float, help="fail if p99 event-loop lag exceeds this")
+    args = parser.parse_args()
+
+    logging.getLogger("blogs").setLevel(logging.WARNING)
+    upstream = lambda latency: Upstream(latency=latency, jitter=latency * args.jitter, error_rate=args.error_rate, seed=args.seed)
+    report = run_load(
+        clients=args.clients,
+        requests=args.requests,
+        topics=args.topics,
+        use_cache=not args.no_cache,
+        quota_scale=args.quota_scale,
+        llm=upstream(args.llm_latency),
+        embeddings=upstream(args.embedding_latency),
+        search=upstream(args.search_latency),
+        store=ReplayStore(args.replay),
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    failures = []
+    if args.max_p95 is not None and report["latency_seconds"]["p95"] > args.max_p95:
+        failures.append(f"p95 latency {report['latency_seconds']['p95']}s > {args.max_p95}s")
+    if args.max_loop_lag_ms is not None and report["loop_lag_ms"]["p99"] > args.max_loop_lag_ms:
+        failures.append(f"p99 loop lag {report['loop_lag_ms']['p99']}ms > {args.max_loop_lag_ms}ms")
+    if failures:
+        print("FAILED: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""
+Speed and accuracy benchmark for extracting the blog JSON from crew output.
+
+Compares the previous approach (a greedy `{.*}` regex over the whole output,
+then `json.loads`) with `parse_crew_result` on three corpora: clean outputs,
+outputs wrapped in Thought/Final Answer noise full of stray braces and quotes,
+and pathological inputs (thousands of unmatched "{"). Each output embeds a
+post of `--words` words. Reports accuracy and median parse time. Run with:
+
+    python tests/bench_output_parser.py --words 1200 --cases 200
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import statistics
+import time
+
+from blogs.output_parser import parse_crew_result
+from test_output_parser import noisy_output, random_metadata
+
+
+def greedy_regex(text: str):
+    """The parser this module replaced."""
+    match = re.search(r"{.*}", text, re.DOTALL)
+    if not match:
+        return {"blog_post": text}
+    try:
+        return json.loads(match.group())
+    except json.JSONDecodeError:
+        return {"blog_post": text}
+
+
+def corpora(cases: int, words: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    clean, noisy, pathological = [], [], []
+    for _ in range(cases):
+        metadata = random_metadata(rng, words)
+        clean.append((json.dumps(metadata), metadata))
+        noisy.append((noisy_output(rng, metadata), metadata))
+        stray = "Thought: {" * rng.randint(1_000, 5_000)
+        pathological.append((stray + "\n" + json.dumps(metadata), metadata))
+    return {"clean": clean, "noisy": noisy, "pathological": pathological}
+
+
+def measure(parse, corpus) -> dict:
+    timings, correct = [], 0
+    for text, expected in corpus:
+        start = time.perf_counter()
+        value = parse(text)
+        timings.append(time.perf_counter() - start)
+        correct += value == expected
+    return {"accuracy": correct / len(corpus), "median_ms": statistics.median(timings) * 1000, "max_ms": max(timings) * 1000}
+
+
+def run(cases: int, words: int, seed: int):
+    logging.getLogger("blogs").setLevel(logging.ERROR)
+    for name, corpus in corpora(cases, words, seed).items():
+        print(f"{name} ({len(corpus)} outputs, ~{statistics.mean(len(text) for text, _ in corpus) / 1024:.0f} KiB each)")
+        for label, parse in (("greedy regex", greedy_regex), ("scanner", parse_crew_result)):
+            result = measure(parse, corpus)
+            print(f"  {label:<13} accuracy {result['accuracy']:6.1%}  median {result['median_ms']:7.3f} ms  max {result['max_ms']:7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--words", type=int, default=1200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.cases, args.words, args.seed)
@@ -0,0 +1,127 @@
+"""
+Hit-rate and accuracy benchmark for the rule-based PromptFormatter fast path.
+
+Runs a labeled corpus of freestyle prompts through `PromptFormatter` with a
+stand-in LLM that returns the label, then reports how many prompts the rules
+answered without the LLM, how accurate those answers were per field, and the
+prompt cache hit rate when the corpus is replayed with casing and spacing
+variations. Run with:
+
+    python tests/bench_prompt_formatter.py
+"""
+import argparse
+import json
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from blogs.prompt_parser import PromptCache, PromptFormatter
+from blogs.prompt_rules import extract_prompt_fields
+
+# (prompt, expected topic, tone, audience)
+CORPUS = [
+    ("funny post about cats for kids", "cats", "funny", "kids"),
+    ("Write a blog post about the future of remote work", "future of remote work", "professional", "a general audience"),
+    ("Write an article on Rust async for developers in a technical tone", "Rust async", "technical", "developers"),
+    ("casual blog post about home espresso for beginners", "home espresso", "casual", "beginners"),
+    ("inspirational post for new parents about sleep training", "sleep training", "inspirational", "new parents"),
+    ("write about the history of jazz in a nostalgic tone", "history of jazz", "nostalgic", "a general audience"),
+    ("tips for remote work for managers", "tips for remote work", "professional", "managers"),
+    ("A humorous article about office coffee machines", "office coffee machines", "humorous", "a general audience"),
+    ("educational post about photosynthesis for students", "photosynthesis", "educational", "students"),
+    ("blog post on kubernetes autoscaling for engineers", "kubernetes autoscaling", "professional", "engineers"),
+    ("write a motivational post about running your first marathon for runners", "running your first marathon", "motivational", "runners"),
+    ("post about budgeting for college students in a friendly tone", "budgeting", "friendly", "college students"),
+    ("persuasive article about solar panels for homeowners", "solar panels", "persuasive", "homeowners"),
+    ("conversational post about houseplants", "houseplants", "conversational", "a general audience"),
+    ("Write about machine learning for beginners", "machine learning", "professional", "beginners"),
+    ("cats", "cats", "professional", "a general audience"),
+    ("sourdough baking", "sourdough baking", "professional", "a general audience"),
+    ("a witty post about procrastination for writers", "procrastination", "witty", "writers"),
+    ("create a detailed article about index funds for investors", "index funds", "professional", "investors"),
+    ("blog about travel hacks for travelers in a casual style", "travel hacks", "casual", "travelers"),
+    ("an informative post on vaccines for parents", "vaccines", "informative", "parents"),
+    ("write a serious article about climate change", "climate change", "serious", "a general audience"),
+    ("post about pixel art for game designers", "pixel art", "professional", "game designers"),
+    ("enthusiastic post about the new mars rover for kids", "new mars rover", "enthusiastic", "kids"),
+    ("Write a post about SQL indexing aimed at data scientists", "SQL indexing", "professional", "data scientists"),
+    ("academic article on transformer architectures for researchers", "transformer architectures", "academic", "researchers"),
+    ("a lighthearted post about dog training for pet owners", "dog training", "lighthearted", "pet owners"),
+    ("empathetic article about grief for families", "grief", "empathetic", "families"),
+    ("Tell me about gardening", "gardening", "professional", "a general audience"),
+    ("write something fun about board games for families", "board games", "fun", "families"),
+    ("I'm a nurse and want something about burnout that my colleagues would relate to but not too sad", "nurse burnout", "empathetic", "nurses"),
+    ("Explain quantum computing to high school students", "quantum computing", "educational", "high school students"),
+    ("Can you help me announce our product launch to existing customers without sounding salesy", "product launch announcement", "friendly", "existing customers"),
+    ("something my grandma would enjoy reading about smartphones", "smartphones", "friendly", "seniors"),
+    ("a post that compares react and vue but keep it short", "react vs vue", "professional", "developers"),
+    ("thoughts on why startups fail, make it punchy", "why startups fail", "punchy", "founders"),
+    ("Write a post about gardening tips for people who hate gardening", "gardening tips", "humorous", "people who hate gardening"),
+    ("Write a blog about dogs. Make it long and include 5 tips", "dogs", "informative", "dog owners"),
+    ("blog about tips for new managers", "tips for new managers", "professional", "new managers"),
+    ("write a guide for first-time home buyers", "first-time home buying guide", "informative", "first-time home buyers"),
+]
+
+
+class LabelLLM:
+    """Returns the corpus label for a prompt, standing in for a perfectly accurate LLM."""
+
+    def __init__(self, labels: dict):
+        self.labels = labels
+        self.calls = 0
+
+    def invoke(self, formatter_prompt):
+        self.calls += 1
+        user_prompt = formatter_prompt.split('User Prompt: "', 1)[1].rsplit('"', 1)[0]
+        return SimpleNamespace(content=json.dumps(self.labels[user_prompt]))
+
+
+def normalize(value: str) -> str:
+    words = value.lower().split()
+    return " ".join(word for word in words if word not in ("a", "an", "the"))
+
+
+def run(threshold: float, replays: int):
+    labels = {
+        prompt: {"topic": topic, "tone": tone, "target_audience": audience}
+        for prompt, topic, tone, audience in CORPUS
+    }
+    llm = LabelLLM(labels)
+    formatter = PromptFormatter(llm, cache=PromptCache(), confidence_threshold=threshold)
+
+    correct = {"topic": 0, "tone": 0, "target_audience": 0}
+    rule_answers = 0
+    latencies = []
+    for prompt, *_ in CORPUS:
+        start = time.perf_counter()
+        fields, confidence = extract_prompt_fields(prompt)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        if fields is None or confidence < threshold:
+            continue
+        rule_answers += 1
+        for field in correct:
+            correct[field] += normalize(fields[field]) == normalize(labels[prompt][field])
+
+    for _ in range(replays):
+        for prompt, *_ in CORPUS:
+            formatter.format_prompt(prompt)
+            formatter.format_prompt(f"  {prompt.upper()}. ")
+
+    latencies.sort()
+    print(f"corpus: {len(CORPUS)} prompts, confidence threshold {threshold}")
+    print(f"rule-based hit rate: {rule_answers / len(CORPUS):.1%} ({rule_answers} answered without the LLM)")
+    for field, count in correct.items():
+        print(f"  {field} accuracy on rule answers: {count / max(1, rule_answers):.1%}")
+    print(f"rule extraction p50 {latencies[len(latencies) // 2]:.0f} us, max {latencies[-1]:.0f} us")
+    stats = formatter.stats()
+    print(f"after {replays} replays with variants: {llm.calls} LLM calls, cache hit rate {stats['cache']['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--replays", type=int, default=3)
+    args = parser.parse_args()
+    run(args.threshold, args.replays)
@@ -0,0 +1,95 @@
+"""
+Cold-start benchmark: import time, startup time and time to first response.
+
+Each run is a fresh interpreter, started in the package directory so the
+RAG FAISS index is found. It times `import blogs.main`, the lifespan startup
+(settings, clients and, unless warm-up is off, the warm-up step), the first
+`GET /`, and then the setup work the first blog request has to do itself:
+importing and building the crew and loading the FAISS index. Nothing is sent
+upstream. Without warm-up that work moves from startup into the first blog
+request. Run with:
+
+    python tests/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TESTS_DIR), "src")
+PACKAGE_DIR = os.path.join(SRC_DIR, "blogs")
+
+PROBE = """
+import asyncio, contextlib, io, json, os, sys, time
+start = time.perf_counter()
+from blogs import main
+imported = time.perf_counter() - start
+heavy = sorted(name for name in ("crewai", "faiss", "langchain_google_genai") if name in sys.modules)
+
+import httpx
+
+async def probe():
+    timings = {"import": imported}
+    start = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        timings["startup"] = time.perf_counter() - start
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+            start = time.perf_counter()
+            assert (await client.get("/")).status_code == 200
+            timings["first_response"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        from blogs.crew import BlogsCrew
+        from blogs.tools.custom_tool import DB_SAVE_PATH
+        from blogs.tools.index_cache import index_cache
+        crew_setup = BlogsCrew(topic="startup benchmark", tone="casual", target_audience="developers")
+        crew_setup.setup_crew()
+        if os.path.exists(DB_SAVE_PATH):
+            index_cache.get(DB_SAVE_PATH, crew_setup.rag_tool.embedding_model)
+        timings["first_blog_setup"] = time.perf_counter() - start
+    return timings
+
+with contextlib.redirect_stdout(io.StringIO()):
+    timings = asyncio.run(probe())
+print(json.dumps({**timings, "heavy_modules_on_import": heavy}))
+"""
+
+
+def run_once(warm_up: bool) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": SRC_DIR,
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark"),
+        "SERPAPI_API_KEY": os.environ.get("SERPAPI_API_KEY", "benchmark"),
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "LOG_LEVEL": "WARNING",
+        # Use litellm's bundled model cost map instead of fetching it on import.
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "WARM_UP": "true" if warm_up else "false",
+    }
+    # -P keeps the package directory itself off sys.path, so its modules can't shadow top-level ones.
+    output = subprocess.run([sys.executable, "-P", "-c", PROBE], cwd=PACKAGE_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int):
+    for warm_up in (True, False):
+        results = [run_once(warm_up) for _ in range(runs)]
+        label = "with warm-up" if warm_up else "without warm-up"
+        print(f"{label} (median of {runs} cold starts)")
+        for name in ("import", "startup", "first_response", "first_blog_setup"):
+            print(f"  {name:<17} {statistics.median(result[name] for result in results) * 1000:8.1f} ms")
+        ready = statistics.median(result["import"] + result["startup"] + result["first_response"] for result in results)
+        print(f"  {'to first 200':<17} {ready * 1000:8.1f} ms")
+        print(f"  heavy modules imported by `import blogs.main`: {results[0]['heavy_modules_on_import'] or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    run(args.runs)
@@ -0,0 +1,93 @@
+"""
+Tail-latency benchmark: fixed LLM timeouts versus adaptive timeouts and hedged calls.
+
+Runs the offline load test (`bench_load.run_load`) three times against a
+simulated slow upstream, where a share `--tail-rate` of Gemini calls stall
+for `--tail-latency` seconds instead of the usual `--llm-latency`:
+
+- fixed: every LLM call waits up to the static `LLM_TIMEOUT`, as before
+- adaptive: each stage's attempts time out at a multiple of its observed
+  p99 and are retried while the request deadline allows
+- adaptive + hedge: a second request also fires once a call passes its
+  stage's p95, and the first answer wins
+
+Reports request latency percentiles and what the tail control cost in extra
+LLM calls. Stages learn their timeouts from the first requests of each run,
+so those are included in the percentiles. `--min-timeout` replaces the
+production `LLM_MIN_TIMEOUT` floor, which is sized for real Gemini latencies
+rather than the simulated ones. Run with:
+
+    python tests/bench_tail_latency.py --requests 200 --tail-rate 0.01 --tail-latency 3
+"""
+import argparse
+import logging
+from unittest import mock
+
+from prometheus_client import REGISTRY
+
+from bench_load import run_load
+from blogs import deadlines
+from replay import Upstream
+
+MODES = {
+    "fixed": {"LATENCY_MIN_SAMPLES": 10 ** 9, "LLM_HEDGE": False},
+    "adaptive": {"LLM_HEDGE": False},
+    "adaptive + hedge": {"LLM_HEDGE": True},
+}
+
+
+def counter_total(name: str) -> float:
+    return sum(
+        sample.value
+        for metric in REGISTRY.collect() if metric.name == name
+        for sample in metric.samples if sample.name.endswith("_total")
+    )
+
+
+def run_mode(settings: dict, args) -> dict:
+    counters = ("blog_llm_timeouts", "blog_llm_hedges")
+    before = {name: counter_total(name) for name in counters}
+    llm = Upstream(latency=args.llm_latency, jitter=args.llm_latency * args.jitter, tail_rate=args.tail_rate, tail_latency=args.tail_latency, seed=args.seed)
+    with mock.patch.multiple(deadlines, LLM_MIN_TIMEOUT=args.min_timeout, **settings):
+        report = run_load(
+            clients=args.clients,
+            requests=args.requests,
+            topics=args.requests,
+            use_cache=False,
+            quota_scale=1000,
+            llm=llm,
+            embeddings=Upstream(latency=0.005),
+            search=Upstream(latency=0.01),
+        )
+    report["timeouts"], report["hedges"] = (counter_total(name) - before[name] for name in counters)
+    return report
+
+
+def run(args):
+    logging.getLogger("blogs").setLevel(logging.ERROR)
+    print(
+        f"{args.requests} requests from {args.clients} clients; LLM {args.llm_latency * 1000:.0f} ms "
+        f"± {args.jitter:.0%}, {args.tail_rate:.1%} of calls stall for {args.tail_latency:.1f}s"
+    )
+    print(f"{'mode':<18} {'ok':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'LLM calls/req':>14} {'timeouts':>9} {'hedges':>7}")
+    for name, settings in MODES.items():
+        report = run_mode(settings, args)
+        latency = report["latency_seconds"]
+        calls = report["upstreams"]["llm"]["calls"] / report["requests"]
+        print(
+            f"{name:<18} {report['ok']:>5} {latency['p50']:>7.3f}s {latency['p95']:>7.3f}s {latency['p99']:>7.3f}s "
+            f"{latency['max']:>7.3f}s {calls:>14.2f} {report['timeouts']:>9.0f} {report['hedges']:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.25, help="LLM latency jitter as a fraction of the latency")
+    parser.add_argument("--tail-rate", type=float, default=0.01, help="share of LLM calls that stall")
+    parser.add_argument("--tail-latency", type=float, default=3.0, help="seconds a stalled call takes")
+    parser.add_argument("--min-timeout", type=float, default=0.0, help="floor for the adaptive timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    run(parser.parse_args())
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+# Set before any test module imports `blogs`, whose settings require an API key.
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    """Give each test's app lifespan its own job queue instead of the package's."""
+    from blogs import jobs
+
+    monkeypatch.setattr(jobs, "JOBS_DB_PATH", str(tmp_path / "jobs.sqlite"))
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that record every text sent to the model."""
+
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def _vector(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts):
+        self.documents.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vector(text)
+
+
+@pytest.fixture
+def counting_embeddings():
+    return CountingEmbeddings()
@@ -0,0 +1,379 @@
+"""
+Record/replay stand-ins for the app's upstream APIs.
+
+`ReplayLLM` replaces `litellm.completion` underneath CrewAI's `LLM`, so
+`RateLimitedLLM`, its limiter and the crew's retry and token accounting run
+unchanged. `ReplayEmbeddings` replaces `GoogleGenerativeAIEmbeddings` and
+`ReplayGoogleSearch` replaces `serpapi.GoogleSearch` (and the pooled httpx
+client behind `SerpAPITool.asearch`).
+
+Each stand-in answers from a `ReplayStore` when it holds a recording for the
+exact request and otherwise synthesizes a deterministic response, after a
+simulated latency and with an optional share of 429s. With `record=True`
+they call the real upstream and save what it returned instead. Install all
+three with `offline_upstreams()`:
+
+    with offline_upstreams(llm=Upstream(latency=0.5, error_rate=0.02)):
+        ...
+"""
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+from unittest import mock
+
+import httpx
+import litellm
+from google.api_core.exceptions import ResourceExhausted
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_DIM = 768
+
+
+def fingerprint(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    """Recorded upstream responses keyed by `(upstream, request fingerprint)`, kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    def get(self, upstream: str, key: str):
+        with self._lock:
+            return self._entries.get(f"{upstream}:{key}")
+
+    def put(self, upstream: str, key: str, value):
+        with self._lock:
+            self._entries[f"{upstream}:{key}"] = value
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock, open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1, sort_keys=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@dataclass
+class Upstream:
+    """
+    Simulated behaviour of one upstream API.
+
+    Each call waits `latency` seconds, give or take `jitter`, and then fails
+    with a 429 with probability `error_rate`. A share `tail_rate` of calls
+    stall for `tail_latency` instead, like a slow upstream replica.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+    seed: int = 0
+    calls: int = 0
+    rate_limited: int = 0
+    _random: random.Random = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def roll(self) -> tuple:
+        """Count a call and return `(delay, rate_limited)` for it."""
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if self.tail_rate and self._random.random() < self.tail_rate:
+                delay = self.tail_latency
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.rate_limited += 1
+        return delay, failed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "rate_limited": self.rate_limited}
+
+
+def _role(messages) -> str:
+    match = re.search(r"You are (.+?)\.", messages[0]["content"]) if messages else None
+    return match.group(1) if match else ""
+
+
+def _should_use_tool(messages, tool: str) -> bool:
+    """True on an agent's first turn when `tool` was given to it."""
+    if not messages or tool not in messages[0]["content"]:
+        return False
+    return not any(message["role"] == "assistant" and "Observation:" in message["content"] for message in messages)
+
+
+def synthesize_completion(messages) -> str:
+    """
+    A ReAct answer shaped like the crew's real ones.
+
+    The researcher and writer call their tool once, when they have it, so
+    tool paths get exercised, and the SEO specialist answers with the
+    metadata JSON the API parses (echoing a post only if asked for
+    `full_content`).
+    """
+    role = _role(messages)
+    topic = role.rsplit(" ", 2)[0] if role else "the topic"
+    if role.endswith("Trend Researcher") and _should_use_tool(messages, "Search Trends Tool"):
+        return f'Thought: I should look up what is trending.\nAction: Search Trends Tool\nAction Input: {{"query": "{topic} trends"}}'
+    if role.endswith("Content Creator") and _should_use_tool(messages, "RAG Search Tool"):
+        return f'Thought: I should check the style guide.\nAction: RAG Search Tool\nAction Input: {{"query": "{topic} blog examples"}}'
+    if role.endswith("SEO and Marketing Specialist"):
+        metadata = {
+            "title": f"What's next for {topic}",
+            "meta_description": f"A look at the latest trends in {topic}.",
+            "hashtags": ["#" + (re.sub(r"\W+", "", topic.title()) or "Blog"), "#Trends"],
+            "summary": f"The trends shaping {topic} right now.",
+        }
+        if "full_content" in json.dumps(messages):
+            metadata["full_content"] = f"# What's next for {topic}\n\n" + f"Replayed paragraph about {topic}. " * 40
+        return "Thought: I have the metadata.\nFinal Answer: " + json.dumps(metadata)
+    return f"Thought: I can answer now.\nFinal Answer: {role or 'assistant'} notes on {topic}. " + "Replayed sentence. " * 60
+
+
+class ReplayLLM:
+    """
+    Drop-in for `litellm.completion` (non-streaming).
+
+    Replays a recording for the exact model and messages when the store has
+    one, and synthesizes an answer otherwise. Injected failures raise
+    `litellm.RateLimitError`, as a Gemini 429 would, and a simulated delay
+    longer than the call's `timeout` raises `litellm.Timeout` once the
+    timeout is up, as the HTTP client would.
+    """
+
+    def __init__(self, upstream: Optional[Upstream] = None, store: Optional[ReplayStore] = None, record: bool = False, completion=None):
+        self.upstream = upstream or Upstream()
+        self.store = store if store is not None else ReplayStore()
+        self.record = record
+        self.completion = completion or litellm.completion
+
+    def __call__(self, model: str, messages: List[dict], **params):
+        key = fingerprint(model, messages)
+        if self.record:
+            response = self.completion(model=model, messages=messages, **params)
+            self.store.put("llm", key, {
+                "content": response.choices[0].message.content,
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+            })
+            return response
+
+        delay, failed = self.upstream.roll()
+        timeout = params.get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise litellm.Timeout(message=f"Request timed out after {timeout:.2f}s (simulated)", model=model, llm_provider="gemini")
+        time.sleep(delay)
+        if failed:
+            raise litellm.RateLimitError(message="429 RESOURCE_EXHAUSTED (injected)", llm_provider="gemini", model=model)
+        recorded = self.store.get("llm", key)
+        if recorded is None:
+            content = synthesize_completion(messages)
+            recorded = {
+                "content": content,
+                "prompt_tokens": sum(len(message["content"]) for message in messages) // 4,
+                "completion_tokens": len(content) // 4,
+            }
+        return litellm.ModelResponse(
+            model=model,
+            choices=[litellm.Choices(message=litellm.Message(content=recorded["content"], role="assistant"))],
+            usage=litellm.Usage(
+                prompt_tokens=recorded["prompt_tokens"],
+                completion_tokens=recorded["completion_tokens"],
+                total_tokens=recorded["prompt_tokens"] + recorded["completion_tokens"],
+            ),
+        )
+
+
+def synthesize_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """A unit vector seeded by the text, so equal texts embed identically."""
+    rng = random.Random(fingerprint(text))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(value * value for value in vector) ** 0.5
+    return [value / norm for value in vector]
+
+
+class ReplayEmbeddings(Embeddings):
+    """
+    Stand-in for `GoogleGenerativeAIEmbeddings`. Every request (one per
+    `embed_*` call) pays the simulated latency once; injected failures raise
+    `ResourceExhausted`.
+    """
+
+    upstream = Upstream()
+    store = ReplayStore()
+    record = False
+
+    def __init__(self, model: str = "models/embedding-001", google_api_key: Optional[str] = None, **kwargs):
+        self.model = model
+        self.google_api_key = google_api_key
+        self._real = None
+        if self.record:
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            self._real = GoogleGenerativeAIEmbeddings(model=model, google_api_key=google_api_key, **kwargs)
+
+    def _vectors(self, kind: str, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            recorded = self.store.get("embeddings", fingerprint(self.model, kind, text))
+            vectors.append(recorded if recorded is not None else synthesize_embedding(f"{kind}\0{text}"))
+        return vectors
+
+    def _record(self, kind: str, texts: List[str], vectors: List[List[float]]) -> List[List[float]]:
+        for text, vector in zip(texts, vectors):
+            self.store.put("embeddings", fingerprint(self.model, kind, text), list(vector))
+        return vectors
+
+    def _roll(self) -> float:
+        delay, failed = self.upstream.roll()
+        if failed:
+            raise ResourceExhausted("Resource has been exhausted (injected)")
+        return delay
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self._real:
+            return self._record("document", texts, self._real.embed_documents(texts))
+        delay = self._roll()
+        time.sleep(delay)
+        return self._vectors("document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self._real:
+            return self._record("query", [text], [self._real.embed_query(text)])[0]
+        delay = self._roll()
+        time.sleep(delay)
+        return self._vectors("query", [text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self._real:
+            return self._record("document", texts, await self._real.aembed_documents(texts))
+        delay = self._roll()
+        await asyncio.sleep(delay)
+        return self._vectors("document", texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self._real:
+            return self._record("query", [text], [await self._real.aembed_query(text)])[0]
+        delay = self._roll()
+        await asyncio.sleep(delay)
+        return self._vectors("query", [text])[0]
+
+
+def _search_key(params: dict) -> str:
+    return fingerprint({name: value for name, value in params.items() if name not in ("api_key", "output", "source")})
+
+
+def synthesize_search(params: dict) -> dict:
+    """A SerpAPI-shaped response with a few results that overlap across related queries."""
+    query = params.get("q", "")
+    words = [word for word in re.findall(r"\w+", query.lower()) if word not in ("trends", "news", "latest", "viral", "what", "s", "new", "in")]
+    slug = "-".join(words[:4]) or "topic"
+    items = [
+        {
+            "title": f"{query.title()} ({i + 1})",
+            "snippet": f"Replayed result {i + 1} for {query}.",
+            "link": f"https://example.com/{slug}/{(i + len(query)) % 7}",
+            "date": "1 day ago",
+        }
+        for i in range(min(int(params.get("num", 10)), 5))
+    ]
+    results_key = "news_results" if params.get("tbm") == "nws" else "organic_results"
+    return {
+        results_key: items,
+        "related_searches": [{"query": f"{slug.replace('-', ' ')} {suffix}"} for suffix in ("2025", "tips", "examples")],
+        "people_also_ask": [{"question": f"Why is {slug.replace('-', ' ')} popular?"}],
+    }
+
+
+class ReplayGoogleSearch:
+    """Stand-in for `serpapi.GoogleSearch`. Injected failures return SerpAPI's error payload."""
+
+    upstream = Upstream()
+    store = ReplayStore()
+    record = False
+
+    def __init__(self, params: dict):
+        self.params = params
+
+    def get_dict(self) -> dict:
+        key = _search_key(self.params)
+        if self.record:
+            from serpapi import GoogleSearch
+            results = GoogleSearch(self.params).get_dict()
+            self.store.put("search", key, results)
+            return results
+        delay, failed = self.upstream.roll()
+        time.sleep(delay)
+        if failed:
+            return {"error": "Your account has run out of searches (injected 429)."}
+        return self.store.get("search", key) or synthesize_search(self.params)
+
+
+def replay_search_transport() -> httpx.MockTransport:
+    """httpx transport answering `SerpAPITool.asearch` the way `ReplayGoogleSearch` answers `search`."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        delay, failed = ReplayGoogleSearch.upstream.roll()
+        await asyncio.sleep(delay)
+        if failed:
+            return httpx.Response(429, json={"error": "Your account has run out of searches (injected 429)."})
+        return httpx.Response(200, json=ReplayGoogleSearch.store.get("search", _search_key(params)) or synthesize_search(params))
+
+    return httpx.MockTransport(handler)
+
+
+@contextlib.contextmanager
+def offline_upstreams(llm: Optional[Upstream] = None, embeddings: Optional[Upstream] = None, search: Optional[Upstream] = None,
+                      store: Optional[ReplayStore] = None, record: bool = False):
+    """
+    Route every upstream call made by the app through the replay stand-ins.
+
+    Also drops the crew module's process-wide tools and templates so they are
+    rebuilt around the stand-ins. Recordings are saved to `store` on exit
+    when `record` is set.
+
+    Yields:
+        The `ReplayLLM`, whose `upstream` (like `ReplayEmbeddings.upstream`
+        and `ReplayGoogleSearch.upstream`) holds the call and 429 counts
+    """
+    from blogs import crew as crew_module
+    from blogs import embedding_cache
+    from blogs.tools import serpapi_tool
+
+    store = store if store is not None else ReplayStore()
+    replay_llm = ReplayLLM(llm, store, record)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(litellm, "completion", replay_llm))
+        stack.enter_context(mock.patch.multiple(ReplayEmbeddings, upstream=embeddings or Upstream(), store=store, record=record))
+        stack.enter_context(mock.patch.multiple(ReplayGoogleSearch, upstream=search or Upstream(), store=store, record=record))
+        stack.enter_context(mock.patch.object(embedding_cache, "GoogleGenerativeAIEmbeddings", ReplayEmbeddings))
+        stack.enter_context(mock.patch.object(serpapi_tool, "GoogleSearch", ReplayGoogleSearch))
+        if not record:
+            stack.enter_context(mock.patch.object(serpapi_tool, "_async_client", httpx.AsyncClient(transport=replay_search_transport())))
+        stack.enter_context(mock.patch.object(crew_module, "_shared_tools", None))
+        stack.enter_context(mock.patch.object(crew_module, "_templates", None))
+        yield replay_llm
+        if record:
+            store.save()
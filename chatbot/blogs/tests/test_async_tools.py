@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from blogs import main
+from blogs.embedding_cache import CachedEmbeddings, EmbeddingCache
+from blogs.tools import custom_tool, serpapi_tool
+from blogs.tools.search_cache import SearchCache
+
+
+def test_serpapi_arun_uses_pooled_async_client(monkeypatch):
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"news_results": [{"title": request.url.params["q"], "link": "https://example.com"}]})
+
+    monkeypatch.setattr(serpapi_tool, "search_cache", SearchCache())
+    monkeypatch.setattr(serpapi_tool, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    tool = serpapi_tool.SerpAPITool(api_key="key")
+
+    async def run():
+        return await asyncio.gather(*(tool._arun(f"topic {i}", "news") for i in range(5)))
+
+    results = asyncio.run(run())
+
+    assert [f"**topic {i}**" in result for i, result in enumerate(results)] == [True] * 5
+    assert all(request.url.params["tbm"] == "nws" for request in requests)
+    assert len(requests) == 5
+
+
+def test_serpapi_error_responses_are_not_cached(monkeypatch):
+    responses = iter([
+        httpx.Response(429, json={"error": "Your account has run out of searches."}),
+        httpx.Response(502, text="<html>Bad Gateway</html>"),
+        httpx.Response(200, json={"organic_results": [{"title": "Agents", "link": "https://example.com"}]}),
+    ])
+    cache = SearchCache()
+    monkeypatch.setattr(serpapi_tool, "search_cache", cache)
+    monkeypatch.setattr(serpapi_tool, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(lambda request: next(responses))))
+    tool = serpapi_tool.SerpAPITool(api_key="key")
+
+    async def run():
+        return [await tool.asearch("AI agents") for _ in range(3)]
+
+    quota, gateway, results = asyncio.run(run())
+
+    assert quota == {"error": "Your account has run out of searches."}
+    assert gateway == {"error": "SerpAPI returned a non-JSON response (HTTP 502)"}
+    assert results["organic_results"][0]["title"] == "Agents"
+    assert cache.stats()["entries"] == 1
+
+
+def test_rag_arun_searches_off_the_event_loop(tmp_path, monkeypatch):
+    FAISS.from_texts(["style guide", "blog example"], FakeEmbeddings(size=8)).save_local(str(tmp_path))
+    monkeypatch.setattr(custom_tool, "DB_SAVE_PATH", str(tmp_path))
+    monkeypatch.setattr(
+        custom_tool,
+        "get_embedding_model",
+        lambda api_key: CachedEmbeddings(FakeEmbeddings(size=8), "fake-model", EmbeddingCache(None)),
+    )
+    tool = custom_tool.MyCustomTool(api_key="key")
+
+    result = asyncio.run(tool._arun("writing samples"))
+
+    assert result.startswith("Retrieved context for 'writing samples'")
+
+
+def test_app_shutdown_closes_the_pooled_client():
+    with TestClient(main.app):
+        client = serpapi_tool.get_async_client()
+
+    assert client.is_closed
+    assert serpapi_tool._async_client is None
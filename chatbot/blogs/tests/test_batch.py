@@ -0,0 +1,116 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from blogs import batch as batch_module, main
+from blogs.batch import BatchRunner
+from blogs.deadlines import check_deadline, deadline
+from bench_load import isolated_state
+from replay import Upstream, offline_upstreams
+
+
+def item(topic, tone="casual", target_audience="developers"):
+    return {"topic": topic, "tone": tone, "target_audience": target_audience, "use_cache": True}
+
+
+def test_each_item_gets_its_own_deadline():
+    async def runner(request, event_callback):
+        await asyncio.sleep(0.1)
+        check_deadline("item")
+        if request["tone"] == "slow":
+            raise asyncio.TimeoutError()
+        return {"title": request["topic"]}
+
+    async def run():
+        with deadline(0.25):
+            return await BatchRunner(runner, concurrency=1).run([item(f"topic {i}") for i in range(4)] + [item("late", "slow")])
+
+    results = asyncio.run(run())["results"]
+
+    assert [result["status"] for result in results] == ["succeeded"] * 4 + ["failed"]
+    assert results[-1]["error"] == "TimeoutError"
+
+
+def test_research_runs_once_per_topic_on_a_bounded_pool():
+    researched, log = set(), []
+    in_flight = peak = 0
+
+    async def runner(request, event_callback):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            log.append(("start", request["topic"], request["tone"]))
+            if request["tone"] == "fail":
+                raise RuntimeError("upstream down")
+            topic = " ".join(request["topic"].lower().split())
+            if topic in researched:
+                event_callback("task_cached", task="research")
+            else:
+                await asyncio.sleep(0.01)
+                researched.add(topic)
+                event_callback("task_finished", task="research")
+            await asyncio.sleep(0.01)
+            event_callback("task_finished", task="writing")
+            return {"title": f"{request['topic']} ({request['tone']})"}
+        finally:
+            in_flight -= 1
+
+    items = [item("AI agents"), item("Sourdough", "fail"), item("ai  agents", "formal"), item("Sourdough"),
+             item("AI agents", "Casual"), item("Sourdough", "funny")]
+    batch = asyncio.run(BatchRunner(runner, concurrency=2).run(items))
+    results, stats = batch["results"], batch["stats"]
+
+    assert [result["index"] for result in results] == list(range(6))
+    assert [result["status"] for result in results] == ["succeeded", "failed", "succeeded", "succeeded", "succeeded", "succeeded"]
+    assert results[1]["error"] == "upstream down"
+    assert results[4]["deduplicated"] and results[4]["result"] == results[0]["result"]
+    assert results[2]["stages_cached"] == ["research"]
+    # The failed leader hands over to the next Sourdough item before the rest start.
+    assert log.index(("start", "Sourdough", "casual")) < log.index(("start", "Sourdough", "funny"))
+    assert log.index(("start", "AI agents", "casual")) < log.index(("start", "ai  agents", "formal"))
+    assert peak <= 2
+    assert stats["items"] == 6 and stats["unique_items"] == 5 and stats["topics"] == 2
+    assert stats["succeeded"] == 5 and stats["failed"] == 1
+    assert stats["research_runs"] == 2
+    assert stats["items_per_minute"] > 0
+    assert set(stats["quota"]) == {"gemini", "serpapi"}
+
+
+def test_concurrent_batches_share_one_pool(monkeypatch):
+    monkeypatch.setattr(batch_module, "BATCH_CONCURRENCY", 2)
+    in_flight = peak = 0
+
+    async def runner(request, event_callback):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"title": request["topic"]}
+
+    async def run():
+        batches = [BatchRunner(runner, concurrency=2).run([item(f"batch {b} topic {i}") for i in range(3)]) for b in range(3)]
+        return await asyncio.gather(*batches)
+
+    batches = asyncio.run(run())
+
+    assert all(result["status"] == "succeeded" for batch in batches for result in batch["results"])
+    assert peak == 2
+
+
+def test_batch_endpoint_shares_research_across_tones():
+    payload = {"items": [item(topic, tone) for topic in ("AI agents", "Sourdough") for tone in ("casual", "formal")]}
+
+    with isolated_state(quota_scale=1000), offline_upstreams(llm=Upstream(latency=0.01), search=Upstream(latency=0.01)):
+        with TestClient(main.app) as client:
+            response = client.post("/api/generate-blog/batch", json=payload)
+            too_many = client.post("/api/generate-blog/batch", json={"items": [item("x")] * (main.BATCH_MAX_ITEMS + 1)})
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert [result["status"] for result in batch["results"]] == ["succeeded"] * 4
+    assert all(result["result"]["title"] for result in batch["results"])
+    assert batch["stats"]["research_runs"] == 2
+    assert batch["stats"]["stages_reused"] == 2
+    assert batch["stats"]["stages_run"] == 2 * 4 + 2 * 3
+    assert too_many.status_code == 422
@@ -0,0 +1,111 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from blogs import blog_cache, embedding_cache, main
+from blogs import crew as crew_module
+from blogs.blog_cache import BlogCache, normalize_blog_request
+
+
+class TopicEmbeddings:
+    """Maps known topics to fixed vectors so similarity is predictable."""
+
+    VECTORS = {
+        "ai agents": [1.0, 0.0, 0.0],
+        "ai agent frameworks": [0.95, 0.05, 0.0],
+        "sourdough baking": [0.0, 1.0, 0.0],
+    }
+
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return self.VECTORS.get(text, [0.0, 0.0, 1.0])
+
+
+def test_exact_hits_use_the_normalized_triple():
+    cache = BlogCache()
+
+    async def scenario():
+        await cache.put("AI Agents", "Casual", "developers", {"title": "Agents"})
+        return await cache.get("  ai   agents!", "casual", "Developers")
+
+    result, info = asyncio.run(scenario())
+
+    assert result == {"title": "Agents"}
+    assert info["match"] == "exact"
+    assert normalize_blog_request("AI  Agents.", "Casual", "Devs") == ("ai agents", "casual", "devs")
+
+
+def test_similar_topics_hit_only_with_matching_tone_and_audience():
+    cache = BlogCache(embeddings=TopicEmbeddings(), threshold=0.9)
+
+    async def scenario():
+        await cache.put("AI agents", "casual", "developers", {"title": "Agents"})
+        similar = await cache.get("AI agent frameworks", "casual", "developers")
+        other_tone = await cache.get("AI agent frameworks", "formal", "developers")
+        unrelated = await cache.get("sourdough baking", "casual", "developers")
+        return similar, other_tone, unrelated
+
+    similar, other_tone, unrelated = asyncio.run(scenario())
+
+    assert similar[0] == {"title": "Agents"}
+    assert similar[1]["match"] == "similar"
+    assert similar[1]["similarity"] > 0.9
+    assert other_tone is None
+    assert unrelated is None
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = BlogCache(embeddings=TopicEmbeddings(), ttl=0)
+
+    async def scenario():
+        await cache.put("AI agents", "casual", "developers", {"title": "Agents"})
+        return await cache.get("AI agents", "casual", "developers")
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_generate_blog_serves_repeat_requests_from_cache(monkeypatch):
+    kickoffs = []
+
+    class FakeCrew:
+        current_year = "2025"
+        rag_tool = object()
+        serpapi_tool = None
+
+        def __init__(self, topic, tone, target_audience, use_cache=True):
+            self.topic = topic
+
+        def plan_stages(self):
+            return 0
+
+        def setup_crew(self, research_context=None, event_callback=None):
+            return self
+
+        def kickoff(self, crew):
+            kickoffs.append(self.topic)
+            return '{"title": "Agents", "summary": "fresh"}'
+
+        def edited_post(self):
+            return None
+
+        def token_report(self):
+            return {}
+
+    monkeypatch.setattr(crew_module, "BlogsCrew", FakeCrew)
+    monkeypatch.setattr(blog_cache, "blog_cache", BlogCache())
+    monkeypatch.setattr(embedding_cache, "get_embedding_model", lambda api_key: None)
+
+    with TestClient(main.app) as client:
+        first = client.post("/api/generate-blog", json={"topic": "AI agents"}).json()
+        second = client.post("/api/generate-blog", json={"topic": "ai agents "}).json()
+        bypass = client.post("/api/generate-blog", json={"topic": "AI agents", "use_cache": False}).json()
+
+    assert first["cache"] == {"hit": False}
+    assert second["cache"]["hit"] is True and second["cache"]["match"] == "exact"
+    assert second["title"] == "Agents"
+    assert bypass["cache"] == {"hit": False}
+    assert kickoffs == ["AI agents", "AI agents"]
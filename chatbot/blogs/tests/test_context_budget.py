@@ -0,0 +1,70 @@
+from fastapi.testclient import TestClient
+from blogs import context_budget, main
+from blogs.context_budget import TRIMMED_NOTE, budget_context, compact_report, outline
+from blogs.output_parser import parse_crew_result
+from blogs.rate_limiter import estimate_tokens
+from bench_load import isolated_state
+from replay import Upstream, offline_upstreams
+
+REPORT = """Thought: I now know the final answer
+Final Answer:
+## Trending angles
+
+- Agents are moving into production.   More teams ship them every month.
+* Agents are moving into production. More teams ship them every month.
+
+----------
+1. Evaluation tooling is the new bottleneck. Vendors are racing to fill the gap.
+"""
+
+POST = "\n\n".join(
+    [f"# Agents in {2024 + i}\n\nThe lead sentence of section {i}. " + "Supporting detail that the summarizer can skip. " * 30 for i in range(6)]
+)
+
+
+def test_research_report_is_compacted_within_budget():
+    compact = compact_report(REPORT, budget=500)
+
+    assert compact.splitlines() == [
+        "## Trending angles",
+        "- Agents are moving into production. More teams ship them every month.",
+        "1. Evaluation tooling is the new bottleneck. Vendors are racing to fill the gap.",
+    ]
+    long_report = "\n".join(f"- Finding {i}: " + "a long supporting sentence. " * 20 for i in range(40))
+    assert estimate_tokens(compact_report(long_report, budget=300)) <= 300 + estimate_tokens(TRIMMED_NOTE)
+
+
+def test_summarizer_gets_an_outline_and_editor_the_whole_draft():
+    summary_context = outline(POST, budget=200)
+
+    assert [line for line in summary_context.splitlines() if line.startswith("#")] == [f"# Agents in {2024 + i}" for i in range(6)]
+    assert "The lead sentence of section 5." in summary_context
+    assert "Supporting detail" not in summary_context
+    assert outline("short post", budget=200) == "short post"
+    long_draft = POST * 50
+    assert budget_context("editing", long_draft) == long_draft
+    assert budget_context("research", REPORT) == REPORT
+
+
+def test_edited_post_is_attached_to_metadata_only_output():
+    response = parse_crew_result('Final Answer: {"title": "Agents", "hashtags": "ai"}', full_content="The post")
+
+    assert response["full_content"] == "The post"
+    assert response["hashtags"] == ["#ai"]
+    assert parse_crew_result("no json", full_content="The post") == {"blog_post": "The post"}
+
+
+def test_generate_blog_reports_per_stage_tokens(monkeypatch):
+    monkeypatch.setitem(context_budget.CONTEXT_BUDGETS, "summarizing", 60)
+
+    with isolated_state(quota_scale=1000), offline_upstreams(llm=Upstream(latency=0.01), search=Upstream(latency=0.01)):
+        with TestClient(main.app) as client:
+            blog = client.post("/api/generate-blog", json={"topic": "AI agents", "use_cache": False}).json()
+
+    usage = blog["usage"]
+    assert list(usage) == ["research", "writing", "editing", "summarizing"]
+    assert all(stage["prompt_tokens"] > 0 and stage["completion_tokens"] > 0 for stage in usage.values())
+    assert usage["summarizing"]["context_tokens"] < usage["summarizing"]["context_tokens_raw"]
+    assert usage["summarizing"]["completion_tokens"] < usage["editing"]["completion_tokens"]
+    assert blog["full_content"].startswith("AI agents Content Editor notes")
+    assert blog["title"].startswith("What's next for AI agents")
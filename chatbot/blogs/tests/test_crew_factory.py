@@ -0,0 +1,78 @@
+from crewai.llms.base_llm import BaseLLM
+from blogs import crew as crew_module
+from blogs.crew import BlogsCrew, get_shared_tools
+from blogs.stage_cache import StageCache
+
+
+class EchoLLM(BaseLLM):
+    """Answers immediately, naming the agent's role so outputs can be traced."""
+
+    def __init__(self):
+        super().__init__(model="echo")
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        role = messages[0]["content"].split("You are ", 1)[1].split(".", 1)[0]
+        return f"Thought: done\nFinal Answer: output of {role}"
+
+
+def test_templated_crews_run_independently(monkeypatch):
+    monkeypatch.setattr(crew_module, "llm", EchoLLM())
+    monkeypatch.setattr(crew_module, "_templates", None)
+    monkeypatch.setattr(crew_module, "stage_cache", StageCache(path=None))
+
+    first = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers")
+    second = BlogsCrew(topic="Sourdough", tone="funny", target_audience="bakers")
+    first_crew, second_crew = first.setup_crew(), second.setup_crew()
+
+    first_result = first.kickoff(first_crew)
+    second_result = second.kickoff(second_crew)
+
+    assert first_result.raw == "output of AI agents SEO and Marketing Specialist"
+    assert second_result.raw == "output of Sourdough SEO and Marketing Specialist"
+    assert first_crew.id != second_crew.id
+    assert first_crew.agents[0].tools_results is not second_crew.agents[0].tools_results
+    assert first_crew.agents[0].tools_handler is not second_crew.agents[0].tools_handler
+    assert first_crew.agents[0].cache_handler is not second_crew.agents[0].cache_handler
+    assert first_crew.agents[0].tools_handler.cache is first_crew.agents[0].cache_handler
+    assert first_crew.tasks[0].processed_by_agents == {"AI agents Trend Researcher"}
+    templates = crew_module._get_templates()
+    assert templates["agent"].role == "template"
+    assert not templates["task"].processed_by_agents
+
+
+def _mutable_fields(instance) -> dict:
+    return {name: value for name, value in instance.__dict__.items() if isinstance(value, (list, set, dict))}
+
+
+def test_tools_are_shared_and_templates_are_built_once(monkeypatch):
+    built = []
+
+    def counting(cls):
+        def build(*args, **kwargs):
+            built.append(cls.__name__)
+            return cls(*args, **kwargs)
+        return build
+
+    monkeypatch.setattr(crew_module, "_templates", None)
+    monkeypatch.setattr(crew_module, "Agent", counting(crew_module.Agent))
+    monkeypatch.setattr(crew_module, "Task", counting(crew_module.Task))
+    monkeypatch.setattr(crew_module, "BudgetedCrew", counting(crew_module.BudgetedCrew))
+
+    setups = [BlogsCrew(topic=f"topic {i}", tone="casual", target_audience="developers") for i in range(3)]
+    crews = [setup.setup_crew() for setup in setups]
+
+    assert sorted(built) == ["Agent", "BudgetedCrew", "Task", "Task"]
+    assert get_shared_tools() is get_shared_tools()
+    assert all(setup.rag_tool is get_shared_tools()[0] for setup in setups)
+
+    first, second = crews[0], crews[1]
+    assert first.id != second.id
+    assert first.agents is not second.agents and first.tasks is not second.tasks
+    for a, b in [*zip(first.agents, second.agents), *zip(first.tasks, second.tasks)]:
+        assert a.id != b.id
+        a_fields, b_fields = _mutable_fields(a), _mutable_fields(b)
+        assert all(a_fields[name] is not b_fields[name] for name in a_fields)
+    for a, b in zip(first.agents, second.agents):
+        assert a.tools_handler is not b.tools_handler
+        assert a.cache_handler is not b.cache_handler
+        assert a._token_process is not b._token_process
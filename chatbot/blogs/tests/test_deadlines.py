@@ -0,0 +1,195 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import litellm
+import pytest
+from fastapi.testclient import TestClient
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallCompletedEvent
+from blogs import deadlines, main
+from blogs.crew import RateLimitedLLM
+from blogs.deadlines import DeadlineExceeded, LatencyTracker, call_with_deadline, deadline, time_left
+from blogs.rate_limiter import RateLimiter
+from blogs.singleflight import get_flight
+from bench_load import isolated_state
+from replay import Upstream, offline_upstreams
+from test_streaming import parse_events
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = LatencyTracker()
+    monkeypatch.setattr(deadlines, "latency_tracker", tracker)
+    monkeypatch.setattr(deadlines, "LATENCY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(deadlines, "LLM_MIN_TIMEOUT", 0.0)
+    return tracker
+
+
+def test_timeouts_adapt_to_each_stage(tracker, monkeypatch):
+    assert tracker.timeout("writing") == deadlines.LLM_TIMEOUT
+    for _ in range(20):
+        tracker.observe("writing", 0.1)
+        tracker.observe("research", 100.0)
+    tracker.observe("writing", 0.2)
+
+    assert tracker.percentile("writing", 50) == 0.1
+    assert tracker.timeout("writing") == pytest.approx(0.4)
+    assert tracker.hedge_delay("writing") == 0.1
+    assert tracker.timeout("research") == deadlines.LLM_TIMEOUT
+
+    with deadline(10):
+        with deadline(60):
+            assert 9 < time_left() <= 10
+    assert time_left() is None
+
+
+def test_stalled_attempts_are_retried_within_the_deadline(tracker):
+    for _ in range(10):
+        tracker.observe("writing", 0.05)
+    delays = iter([5.0, 0.01])
+    timeouts = []
+
+    def attempt():
+        timeouts.append(time_left())
+        time.sleep(next(delays))
+        return "answer"
+
+    start = time.monotonic()
+    with deadline(2):
+        assert call_with_deadline("writing", attempt) == "answer"
+
+    assert time.monotonic() - start < 0.5
+    assert timeouts[0] == pytest.approx(0.1, abs=0.02)
+    with deadline(0.05), pytest.raises(DeadlineExceeded):
+        call_with_deadline("other", lambda: time.sleep(1))
+
+
+def test_hedged_call_returns_the_first_answer(tracker):
+    for _ in range(10):
+        tracker.observe("editing", 0.02)
+    answers = iter([(1.0, "slow"), (0.01, "hedge")])
+    lock = threading.Lock()
+
+    def attempt():
+        with lock:
+            delay, answer = next(answers)
+        time.sleep(delay)
+        return answer
+
+    start = time.monotonic()
+    assert call_with_deadline("editing", attempt, hedge=True) == "hedge"
+    assert time.monotonic() - start < 0.5
+
+
+def test_hedge_losers_leave_no_usage_or_events(tracker, monkeypatch):
+    delays = iter([0.3, 0.0])
+    lock = threading.Lock()
+    threads = []
+
+    def completion(model, messages, **params):
+        assert params["no-log"] is True
+        with lock:
+            delay = next(delays)
+            threads.append(threading.current_thread().name)
+        time.sleep(delay)
+        return litellm.ModelResponse(
+            model=model,
+            choices=[litellm.Choices(message=litellm.Message(content=f"answer after {delay}s", role="assistant"))],
+            usage=litellm.Usage(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        )
+
+    class UsageCounter:
+        def __init__(self):
+            self.completion_tokens = 0
+
+        def log_success_event(self, kwargs, response_obj, start_time, end_time):
+            self.completion_tokens += response_obj["usage"].completion_tokens
+
+    monkeypatch.setattr(litellm, "completion", completion)
+    counter, completed = UsageCounter(), []
+    llm = RateLimitedLLM(model="gemini/gemini-1.5-flash", api_key="key", max_retries=0)
+    with isolated_state(quota_scale=1000), crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(LLMCallCompletedEvent)(lambda source, event: completed.append(event.response))
+        for _ in range(10):
+            deadlines.latency_tracker.observe("writing", 0.02)
+        answer = llm.call([{"role": "user", "content": "hi"}], callbacks=[counter], from_task=SimpleNamespace(name="writing", agent=None, id="task"))
+        time.sleep(0.4)
+
+    assert answer == "answer after 0.0s"
+    assert all(name.startswith("llm-attempt") for name in threads) and len(threads) == 2
+    assert counter.completion_tokens == 5
+    assert completed == ["answer after 0.0s"]
+
+
+def test_attempts_queued_past_their_deadline_never_run(monkeypatch):
+    pool = deadlines.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(deadlines, "_attempt_pool", pool)
+    blocker = deadlines._start(lambda: time.sleep(0.2), 1.0)
+    ran = []
+
+    queued = deadlines._start(lambda: ran.append(1), 0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        queued.result()
+    blocker.result()
+    assert ran == []
+
+
+def test_quota_waits_are_not_counted_as_upstream_latency(tracker):
+    limiter = RateLimiter("test", rpm=600)
+
+    for _ in range(5):
+        assert call_with_deadline("writing", lambda: "ok", limiter=limiter) == "ok"
+
+    assert limiter.stats()["acquired"] == 5 and limiter.stats()["throttled"] == 4
+    assert tracker.percentile("writing", 100) < 0.05
+    assert not limiter.try_acquire()
+    assert limiter.stats()["acquired"] == 5
+
+
+def test_errors_that_are_not_transient_are_not_retried(tracker):
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        if len(calls) == 1:
+            raise litellm.RateLimitError(message="429", llm_provider="gemini", model="gemini")
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        call_with_deadline("summarizing", attempt)
+    assert len(calls) == 2
+
+
+def test_request_deadline_reaches_the_crew(monkeypatch):
+    monkeypatch.setattr(deadlines, "LLM_RETRY_BACKOFF", 0.01)
+    headers = {"X-Request-Timeout": "0.5"}
+
+    def settle():
+        while get_flight("generate_blog").stats()["in_flight"]:
+            time.sleep(0.05)
+
+    with isolated_state(quota_scale=1000), offline_upstreams(llm=Upstream(latency=0.3), search=Upstream(latency=0.01)) as replay_llm:
+        with TestClient(main.app) as client:
+            start = time.monotonic()
+            response = client.post("/api/generate-blog/stream", json={"topic": "AI agents"}, headers=headers)
+            elapsed = time.monotonic() - start
+            # The shared generation keeps its own budget and finishes for later callers.
+            settle()
+            streamed_later = client.post("/api/generate-blog", json={"topic": "AI agents"}, headers=headers)
+
+            # The shared generation's own budget is what stops the crew's LLM calls.
+            monkeypatch.setattr(main, "REQUEST_TIMEOUT", 0.5)
+            calls_before = replay_llm.upstream.calls
+            timed_out = client.post("/api/generate-blog", json={"topic": "Sourdough"})
+            time.sleep(0.5)
+            settle()
+            calls = replay_llm.upstream.calls - calls_before
+
+    last = parse_events(response.text)[-1]
+    assert (last["event"], last["detail"]) == ("error", "Blog generation did not finish within the request deadline.")
+    assert elapsed < 2
+    assert streamed_later.json()["cache"]["hit"] is True
+    assert timed_out.status_code == 504
+    assert calls <= 3
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+from blogs.embedding_cache import CachedEmbeddings, EmbeddingCache, EmbeddingStore
+
+
+def test_repeated_queries_skip_the_model(tmp_path, counting_embeddings):
+    upstream = counting_embeddings
+    embeddings = CachedEmbeddings(upstream, "fake-model", EmbeddingCache(str(tmp_path)))
+
+    first = embeddings.embed_query("blog writing examples for kids")
+    second = embeddings.embed_query("blog writing examples for kids")
+
+    assert first == second
+    assert upstream.queries == ["blog writing examples for kids"]
+
+
+def test_only_new_documents_are_embedded(tmp_path, counting_embeddings):
+    upstream = counting_embeddings
+    embeddings = CachedEmbeddings(upstream, "fake-model", EmbeddingCache(str(tmp_path)))
+
+    embeddings.embed_documents(["a", "b"])
+    vectors = embeddings.embed_documents(["a", "c", "c"])
+
+    assert upstream.documents == ["a", "b", "c"]
+    assert vectors[1] == vectors[2]
+
+
+def test_disk_store_survives_a_new_cache(tmp_path, counting_embeddings):
+    upstream = counting_embeddings
+    CachedEmbeddings(upstream, "fake-model", EmbeddingCache(str(tmp_path))).embed_documents(["chunk"])
+    upstream.documents.clear()
+
+    cache = EmbeddingCache(str(tmp_path))
+    vectors = CachedEmbeddings(upstream, "fake-model", cache).embed_documents(["chunk"])
+
+    assert upstream.documents == []
+    assert vectors == [upstream._vector("chunk")]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(None, max_size=2)
+    cache.put_many("m", [("a", [1.0]), ("b", [2.0])])
+    cache.get("m", "a")
+    cache.put_many("m", [("c", [3.0])])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+
+
+def test_misses_keep_the_memory_map_until_the_store_grows(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.put_many([("a", [1.0, 2.0])])
+    assert store.get("a") == [1.0, 2.0]
+    matrix = store._matrix
+
+    assert store.get("missing") is None
+    assert store._matrix is matrix
+
+    EmbeddingStore(str(tmp_path)).put_many([("b", [3.0, 4.0])])
+    assert store.get("b") == [3.0, 4.0]
+    assert store._matrix is not matrix
+
+
+def test_async_embeddings_touch_the_disk_store_off_the_event_loop(tmp_path, counting_embeddings):
+    cache = EmbeddingCache(str(tmp_path))
+    threads = []
+    get, put_many = cache.get, cache.put_many
+    cache.get = lambda *args: threads.append(threading.current_thread()) or get(*args)
+    cache.put_many = lambda *args: threads.append(threading.current_thread()) or put_many(*args)
+    upstream = counting_embeddings
+    embeddings = CachedEmbeddings(upstream, "fake-model", cache)
+
+    async def run():
+        return await embeddings.aembed_query("q"), await embeddings.aembed_documents(["q", "doc"])
+
+    query, documents = asyncio.run(run())
+
+    assert query == upstream._vector("q") and len(documents) == 2
+    assert len(threads) == 5
+    assert threading.main_thread() not in threads
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from blogs.tools.index_cache import FAISSIndexCache
+
+
+def _save_index(path, texts):
+    FAISS.from_texts(texts, FakeEmbeddings(size=8)).save_local(str(path))
+
+
+def test_index_cache_hits_after_first_load(tmp_path):
+    _save_index(tmp_path, ["alpha", "beta"])
+    cache = FAISSIndexCache()
+    embeddings = FakeEmbeddings(size=8)
+
+    first = cache.get(str(tmp_path), embeddings)
+    second = cache.get(str(tmp_path), embeddings)
+
+    assert first is second
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_index_cache_reloads_rewritten_index(tmp_path):
+    _save_index(tmp_path, ["alpha"])
+    cache = FAISSIndexCache()
+    embeddings = FakeEmbeddings(size=8)
+
+    first = cache.get(str(tmp_path), embeddings)
+    time.sleep(0.01)
+    _save_index(tmp_path, ["alpha", "beta", "gamma"])
+    second = cache.get(str(tmp_path), embeddings)
+
+    assert second is not first
+    assert second.index.ntotal == 3
+    assert cache.stats()["reloads"] == 1
+
+
+def test_index_cache_loads_once_under_concurrency(tmp_path):
+    _save_index(tmp_path, ["alpha", "beta"])
+    cache = FAISSIndexCache()
+    embeddings = FakeEmbeddings(size=8)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get(str(tmp_path), embeddings)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(vector_db) for vector_db in results}) == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 7
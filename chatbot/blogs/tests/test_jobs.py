@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from blogs import main
+from blogs.jobs import JobManager, JobQueueFull, JobStore
+
+
+def test_jobs_run_with_bounded_concurrency(tmp_path):
+    running = []
+    peak = []
+
+    async def runner(request):
+        running.append(request["topic"])
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(request["topic"])
+        return {"title": request["topic"]}
+
+    async def scenario():
+        manager = JobManager(runner, JobStore(str(tmp_path / "jobs.sqlite")), concurrency=2, queue_depth=10)
+        await manager.start()
+        job_ids = [manager.submit({"topic": f"t{i}"}) for i in range(5)]
+        await manager._queue.join()
+        await manager.stop()
+        return manager, job_ids
+
+    manager, job_ids = asyncio.run(scenario())
+
+    assert max(peak) == 2
+    assert [manager.store.get(job_id)["result"] for job_id in job_ids] == [{"title": f"t{i}"} for i in range(5)]
+
+
+def test_submit_rejects_when_queue_is_full(tmp_path):
+    async def runner(request):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        manager = JobManager(runner, JobStore(str(tmp_path / "jobs.sqlite")), concurrency=1, queue_depth=2)
+        await manager.start()
+        manager.submit({"topic": "running"})
+        await asyncio.sleep(0)
+        manager.submit({"topic": "a"})
+        manager.submit({"topic": "b"})
+        with pytest.raises(JobQueueFull):
+            manager.submit({"topic": "c"})
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unfinished_jobs_are_resumed_after_restart(tmp_path):
+    store = JobStore()
+    interrupted = store.create({"topic": "interrupted"})
+    store.mark_running(interrupted)
+
+    async def runner(request):
+        return {"title": request["topic"]}
+
+    async def scenario():
+        manager = JobManager(runner)
+        await manager.start()
+        await manager._queue.join()
+        await manager.stop()
+        return manager
+
+    manager = asyncio.run(scenario())
+
+    assert JobStore().get(interrupted)["status"] == "succeeded"
+    assert manager.store is None
+    assert (tmp_path / "jobs.sqlite").exists()
+
+
+def test_job_api_returns_id_then_result(tmp_path, monkeypatch):
+    async def runner(request):
+        return {"title": request["topic"], "summary": "done"}
+
+    monkeypatch.setattr(main, "job_manager", JobManager(runner, JobStore(str(tmp_path / "jobs.sqlite"))))
+
+    with TestClient(main.app) as client:
+        response = client.post("/api/jobs", json={"topic": "AI agents"})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(50):
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job["status"] == "succeeded":
+                break
+            time.sleep(0.02)
+
+        assert job["result"] == {"title": "AI agents", "summary": "done"}
+        assert client.get("/api/jobs/unknown").status_code == 404
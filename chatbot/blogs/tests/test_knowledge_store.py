@@ -0,0 +1,89 @@
+import os
+import threading
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from blogs import vector
+from blogs.tools.index_cache import FAISSIndexCache
+from blogs.tools.knowledge_store import CURRENT_FILE, DOCS_FILE, LEGACY_DOCSTORE_FILE, MappedVectorStore, load_faiss_store, migrate, resolve_index_dir
+
+TEXTS = ["style guide for casual posts", "blog example about AI agents", "sourdough baking notes", "tone: professional"]
+
+
+def _store():
+    embeddings = DeterministicFakeEmbedding(size=16)
+    metadatas = [{"source": f"file{i}.txt", "tags": ["é", i]} for i in range(len(TEXTS))]
+    return FAISS.from_texts(TEXTS, embeddings, metadatas=metadatas), embeddings
+
+
+def test_mapped_store_matches_the_langchain_store(tmp_path):
+    vector_db, embeddings = _store()
+    vector.save_vector_store(vector_db, None, str(tmp_path))
+
+    assert sorted(os.listdir(resolve_index_dir(str(tmp_path)))) == [DOCS_FILE, "index.faiss"]
+    mapped = MappedVectorStore(str(tmp_path), embeddings)
+    for text in TEXTS:
+        query = embeddings.embed_query(text)
+        expected = vector_db.similarity_search_by_vector(query, k=3)
+        found = mapped.similarity_search_by_vector(query, k=3)
+        assert [(doc.page_content, doc.metadata, doc.id) for doc in found] == [(doc.page_content, doc.metadata, doc.id) for doc in expected]
+    assert len(mapped.similarity_search("blog", k=10)) == len(TEXTS)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(mapped.similarity_search(TEXTS[1], k=1)[0].page_content)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [TEXTS[1]] * 8
+
+
+def test_saved_index_reloads_for_editing(tmp_path):
+    vector_db, embeddings = _store()
+    vector.save_vector_store(vector_db, None, str(tmp_path))
+
+    reloaded = load_faiss_store(str(tmp_path), embeddings)
+    reloaded.add_texts(["a new chunk"])
+    vector.save_vector_store(reloaded, None, str(tmp_path))
+
+    assert MappedVectorStore(str(tmp_path), embeddings).index.ntotal == len(TEXTS) + 1
+    assert reloaded.docstore.search(reloaded.index_to_docstore_id[0]).metadata == {"source": "file0.txt", "tags": ["é", 0]}
+
+
+def test_index_cache_prefers_the_mapped_format_and_migrates_pickles(tmp_path):
+    vector_db, embeddings = _store()
+    vector_db.save_local(str(tmp_path))
+    cache = FAISSIndexCache()
+
+    assert isinstance(cache.get(str(tmp_path), embeddings), FAISS)
+
+    migrate(str(tmp_path))
+    os.remove(tmp_path / LEGACY_DOCSTORE_FILE)
+    mapped = cache.get(str(tmp_path), embeddings)
+
+    assert isinstance(mapped, MappedVectorStore)
+    assert cache.stats()["reloads"] == 1
+    assert mapped.similarity_search(TEXTS[2], k=1)[0].page_content == TEXTS[2]
+
+
+def test_saves_publish_index_and_docstore_together(tmp_path):
+    vector_db, embeddings = _store()
+    cache = FAISSIndexCache()
+    vector.save_vector_store(vector_db, {"files": {}}, str(tmp_path))
+    first = cache.get(str(tmp_path), embeddings)
+
+    versions = []
+    for text in ("one more chunk", "and another"):
+        vector_db.add_texts([text])
+        vector.save_vector_store(vector_db, None, str(tmp_path))
+        versions.append(resolve_index_dir(str(tmp_path)))
+        cache.get(str(tmp_path), embeddings)
+
+    # Each save is one directory named by CURRENT; only the last two are kept.
+    assert sorted(os.listdir(tmp_path)) == sorted([CURRENT_FILE, *(os.path.basename(version) for version in versions)])
+    assert sorted(os.listdir(versions[-1])) == [DOCS_FILE, "index.faiss", "manifest.json"]
+    assert vector.load_manifest(str(tmp_path)) == {"files": {}}
+    assert cache.get(str(tmp_path), embeddings).index.ntotal == len(TEXTS) + 2
+    # The first store is closed once its successor is replaced too.
+    assert first.index is None
+    assert cache.stats()["reloads"] == 2
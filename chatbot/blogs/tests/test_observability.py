@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from blogs import main
+from blogs.crew import BlogsCrew
+from blogs.observability import TOOL_LATENCY, TraceIdFilter, timed
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_and_trace_id_header():
+    with TestClient(main.app) as client:
+        client.get("/")
+        response = client.get("/metrics", headers={"X-Request-ID": "trace-123"})
+
+    assert response.headers["X-Trace-Id"] == "trace-123"
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'blog_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert 'blog_cache_hits_total{cache="search"}' in response.text
+    assert "blog_rate_limiter_wait_seconds_total" in response.text
+
+
+def test_logs_carry_the_request_trace_id():
+    class RejectingFormatter:
+        async def aformat_prompt(self, prompt):
+            raise ValueError("unparseable")
+
+    records = []
+    handler = logging.Handler()
+    handler.addFilter(TraceIdFilter())
+    handler.emit = records.append
+    logging.getLogger("blogs").addHandler(handler)
+    main.app.dependency_overrides[main.get_prompt_formatter] = RejectingFormatter
+    try:
+        with TestClient(main.app) as client:
+            response = client.post("/api/generate-blog-from-prompt", json={"prompt": "???"}, headers={"X-Request-ID": "abc"})
+        main.logger.info("outside any request")
+    finally:
+        main.app.dependency_overrides.clear()
+        logging.getLogger("blogs").removeHandler(handler)
+
+    assert response.status_code == 400
+    request_logs = [record for record in records if "freestyle prompt" in record.getMessage()]
+    assert [record.trace_id for record in request_logs] == ["abc"]
+    assert records[-1].trace_id == "-"
+
+
+def test_finished_stages_are_recorded():
+    before = sample("blog_stage_duration_seconds_count", stage="writing")
+    tokens_before = sample("blog_llm_tokens_total", stage="writing", kind="completion")
+    events = []
+
+    callback = BlogsCrew.__new__(BlogsCrew)._instrumented(lambda event, **data: events.append(event))
+    callback("task_finished", task="writing", agent="Writer", duration=1.5, prompt_tokens=100, completion_tokens=40)
+
+    assert sample("blog_stage_duration_seconds_count", stage="writing") == before + 1
+    assert sample("blog_llm_tokens_total", stage="writing", kind="completion") == tokens_before + 40
+    assert events == ["task_finished"]
+
+
+def test_timed_tools_record_outcome():
+    @timed(TOOL_LATENCY, tool="test")
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        failing()
+
+    assert sample("blog_tool_call_duration_seconds_count", tool="test", outcome="error") == 1
@@ -0,0 +1,71 @@
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from blogs.output_parser import extract_json_object, iter_json_objects, parse_crew_result
+
+NOISE = ["{", "}", '"', "\\", "{not json}", '{"unterminated', "{ use braces }", "[1, 2]", "```", "Thought:", "é", "  "]
+WORDS = ["agents", "trend", "{x}", "}", "{", '"quoted"', "back\\slash", "tab\t", "naïve", "emoji 🚀", "line\nbreak"]
+
+
+def random_text(rng, words, length):
+    return " ".join(rng.choice(words) for _ in range(length))
+
+
+def random_metadata(rng, words=1200):
+    return {
+        "title": random_text(rng, WORDS, 5),
+        "meta_description": random_text(rng, WORDS, 12),
+        "hashtags": [f"#{rng.choice(['AI', 'Tech', 'Trends'])}" for _ in range(3)],
+        "summary": random_text(rng, WORDS, 20),
+        "full_content": random_text(rng, WORDS, words),
+        "extra": {"nested": [{"depth": rng.randint(0, 9)}]},
+    }
+
+
+def noisy_output(rng, metadata):
+    """Thought lines full of stray braces and quotes, the JSON (maybe fenced), then trailing noise."""
+    lines = [random_text(rng, NOISE + ["Final Answer:"], rng.randint(0, 12)) for _ in range(rng.randint(0, 5))]
+    body = json.dumps(metadata, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 2]))
+    lines.append(f"```json\n{body}\n```" if rng.random() < 0.5 else body)
+    return "\n".join(lines) + random_text(rng, NOISE, rng.randint(0, 10))
+
+
+def test_fuzzed_outputs_yield_the_embedded_metadata():
+    rng = random.Random(1234)
+    for _ in range(300):
+        metadata = random_metadata(rng)
+        assert parse_crew_result(noisy_output(rng, metadata)) == metadata
+
+
+def test_garbage_never_raises():
+    rng = random.Random(99)
+    alphabet = '{}[]":,\\ \nabc123tnul-.e'
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 200)))
+        assert isinstance(parse_crew_result(text), dict)
+        value = extract_json_object(text)
+        assert value is None or isinstance(value, dict)
+    assert extract_json_object("{" * 100_000) is None
+
+
+def test_crew_output_and_schema_fallbacks():
+    metadata = {"title": "Agents", "full_content": "Body", "hashtags": "#ai, tech"}
+    crew_output = SimpleNamespace(raw='{"note": "draft"} then ' + json.dumps(metadata), json_dict=None)
+
+    assert parse_crew_result(crew_output)["hashtags"] == ["#ai", "#tech"]
+    assert parse_crew_result(SimpleNamespace(raw="", json_dict=metadata))["title"] == "Agents"
+    assert parse_crew_result('{"title": "Only a title"}') == {"title": "Only a title"}
+    assert parse_crew_result("No JSON { here") == {"blog_post": "No JSON { here"}
+
+
+def test_scan_time_grows_linearly():
+    def scan_seconds(repeats):
+        text = ('{"a": [1, {"b": "} {"}], ' * repeats) + "{ stray " * repeats
+        start = time.perf_counter()
+        list(iter_json_objects(text))
+        return time.perf_counter() - start
+
+    scan_seconds(1000)
+    assert scan_seconds(40_000) < 40 * max(scan_seconds(4_000), 1e-3)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from blogs import main
+from blogs.prompt_parser import PromptCache, PromptFormatter, normalize_prompt
+from blogs.prompt_rules import extract_prompt_fields
+
+COMPLEX_PROMPT = "I'm a nurse and want something about burnout that my colleagues would relate to but not too sad"
+
+
+class SlowLLM:
+    """Stands in for ChatGoogleGenerativeAI with a slow async call."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(content='{"topic": "AI agents", "tone": "casual", "target_audience": "developers"}')
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.delay)
+        return self.invoke(prompt)
+
+
+def test_other_endpoints_stay_responsive_while_formatting(monkeypatch):
+    async def fake_generate_blog(request):
+        return {"title": request.topic}
+
+    monkeypatch.setattr(main, "generate_blog", fake_generate_blog)
+    main.app.dependency_overrides[main.get_prompt_formatter] = lambda: PromptFormatter(SlowLLM(0.5), cache=PromptCache())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            formatting = asyncio.create_task(
+                client.post("/api/generate-blog-from-prompt", json={"prompt": COMPLEX_PROMPT})
+            )
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            root = await client.get("/")
+            root_latency = time.perf_counter() - start
+            assert not formatting.done()
+            return root, root_latency, await formatting
+
+    try:
+        root, root_latency, formatted = asyncio.run(scenario())
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert root.status_code == 200
+    assert root_latency < 0.2
+    assert formatted.json() == {"title": "AI agents"}
+
+
+def test_formatter_client_is_shared_for_the_app_lifetime():
+    with TestClient(main.app) as client:
+        first = main.get_prompt_formatter(SimpleNamespace(app=client.app))
+        second = main.get_prompt_formatter(SimpleNamespace(app=client.app))
+        assert first is second
+        assert first.llm is main.app.state.formatter_llm
+
+
+def test_rules_extract_simple_prompts_without_the_llm():
+    llm = SlowLLM()
+    formatter = PromptFormatter(llm, cache=PromptCache())
+
+    result = formatter.format_prompt("Write an article on Rust async for developers in a technical tone")
+
+    assert result.model_dump() == {"topic": "Rust async", "tone": "technical", "target_audience": "developers"}
+    assert llm.calls == 0
+    assert formatter.stats()["rule_extractions"] == 1
+
+
+def test_rules_pick_the_audience_and_keep_other_for_phrases_in_the_topic():
+    fields, confidence = extract_prompt_fields("funny tips for remote work for managers")
+    assert fields == {"topic": "tips for remote work", "tone": "funny", "target_audience": "managers"}
+    assert confidence >= 0.7
+
+    fields, _ = extract_prompt_fields("Create a post about professional networking")
+    assert fields["topic"] == "professional networking"
+    assert fields["tone"] == "professional"
+
+
+@pytest.mark.parametrize("prompt", [
+    "Write a post about gardening tips for people who hate gardening",
+    "Write a blog about dogs. Make it long and include 5 tips",
+    "write about sourdough, make it short",
+    "blog about tips for new managers",
+    "write 10 quick tips for beginners",
+])
+def test_run_on_and_generic_topics_are_left_to_the_llm(prompt):
+    _, confidence = extract_prompt_fields(prompt)
+    assert confidence < 0.7
+
+
+def test_low_confidence_falls_back_to_llm_and_caches_normalized_prompt():
+    llm = SlowLLM()
+    formatter = PromptFormatter(llm, cache=PromptCache())
+
+    formatter.format_prompt(COMPLEX_PROMPT)
+    again = asyncio.run(formatter.aformat_prompt("  " + COMPLEX_PROMPT.upper() + "!"))
+
+    assert llm.calls == 1
+    assert again.topic == "AI agents"
+    assert formatter.cache.stats()["hits"] == 1
+    assert normalize_prompt("Cats  for Kids.") == "cats for kids"
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from blogs import rate_limiter
+from blogs.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: now[0])
+    return now
+
+
+def test_idle_capacity_is_used_immediately(clock):
+    limiter = RateLimiter("test", rpm=60, burst=3)
+
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve() == pytest.approx(1.0)
+    assert limiter.reserve() == pytest.approx(2.0)
+
+
+def test_capacity_refills_over_time(clock):
+    limiter = RateLimiter("test", rpm=60, burst=1)
+    limiter.reserve()
+
+    clock[0] += 5
+
+    assert limiter.reserve() == 0
+    assert limiter.stats()["throttled"] == 0
+
+
+def test_tokens_per_minute_bucket(clock):
+    limiter = RateLimiter("test", rpm=1000, tpm=600, burst=10)
+
+    assert limiter.reserve(tokens=600) == 0
+    assert limiter.reserve(tokens=300) == pytest.approx(30.0)
+
+
+def test_file_backend_shares_budget_between_limiters(tmp_path, clock):
+    path = str(tmp_path / "gemini.json")
+    worker_a = RateLimiter("gemini", rpm=60, burst=2, state_path=path)
+    worker_b = RateLimiter("gemini", rpm=60, burst=2, state_path=path)
+
+    assert worker_a.reserve() == 0
+    assert worker_b.reserve() == 0
+    assert worker_a.reserve() == pytest.approx(1.0)
+
+
+def test_async_acquire_spaces_concurrent_callers():
+    limiter = RateLimiter("test", rpm=600, burst=1)
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire_async() for _ in range(4)))
+
+    waits = asyncio.run(run())
+
+    assert sorted(waits) == pytest.approx([0, 0.1, 0.2, 0.3], abs=0.02)
+    assert limiter.stats()["wait_seconds"] == pytest.approx(0.6, abs=0.05)
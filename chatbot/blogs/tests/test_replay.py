@@ -0,0 +1,43 @@
+import litellm
+import pytest
+from bench_load import run_load
+from replay import ReplayGoogleSearch, ReplayLLM, ReplayStore, Upstream, offline_upstreams
+
+MESSAGES = [{"role": "system", "content": "You are AI agents Content Editor. You edit."}, {"role": "user", "content": "Edit this."}]
+
+
+def test_recorded_completions_are_replayed(tmp_path):
+    path = str(tmp_path / "recording.json")
+    real = lambda **params: litellm.ModelResponse(
+        choices=[litellm.Choices(message=litellm.Message(content="Final Answer: recorded", role="assistant"))],
+        usage=litellm.Usage(prompt_tokens=10, completion_tokens=3, total_tokens=13),
+    )
+    recorder = ReplayLLM(store=ReplayStore(path), record=True, completion=real)
+    recorder(model="gemini/gemini-1.5-flash", messages=MESSAGES)
+    recorder.store.save()
+
+    replayer = ReplayLLM(store=ReplayStore(path))
+    response = replayer(model="gemini/gemini-1.5-flash", messages=MESSAGES)
+    synthesized = replayer(model="gemini/gemini-1.5-flash", messages=MESSAGES[:1])
+
+    assert response.choices[0].message.content == "Final Answer: recorded"
+    assert response.usage.completion_tokens == 3
+    assert synthesized.choices[0].message.content.startswith("Thought: I can answer now.\nFinal Answer: AI agents Content Editor")
+
+
+def test_injected_rate_limits():
+    with offline_upstreams(llm=Upstream(error_rate=1.0), search=Upstream(error_rate=1.0)) as replay_llm:
+        with pytest.raises(litellm.RateLimitError):
+            replay_llm(model="gemini/gemini-1.5-flash", messages=MESSAGES)
+        assert "error" in ReplayGoogleSearch({"q": "ai agents"}).get_dict()
+        assert replay_llm.upstream.stats() == {"calls": 1, "rate_limited": 1}
+
+
+def test_load_run_reports_throughput_and_percentiles():
+    report = run_load(clients=3, requests=6, topics=3, quota_scale=1000, llm=Upstream(latency=0.01), search=Upstream(latency=0.01))
+
+    assert report["ok"] == 6
+    assert report["throughput_rps"] > 0
+    assert report["latency_seconds"]["p50"] <= report["latency_seconds"]["p95"] <= report["latency_seconds"]["p99"]
+    assert set(report["loop_lag_ms"]) == {"p50", "p99", "max"}
+    assert report["upstreams"]["llm"]["calls"] >= 3 * 4
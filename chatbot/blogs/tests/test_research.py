@@ -0,0 +1,50 @@
+import asyncio
+
+from blogs.research import RESEARCH_QUERIES, merge_results, prefetch_research
+
+
+class FakeSerpAPITool:
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.queries = []
+
+    async def asearch(self, query, search_type="search"):
+        self.queries.append((query, search_type))
+        await asyncio.sleep(self.delay)
+        if "viral" in query:
+            raise RuntimeError("429 Too Many Requests")
+        key = "news_results" if search_type == "news" else "organic_results"
+        return {
+            key: [
+                {"title": "Shared story", "link": "https://www.example.com/story/", "snippet": "everywhere"},
+                {"title": f"Only for {query}", "link": f"https://example.com/{len(query)}"},
+            ],
+            "people_also_ask": [{"question": "Is AI safe?"}],
+        }
+
+
+def test_merge_results_dedupes_links_and_ranks_repeats_first():
+    merged = merge_results([
+        ("a", "search", {"organic_results": [{"title": "One", "link": "https://one.com/x"}, {"title": "Two", "link": "https://two.com"}]}),
+        ("b", "news", {"news_results": [{"title": "Two again", "link": "https://www.two.com/"}]}),
+    ])
+
+    assert [entry["title"] for entry in merged["results"]] == ["Two", "One"]
+    assert merged["results"][0]["queries"] == ["a", "b"]
+
+
+def test_prefetch_runs_queries_concurrently_and_skips_failures():
+    tool = FakeSerpAPITool(delay=0.2)
+
+    loop = asyncio.new_event_loop()
+    try:
+        start = loop.time()
+        context = loop.run_until_complete(prefetch_research(tool, "AI", "2025"))
+        elapsed = loop.time() - start
+    finally:
+        loop.close()
+
+    assert len(tool.queries) == len(RESEARCH_QUERIES)
+    assert elapsed < 0.2 * len(RESEARCH_QUERIES) / 2
+    assert context.count("Shared story") == 1
+    assert "Is AI safe?" in context
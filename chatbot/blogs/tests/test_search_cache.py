@@ -0,0 +1,63 @@
+import pytest
+from blogs.tools import serpapi_tool
+from blogs.tools.search_cache import SearchCache, normalize_search
+
+
+class FakeGoogleSearch:
+    calls = []
+
+    def __init__(self, params):
+        self.params = params
+
+    def get_dict(self):
+        FakeGoogleSearch.calls.append(self.params)
+        return {"organic_results": [{"title": self.params["q"], "snippet": "s", "link": "https://example.com"}]}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    FakeGoogleSearch.calls = []
+    cache = SearchCache(max_size=8)
+    monkeypatch.setattr(serpapi_tool, "GoogleSearch", FakeGoogleSearch)
+    monkeypatch.setattr(serpapi_tool, "search_cache", cache)
+    return cache
+
+
+def test_normalized_repeat_queries_hit_the_cache(cache):
+    tool = serpapi_tool.SerpAPITool(api_key="key")
+
+    tool._run("AI trends 2025")
+    result = tool._run("  ai   TRENDS 2025 ")
+
+    assert "**AI trends 2025**" in result
+    assert len(FakeGoogleSearch.calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_depends_on_search_type(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("blogs.tools.search_cache.time.time", lambda: clock[0])
+    cache = SearchCache(ttls={"news": 10, "search": 100})
+    news = normalize_search("ai news", "news", "United States", 10)
+    search = normalize_search("ai", "search", "United States", 10)
+    cache.put(news, {"news_results": []})
+    cache.put(search, {"organic_results": []})
+
+    clock[0] += 50
+
+    assert cache.get(news) is None
+    assert cache.get(search) == {"organic_results": []}
+    assert cache.stats()["expired"] == 1
+
+
+def test_lru_eviction_and_disk_backing(tmp_path):
+    path = str(tmp_path / "search_cache.sqlite")
+    cache = SearchCache(max_size=1, path=path)
+    first = normalize_search("first", "search", "United States", 10)
+    second = normalize_search("second", "search", "United States", 10)
+    cache.put(first, {"organic_results": [1]})
+    cache.put(second, {"organic_results": [2]})
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(first) == {"organic_results": [1]}
+    assert SearchCache(path=path).get(second) == {"organic_results": [2]}
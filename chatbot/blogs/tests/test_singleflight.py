@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from blogs import main
+from blogs.embedding_cache import CachedEmbeddings, EmbeddingCache
+from blogs.singleflight import SingleFlight, get_flight
+from blogs.tools import serpapi_tool
+from blogs.tools.search_cache import SearchCache
+from bench_load import isolated_state
+from replay import Upstream, offline_upstreams
+
+
+def test_concurrent_duplicates_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.05)
+        return value * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", lambda: slow(21)))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def run():
+        async def fetch():
+            calls.append("async")
+            await asyncio.sleep(0.05)
+            return "done"
+        return await asyncio.gather(*(flight.ado("other", fetch) for _ in range(4)))
+
+    assert results == [42] * 5
+    assert asyncio.run(run()) == ["done"] * 4
+    assert calls == [21, "async"]
+    assert flight.stats() == {"calls": 2, "coalesced": 7, "in_flight": 0}
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flight.ado("key", failing) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert [str(error) for error in errors] == ["upstream down"] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_leader_timing_out_leaves_the_shared_call_running():
+    flight = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(asyncio.wait_for(flight.ado("key", slow), timeout=0.05))
+        await asyncio.sleep(0)
+        follower = flight.ado("key", slow)
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(run())
+
+    assert isinstance(leader, asyncio.TimeoutError)
+    assert follower == "done"
+    assert flight.stats() == {"calls": 1, "coalesced": 1, "in_flight": 0}
+
+
+def test_identical_searches_and_embeddings_coalesce(monkeypatch, counting_embeddings):
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"news_results": [{"title": "Agents", "link": "https://example.com"}]})
+
+    monkeypatch.setattr(serpapi_tool, "search_cache", SearchCache())
+    monkeypatch.setattr(serpapi_tool, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    tool = serpapi_tool.SerpAPITool(api_key="key")
+    upstream = counting_embeddings
+    embeddings = CachedEmbeddings(upstream, "fake-model", EmbeddingCache(None))
+    coalesced = get_flight("serpapi").stats()["coalesced"]
+
+    async def run():
+        searches = asyncio.gather(*(tool.asearch("AI agents", "news") for _ in range(4)), tool.asearch("ai  AGENTS", "news"))
+        vectors = asyncio.gather(*(embeddings.aembed_query("style guide") for _ in range(3)))
+        return await searches, await vectors
+
+    searches, vectors = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert all(result == searches[0] for result in searches)
+    assert get_flight("serpapi").stats()["coalesced"] == coalesced + 4
+    assert upstream.queries == ["style guide"]
+    assert vectors[0] == vectors[1] == vectors[2]
+
+
+def _llm_calls(*requests) -> tuple:
+    llm = Upstream(latency=0.02)
+    with isolated_state(quota_scale=1000), offline_upstreams(llm=llm, search=Upstream(latency=0.02)):
+        async def run():
+            return await asyncio.gather(*(main.produce_blog(request) for request in requests))
+
+        return asyncio.run(run()), llm.calls
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_identical_generations_run_one_crew(use_cache):
+    request = main.BlogGenerationRequest(topic="AI agents", use_cache=use_cache)
+    duplicate = main.BlogGenerationRequest(topic="  ai agents ", use_cache=use_cache)
+    _, calls_for_one = _llm_calls(request)
+    coalesced = get_flight("generate_blog").stats()["coalesced"]
+
+    (first, *others), calls = _llm_calls(request, duplicate, request)
+
+    assert calls == calls_for_one
+    assert first["cache"] == {"hit": False}
+    assert [blog["cache"] for blog in others] == [{"hit": False, "coalesced": True}] * 2
+    assert all(blog["full_content"] == first["full_content"] for blog in others)
+    assert get_flight("generate_blog").stats()["coalesced"] == coalesced + 2
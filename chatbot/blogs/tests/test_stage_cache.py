@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from blogs import crew as crew_module
+from blogs.crew import BlogsCrew
+from blogs.stage_cache import STAGES, StageCache, stage_key
+
+
+class FinishedCrew:
+    """Stands in for a crew run, returning one output per task it was given."""
+
+    def __init__(self, crew, label):
+        self.tasks = crew.tasks
+        self.label = label
+
+    def kickoff(self):
+        outputs = [SimpleNamespace(raw=f"{self.label} {task.agent.role}") for task in self.tasks]
+        return SimpleNamespace(raw=outputs[-1].raw, tasks_output=outputs)
+
+
+def test_changed_audience_reuses_research_and_runs_three_stages(monkeypatch):
+    monkeypatch.setattr(crew_module, "stage_cache", StageCache(path=None))
+
+    first = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers")
+    full_crew = first.setup_crew()
+    assert len(full_crew.tasks) == 4
+    first.kickoff(FinishedCrew(full_crew, "first"))
+
+    second = BlogsCrew(topic="ai  agents", tone="formal", target_audience="executives")
+    assert second.plan_stages() == 1
+    partial_crew = second.setup_crew()
+
+    assert len(partial_crew.tasks) == len(partial_crew.agents) == 3
+    writing_task = partial_crew.tasks[0]
+    assert "first AI agents Trend Researcher" in writing_task.description
+    assert not writing_task.context
+
+
+def test_repeated_request_skips_the_crew_entirely(monkeypatch):
+    monkeypatch.setattr(crew_module, "stage_cache", StageCache(path=None))
+
+    first = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers")
+    result = first.kickoff(FinishedCrew(first.setup_crew(), "first"))
+
+    events = []
+    repeat = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers")
+    assert repeat.setup_crew(event_callback=lambda event, **data: events.append(data["task"])) is None
+    assert repeat.kickoff(None) == result.raw
+    assert events == list(STAGES)
+
+
+def test_use_cache_false_runs_every_stage(monkeypatch):
+    monkeypatch.setattr(crew_module, "stage_cache", StageCache(path=None))
+    first = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers")
+    first.kickoff(FinishedCrew(first.setup_crew(), "first"))
+
+    fresh = BlogsCrew(topic="AI agents", tone="casual", target_audience="developers", use_cache=False)
+    crew = fresh.setup_crew()
+
+    assert fresh.plan_stages() == 0
+    assert len(crew.tasks) == len(STAGES)
+    fresh.kickoff(FinishedCrew(crew, "fresh"))
+    assert BlogsCrew(topic="AI agents", tone="casual", target_audience="developers").plan_stages() == len(STAGES)
+    assert crew_module.stage_cache.get(stage_key("summarizing", "fresh AI agents Content Editor")) == "fresh AI agents SEO and Marketing Specialist"
+
+
+def test_stage_cache_persists_to_sqlite(tmp_path):
+    path = str(tmp_path / "stages.sqlite")
+    key = stage_key("research", "ai agents", "2025", "2025-01-01")
+    StageCache(path=path).put(key, "research notes")
+
+    cache = StageCache(path=path)
+    assert cache.get(key) == "research notes"
+    assert cache.get(stage_key("research", "ai agents", "2025", "2025-01-02")) is None
+    assert cache.stats()["hits"]["research"] == 1
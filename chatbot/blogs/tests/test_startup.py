@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from blogs import config, main
+from blogs import crew as crew_module
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_importing_the_app_skips_heavy_dependencies():
+    code = "import sys, blogs.main; print(sorted(m for m in ('crewai', 'faiss', 'langchain_google_genai', 'litellm') if m in sys.modules))"
+    env = {**os.environ, "PYTHONPATH": SRC_DIR}
+    env.pop("GOOGLE_API_KEY", None)
+
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
+
+
+def test_missing_key_fails_at_startup_not_import(monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY")
+    monkeypatch.setattr(main, "get_settings", config.get_settings.__wrapped__)
+    monkeypatch.setattr("dotenv.find_dotenv", lambda *args, **kwargs: "")
+
+    with pytest.raises(ValueError, match="GOOGLE_API_KEY"):
+        with TestClient(main.app):
+            pass
+
+
+def test_warm_up_builds_clients_before_the_first_request(monkeypatch):
+    monkeypatch.setattr(crew_module, "llm", None)
+    monkeypatch.setattr(crew_module, "_shared_tools", None)
+    monkeypatch.setattr(crew_module, "_templates", None)
+
+    with TestClient(main.app) as client:
+        assert crew_module.llm is not None
+        assert crew_module._shared_tools is not None
+        assert crew_module._templates["agent"].llm is crew_module.llm
+        assert client.app.state.settings.google_api_key == os.environ["GOOGLE_API_KEY"]
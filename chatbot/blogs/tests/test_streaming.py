@@ -0,0 +1,88 @@
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from blogs import blog_cache, embedding_cache, main
+from blogs import crew as crew_module
+from blogs.blog_cache import BlogCache
+from blogs.crew import BlogsCrew
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append(json.loads(lines["data"]))
+    return events
+
+
+def test_progress_callbacks_report_stages_tools_and_drafts():
+    events = []
+    stages = [
+        (name, SimpleNamespace(agent=SimpleNamespace(role=name.title(), step_callback=None), callback=None))
+        for name in ("research", "writing", "editing", "summarizing")
+    ]
+    crew_setup = BlogsCrew.__new__(BlogsCrew)
+    crew_setup._attach_progress_callbacks(stages, lambda event, **data: events.append((event, data)))
+
+    crew_setup._on_kickoff()
+    stages[0][1].agent.step_callback(SimpleNamespace(tool="Search", tool_input="ai trends"))
+    for _, task in stages:
+        task.callback(SimpleNamespace(raw=f"output of {task.agent.role}"))
+
+    names = [event for event, _ in events]
+    assert names[:3] == ["task_started", "tool_call", "task_finished"]
+    assert names.count("task_started") == names.count("task_finished") == 4
+    drafts = [data for event, data in events if event == "draft"]
+    assert [draft["task"] for draft in drafts] == ["writing", "editing"]
+    assert drafts[1]["content"] == "output of Editing"
+
+
+def test_stream_endpoint_emits_events_then_result(monkeypatch):
+    kickoffs = []
+
+    class FakeCrew:
+        current_year = "2025"
+        rag_tool = object()
+        serpapi_tool = None
+
+        def __init__(self, **kwargs):
+            self.event_callback = None
+
+        def setup_crew(self, research_context=None, event_callback=None):
+            self.event_callback = event_callback
+            return "crew"
+
+        def kickoff(self, crew):
+            kickoffs.append(crew)
+            self.event_callback("task_started", task="research", agent="Researcher")
+            self.event_callback("draft", task="writing", content="First draft")
+            return '{"title": "Streamed", "summary": "ok"}'
+
+        def edited_post(self):
+            return None
+
+        def token_report(self):
+            return {}
+
+    monkeypatch.setattr(crew_module, "BlogsCrew", FakeCrew)
+    monkeypatch.setattr(blog_cache, "blog_cache", BlogCache())
+    monkeypatch.setattr(embedding_cache, "get_embedding_model", lambda api_key: None)
+
+    with TestClient(main.app) as client:
+        response = client.post("/api/generate-blog/stream", json={"topic": "AI agents"})
+        repeat = client.post("/api/generate-blog/stream", json={"topic": "ai agents "})
+        blog = client.post("/api/generate-blog", json={"topic": "AI agents"}).json()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event["event"] for event in events] == ["started", "task_started", "draft", "result"]
+    assert events[-1]["result"] == {"title": "Streamed", "summary": "ok", "usage": {}, "cache": {"hit": False}}
+    assert all(event["elapsed"] >= 0 for event in events)
+
+    repeat_events = parse_events(repeat.text)
+    assert [event["event"] for event in repeat_events] == ["started", "result"]
+    assert repeat_events[-1]["result"]["cache"]["match"] == "exact"
+    assert repeat_events[-1]["result"]["title"] == blog["title"] == "Streamed"
+    assert blog["cache"]["hit"] is True
+    assert kickoffs == ["crew"]
@@ -0,0 +1,135 @@
+import os
+
+import faiss
+import numpy as np
+import pytest
+from blogs import vector
+from blogs.tools.knowledge_store import resolve_index_dir
+
+
+@pytest.fixture
+def upstream(monkeypatch, counting_embeddings):
+    monkeypatch.setattr(vector, "get_embedding_model", lambda api_key: counting_embeddings)
+    return counting_embeddings
+
+
+def _write(directory, name, paragraphs):
+    (directory / name).write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def test_incremental_ingest_embeds_only_the_diff(tmp_path, upstream):
+    knowledge = tmp_path / "knowledge"
+    knowledge.mkdir()
+    db_path = str(tmp_path / "faiss_index")
+    paragraphs = [f"Paragraph {i} " + "word " * 80 for i in range(4)]
+    _write(knowledge, "context.txt", paragraphs)
+    _write(knowledge, "content.txt", ["Style guide " + "tone " * 80])
+
+    first = vector.ingest_directory(str(knowledge), db_path)
+    assert first["removed"] == 0 and first["added"] == len(upstream.documents)
+
+    upstream.documents.clear()
+    paragraphs[2] = "A rewritten paragraph " + "fresh " * 70
+    _write(knowledge, "context.txt", paragraphs)
+    second = vector.ingest_directory(str(knowledge), db_path)
+
+    assert second["added"] == len(upstream.documents) >= 1
+    assert second["removed"] >= 1
+    assert all("Style guide" not in text for text in upstream.documents)
+
+    manifest = vector.load_manifest(db_path)
+    assert set(manifest["files"]) == {"context.txt", "content.txt"}
+
+
+def test_deleted_file_removes_its_vectors(tmp_path, upstream):
+    knowledge = tmp_path / "knowledge"
+    knowledge.mkdir()
+    db_path = str(tmp_path / "faiss_index")
+    _write(knowledge, "context.txt", ["Keep me " + "a " * 50])
+    _write(knowledge, "user_preference.txt", ["Drop me " + "b " * 50])
+    vector.ingest_directory(str(knowledge), db_path)
+
+    os.remove(knowledge / "user_preference.txt")
+    summary = vector.ingest_directory(str(knowledge), db_path)
+    vector_db = vector.load_vector_store(db_path, upstream)
+
+    assert (summary["added"], summary["removed"], summary["unchanged"]) == (0, 1, 1)
+    assert vector_db.index.ntotal == 1
+
+
+def test_embed_batches_retries_failed_batches():
+    calls = []
+
+    def flaky_embed(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("429 Resource has been exhausted")
+        return [[float(len(text))] for text in texts]
+
+    batches = list(vector.batched([(str(i), f"text {i}", {}) for i in range(10)], 3))
+    results = list(vector.embed_batches(batches, flaky_embed, concurrency=2, base_delay=0.01))
+
+    assert sorted(chunk_id for batch, _ in results for chunk_id, _, _ in batch) == sorted(str(i) for i in range(10))
+    assert len(calls) == len(batches) + 1
+
+
+def test_interrupted_ingest_resumes_from_checkpoint(tmp_path, upstream, monkeypatch):
+    knowledge = tmp_path / "knowledge"
+    knowledge.mkdir()
+    db_path = str(tmp_path / "faiss_index")
+    _write(knowledge, "context.txt", [f"Paragraph {i} " + "word " * 80 for i in range(6)])
+
+    original = vector.embed_batches
+
+    def interrupted(*args, **kwargs):
+        for number, item in enumerate(original(*args, **kwargs)):
+            if number == 2:
+                raise KeyboardInterrupt
+            yield item
+
+    monkeypatch.setattr(vector, "embed_batches", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        vector.ingest_directory(str(knowledge), db_path, batch_size=1, concurrency=1, checkpoint_every=1)
+    monkeypatch.setattr(vector, "embed_batches", original)
+
+    embedded_before = len(upstream.documents)
+    summary = vector.ingest_directory(str(knowledge), db_path, batch_size=1, concurrency=1)
+
+    assert summary["added"] == len(upstream.documents) - embedded_before
+    assert summary["unchanged"] == 2
+
+
+@pytest.mark.parametrize("index_type, index_class", [("hnsw", faiss.IndexHNSWFlat), ("ivf_flat", faiss.IndexIVFFlat)])
+def test_approximate_index_is_saved_and_updated_incrementally(tmp_path, upstream, index_type, index_class):
+    knowledge = tmp_path / "knowledge"
+    knowledge.mkdir()
+    db_path = str(tmp_path / "faiss_index")
+    paragraphs = [f"Paragraph {i} " + "word " * 80 for i in range(4)]
+    _write(knowledge, "context.txt", paragraphs)
+
+    vector.ingest_directory(str(knowledge), db_path, index_type=index_type)
+    assert isinstance(faiss.read_index(os.path.join(resolve_index_dir(db_path), "index.faiss")), index_class)
+
+    # No embedding cache here: unchanged chunks must come from the saved index itself.
+    upstream.documents.clear()
+    paragraphs[0] = "A rewritten paragraph " + "fresh " * 70
+    _write(knowledge, "context.txt", paragraphs)
+    summary = vector.ingest_directory(str(knowledge), db_path, index_type=index_type)
+
+    index = faiss.read_index(os.path.join(resolve_index_dir(db_path), "index.faiss"))
+    assert isinstance(index, index_class)
+    assert len(upstream.documents) == summary["added"]
+    assert index.ntotal == summary["added"] + summary["unchanged"]
+    assert vector.load_manifest(db_path)["index"]["type"] == index_type
+
+
+@pytest.mark.parametrize("index_type", vector.INDEX_TYPES)
+def test_build_faiss_index_finds_exact_neighbours(index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.random((512, 32), dtype=np.float32)
+
+    index = vector.build_faiss_index(vectors, index_type, nlist=4, nprobe=4, pq_m=8)
+    _, neighbours = index.search(vectors[:20], 1)
+
+    hits = sum(int(neighbours[i][0] == i) for i in range(20))
+    assert hits >= (12 if index_type == "ivf_pq" else 19)